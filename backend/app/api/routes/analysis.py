@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.schemas.message import MessageCreate
 from app.schemas.analysis import AnalysisResult
-from app.services.analysis_service import analyze_text, generate_recommendations, generate_summary
+from app.services.analysis_service import analyze_text, generate_recommendations, generate_summary, recommendations_for
 from app.dependencies import get_current_user
 from app.db.models import Usuario, Analisis, Mensaje
 from sqlalchemy import desc
@@ -61,14 +61,8 @@ def analyze_complete_endpoint(
         # Análisis básico
         basic_analysis = analyze_text(message.texto)
         
-        # Generar recomendaciones
-        recommendations = generate_recommendations(
-            basic_analysis["emotion"],
-            basic_analysis["emotion_score"],
-            basic_analysis["style"],
-            basic_analysis["style_score"],
-            basic_analysis["priority"]
-        )
+        # Generar recomendaciones (vacías en la ruta rápida)
+        recommendations = recommendations_for(basic_analysis)
         
         # Generar resumen
         summary = generate_summary(basic_analysis)
@@ -108,6 +102,7 @@ def analyze_complete_endpoint(
             analisis.prioridad = basic_analysis["priority"]
             analisis.alerta = basic_analysis["alert"]
             analisis.razon_alerta = basic_analysis.get("alert_reason")
+            analisis.modelo_utilizado = basic_analysis.get("model_version")
             
             # Guardar distribuciones como JSON
             analisis.distribucion_emociones = json.dumps(basic_analysis.get("emotion_distribution", []))
@@ -240,8 +235,8 @@ def deep_analysis(
     - Análisis individual y promedio
     - Datos para gráficos (radar, barras, tabla)
     """
-    import re
-    from app.services.analysis_service import analyze_text
+    from app.services.analysis_service import analyze_texts
+    from app.models.normalization import normalize_texts
 
     # 1. Recuperar los últimos 10 mensajes del usuario (solo remitente 'user')
     mensajes = db.query(Mensaje).filter(
@@ -252,17 +247,12 @@ def deep_analysis(
     if not mensajes:
         raise HTTPException(status_code=404, detail="No hay mensajes para analizar.")
 
-    # 2. Limpieza completa de texto
-    def limpiar_texto(texto):
-        texto = texto.lower()
-        texto = re.sub(r"[^a-záéíóúüñ0-9\s]", "", texto)  # Solo letras/números/espacios
-        texto = re.sub(r"\s+", " ", texto).strip()
-        return texto
-
-    mensajes_limpios = [limpiar_texto(m.texto) for m in mensajes]
+    # 2. Limpieza completa de texto (la misma normalización que aplican los modelos)
+    mensajes_limpios = [" ".join(texto.split()) for texto in normalize_texts([m.texto for m in mensajes])]
 
-    # 3. Analizar cada mensaje individualmente
-    analisis_individual = [analyze_text(texto) for texto in mensajes_limpios]
+    # 3. Analizar cada mensaje individualmente (clasificación en lote)
+    # Distribuciones completas: los promedios de abajo necesitan todas las clases
+    analisis_individual = analyze_texts(mensajes_limpios, top_k=0, min_prob=0.0)
 
     # 4. Calcular promedios de scores para emociones y estilos
     # Obtener todas las emociones y estilos posibles
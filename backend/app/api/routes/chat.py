@@ -3,18 +3,24 @@
 Rutas para el manejo del chat y análisis emocional del mensaje.
 """
 
+import asyncio
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.schemas.chat import ChatMessage, ChatResponse
-from app.services.chat_service import generate_bot_reply
+from app.services.chat_service import generate_bot_reply_async, stream_bot_reply
 from app.dependencies import get_current_user
 from app.db.models import Usuario
 from app.db import crud
 from app.schemas.message import Message, MessageCreate
-from app.schemas.analysis_record import AnalysisRecord
+from app.schemas.analysis_record import AnalysisCreate
 from fastapi import status
 from app.services.analysis_service import analyze_text
+from app.services.context_state import context_store
 
 router = APIRouter()
 
@@ -27,8 +33,45 @@ def get_db():
         db.close()
 
 
+def save_exchange(db: Session, user_id: int, user_text: str, reply: str, meta: dict) -> None:
+    """Guarda el mensaje del usuario, la respuesta del bot y el análisis del mensaje."""
+    user_msg = crud.create_message(db, MessageCreate(
+        usuario_id=user_id,
+        texto=user_text,
+        remitente="user"
+    ))
+    crud.create_analysis(db, AnalysisCreate(
+        mensaje_id=int(user_msg.id),  # type: ignore
+        usuario_id=user_id,
+        emocion=meta.get("detected_emotion") or "",
+        emocion_score=meta.get("emotion_score") or 0.0,
+        estilo=meta.get("detected_style") or "",
+        estilo_score=meta.get("style_score") or 0.0,
+        prioridad=meta.get("priority") or "",
+        alerta=meta.get("alert") if meta.get("alert") is not None else False,
+        razon_alerta=meta.get("alert_reason") or "",
+        modelo_utilizado=meta.get("model_version")
+    ))
+    bot_msg = crud.create_message(db, MessageCreate(
+        usuario_id=user_id,
+        texto=reply,
+        remitente="bot"
+    ))
+    crud.create_analysis(db, AnalysisCreate(
+        mensaje_id=int(bot_msg.id),  # type: ignore
+        usuario_id=user_id,
+        emocion="",
+        emocion_score=0.0,
+        estilo="",
+        estilo_score=0.0,
+        prioridad="",
+        alerta=False,
+        razon_alerta=""
+    ))
+
+
 @router.post("/", response_model=ChatResponse)
-def chat_endpoint(
+async def chat_endpoint(
     message: ChatMessage,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -37,49 +80,57 @@ def chat_endpoint(
     """
     Endpoint principal de chat: analiza el mensaje del usuario,
     genera respuesta empática, responde al usuario y luego guarda los mensajes y análisis en segundo plano.
+    La espera al LLM no ocupa un hilo: el análisis y la base de datos corren en hilos y la llamada HTTP
+    es asíncrona.
     """
     try:
-        # 1. Generar análisis y respuesta del bot
-        result = generate_bot_reply(user_text=message.user_text)
+        # 1. Generar análisis (con el contexto acumulado del usuario) y respuesta del bot
+        context = await asyncio.to_thread(context_store.get, int(current_user.id), db)
+        result = await generate_bot_reply_async(user_text=message.user_text, user_context={"context": context})
         meta = result["meta"]
         # 2. Guardar mensajes y análisis en segundo plano
-        def guardar_historial():
-            user_msg = crud.create_message(db, MessageCreate(
-                usuario_id=int(current_user.id),
-                texto=message.user_text,
-                remitente="user"
-            ))
-            crud.create_analysis(db, AnalysisRecord(
-                mensaje_id=int(user_msg.id),  # type: ignore
-                emocion=meta.get("detected_emotion") or "",
-                emocion_score=meta.get("emotion_score") or 0.0,
-                estilo=meta.get("detected_style") or "",
-                estilo_score=meta.get("style_score") or 0.0,
-                prioridad=meta.get("priority") or "",
-                alerta=meta.get("alert") if meta.get("alert") is not None else False,
-                razon_alerta=meta.get("alert_reason") or ""
-            ))
-            bot_msg = crud.create_message(db, MessageCreate(
-                usuario_id=int(current_user.id),
-                texto=result["reply"],
-                remitente="bot"
-            ))
-            crud.create_analysis(db, AnalysisRecord(
-                mensaje_id=int(bot_msg.id),  # type: ignore
-                emocion="",
-                emocion_score=0.0,
-                estilo="",
-                estilo_score=0.0,
-                prioridad="",
-                alerta=False,
-                razon_alerta=""
-            ))
-        background_tasks.add_task(guardar_historial)
+        background_tasks.add_task(save_exchange, db, int(current_user.id), message.user_text, result["reply"], meta)
         # 3. Responder al usuario inmediatamente
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+
+def sse_event(event: str, data) -> str:
+    """Formatea un evento Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream_endpoint(
+    message: ChatMessage,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Variante en streaming de `/chat/` (Server-Sent Events): primero un evento `meta` con el análisis
+    emocional y de estilo, luego un evento `token` por cada fragmento que genera el LLM y al final
+    `done` con la respuesta completa. Los mensajes se guardan al completarse el stream, antes de `done`.
+    """
+    user_id = int(current_user.id)
+
+    async def events():
+        try:
+            context = await asyncio.to_thread(context_store.get, user_id, db)
+            async for item in stream_bot_reply(user_text=message.user_text, user_context={"context": context}):
+                if item["event"] == "done":
+                    result = item["data"]
+                    await asyncio.to_thread(save_exchange, db, user_id, message.user_text, result["reply"], result["meta"])
+                yield sse_event(item["event"], item["data"])
+        except Exception as e:
+            yield sse_event("error", {"error": f"Error interno: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/history", response_model=list[dict], status_code=status.HTTP_200_OK)
 def get_chat_history(
     db: Session = Depends(get_db),
@@ -12,10 +12,14 @@ from app.schemas.tutor import (
     AlertResponse, 
     StudentConversationResponse, 
     InterventionRequest,
-    AlertReviewRequest
+    AlertReviewRequest,
+    AnalysisCorrectionRequest
 )
 from app.api.routes.auth import get_current_user
 from app.db import crud
+from app.models.emotion import model_handle as emotion_model_handle
+from app.models.style import model_handle as style_model_handle
+from app.services.context_state import context_store
 
 router = APIRouter()
 
@@ -263,6 +267,68 @@ def get_student_analysis(
             detail=f"Error al obtener análisis del estudiante: {str(e)}"
         )
 
+@router.get("/student/{student_id}/trajectory")
+def get_student_trajectory(
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(verify_tutor_access)
+):
+    """
+    Trayectoria emocional actual de un estudiante (scores con decaimiento exponencial y riesgo acumulado).
+    Se lee del contexto en memoria; solo si el estudiante no está cargado se consultan sus últimos análisis.
+    Solo para tutores.
+    """
+    student = db.query(Usuario).filter(
+        Usuario.id == student_id,
+        Usuario.rol == RolUsuario.ESTUDIANTE
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Estudiante no encontrado")
+
+    try:
+        return {
+            "student": {
+                "id": student.id,
+                "name": student.nombre or "Estudiante",
+                "email": student.email
+            },
+            "trajectory": context_store.get(student.id, db).trajectory()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al obtener la trayectoria del estudiante: {str(e)}"
+        )
+
+@router.get("/trajectories")
+def get_risk_trajectories(
+    limit: int = 20,
+    hours: int = 24,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(verify_tutor_access)
+):
+    """
+    Estudiantes con mensajes en las últimas `hours` horas ordenados por riesgo acumulado (mayor primero).
+    El riesgo sale del contexto en memoria de cada estudiante; los que no están cargados (p. ej. tras un
+    reinicio) se reconstruyen desde sus últimos análisis, así que el ranking no depende de qué
+    estudiantes escribieron a este proceso. Solo para tutores.
+    """
+    since = datetime.utcnow() - timedelta(hours=hours)
+    students = {student.id: student for student in crud.get_active_students(db, since, limit=context_store.max_users)}
+    ranking = context_store.top_risk(limit, user_ids=list(students), db=db)
+
+    return [
+        {
+            "student": {
+                "id": user_id,
+                "name": students[user_id].nombre or "Estudiante",
+                "email": students[user_id].email
+            },
+            "trajectory": trajectory
+        }
+        for user_id, trajectory in ranking
+    ]
+
 @router.post("/intervene")
 def send_intervention(
     intervention: InterventionRequest,
@@ -339,6 +405,67 @@ def mark_alert_as_reviewed(
             detail=f"Error al marcar alerta como revisada: {str(e)}"
         )
 
+@router.post("/analysis/{analysis_id}/correction")
+def correct_analysis_labels(
+    analysis_id: int,
+    correction: AnalysisCorrectionRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(verify_tutor_access)
+):
+    """
+    Registra la emoción y/o el estilo correctos de un análisis.
+    Las correcciones son los ejemplos etiquetados del aprendizaje en línea.
+    Solo para tutores.
+    """
+    try:
+        analisis = crud.get_analysis(db, analysis_id)
+        if not analisis:
+            raise HTTPException(status_code=404, detail="Análisis no encontrado")
+        
+        requested = [
+            ("emocion", correction.emotion, analisis.emocion, emotion_model_handle),
+            ("estilo", correction.style, analisis.estilo, style_model_handle),
+        ]
+        requested = [item for item in requested if item[1]]
+        if not requested:
+            raise HTTPException(status_code=400, detail="Debe indicar la emoción o el estilo correcto")
+        
+        # Solo etiquetas que el modelo conoce (SGD no admite clases nuevas en partial_fit)
+        for tarea, etiqueta, _, handle in requested:
+            model = handle.get()
+            if model is not None and etiqueta not in set(map(str, model.classes_)):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Etiqueta de {tarea} desconocida: {etiqueta}"
+                )
+        
+        corrections = [
+            crud.create_correction(db, analisis.id, current_user.id, tarea, etiqueta, original)
+            for tarea, etiqueta, original, _ in requested
+        ]
+        
+        return {
+            "success": True,
+            "analysis_id": analisis.id,
+            "corrections": [
+                {
+                    "id": c.id,
+                    "task": c.tarea,
+                    "label": c.etiqueta,
+                    "original_label": c.etiqueta_original
+                }
+                for c in corrections
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al registrar corrección: {str(e)}"
+        )
+
 @router.post("/reports")
 def generate_report(
     start_date: str,
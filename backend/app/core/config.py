@@ -42,12 +42,39 @@ class Settings(BaseSettings):
     # Configuración de modelos ML
     EMOTION_MODEL_PATH: str = "ml_models/emotion_detection/emotion_model.joblib"
     STYLE_MODEL_PATH: str = "ml_models/style_classification/style_model.joblib"
+    MODELS_PRELOAD: bool = True  # Cargar y calentar los modelos en el arranque (si no, en el primer uso)
+    MODEL_RELOAD_INTERVAL: float = 0  # Segundos entre revisiones de cambios en los modelos (0 = sin recarga en caliente)
+    EMOTION_ONLINE_MODEL_PATH: str = "ml_models/emotion_detection/emotion_model_online.joblib"
+    STYLE_ONLINE_MODEL_PATH: str = "ml_models/style_classification/style_model_online.joblib"
+    ONLINE_LEARNING_INTERVAL: float = 0  # Segundos entre actualizaciones con correcciones de tutores (0 = desactivado)
+    ONLINE_LEARNING_BATCH_SIZE: int = 64  # Correcciones por mini-lote de partial_fit
 
     # Configuración de servicios externos
+    LLM_PROVIDER: str = "gemini"  # gemini | openai | openrouter | mock
+    GEMINI_API_KEY: str = ""  # Obligatoria con LLM_PROVIDER=gemini (sin ella se usa "mock"); ver .env.example
+    GEMINI_MODEL: str = "gemini-2.0-flash"
     OPENROUTER_API_KEY: str = ""
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
     MODEL_ID: str = "mistralai/mistral-small-3.2-24b-instruct:free"
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # Cualquier API compatible (vLLM, Ollama, servidor local)
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    LLM_TIMEOUT: float = 30.0  # Segundos máximos por llamada al LLM
+    LLM_CONNECT_TIMEOUT: float = 5.0  # Segundos máximos para abrir la conexión
+    LLM_MAX_CONNECTIONS: int = 100  # Conexiones simultáneas del cliente HTTP compartido
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20  # Conexiones inactivas que se mantienen abiertas
+    LLM_KEEPALIVE_EXPIRY: float = 30.0  # Segundos que una conexión inactiva sigue abierta
+    LLM_HTTP2: bool = True  # HTTP/2 si el paquete h2 está instalado
+    LLM_MAX_RETRIES: int = 2  # Reintentos ante errores de conexión, timeouts y estados 429/5xx
+    LLM_RETRY_BACKOFF: float = 0.5  # Espera (s) antes del primer reintento; se duplica en cada uno
+    LLM_BREAKER_ENABLED: bool = True  # Circuit breaker: respuesta local inmediata si el LLM está caído
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # Fallos seguidos que abren el circuito
+    LLM_BREAKER_RECOVERY_SECONDS: float = 30.0  # Tiempo con el circuito abierto antes de probar de nuevo
+    LLM_BREAKER_HALF_OPEN_CALLS: int = 1  # Llamadas de prueba simultáneas con el circuito semiabierto
+    LLM_MOCK_LATENCY_MS: float = 200.0  # Proveedor "mock": espera hasta el primer fragmento
+    LLM_MOCK_TOKEN_LATENCY_MS: float = 20.0  # Proveedor "mock": espera entre fragmentos del stream
+    LLM_MOCK_FAILURE_RATE: float = 0.0  # Proveedor "mock": probabilidad de fallo (503) por intento
+    LLM_MOCK_SEED: int = 0  # Proveedor "mock": semilla de la secuencia de fallos
     
     # Configuración de rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -62,6 +89,7 @@ class Settings(BaseSettings):
     # Configuración de caché
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 300  # 5 minutos
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 2048  # Entradas de la caché de predicciones
     REDIS_URL: str = ""
     
     # Configuración de notificaciones
@@ -73,9 +101,24 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     
     # Configuración de análisis
-    ANALYSIS_BATCH_SIZE: int = 10
+    ANALYSIS_BATCH_SIZE: int = 10  # Tamaño máximo de micro-lote de inferencia
+    ANALYSIS_BATCH_WINDOW_MS: float = 5.0  # Ventana de espera para formar un micro-lote
+    ANALYSIS_MICROBATCH_ENABLED: bool = False
+    INFERENCE_WORKERS: int = 0  # Procesos de inferencia dedicados (0 = en el proceso de la API)
     ANALYSIS_TIMEOUT: int = 30
+    DISTRIBUTION_TOP_K: int = 0  # Clases guardadas/devueltas por distribución (0 = todas)
+    DISTRIBUTION_MIN_PROB: float = 0.0  # Probabilidad mínima (0-1) para incluir una clase en la distribución
     ENABLE_DEEP_ANALYSIS: bool = True
+    CONTEXT_WINDOW: int = 10  # Mensajes recientes por usuario en el contexto de riesgo acumulado
+    CONTEXT_MAX_USERS: int = 10000  # Usuarios con contexto en memoria (LRU)
+    CONTEXT_HALF_LIFE_MINUTES: float = 60.0  # Vida media del decaimiento de la trayectoria emocional
+    CONTEXT_TTL_SECONDS: float = 30.0  # Caducidad del contexto en caché de cada worker (0 = sin caducidad, solo con un worker)
+    CONTEXT_RISK_HIGH: float = 1.5  # Mensajes de alto riesgo (decaídos) para contexto "alto"
+    CONTEXT_RISK_MEDIUM: float = 0.75  # Mensajes de alto riesgo (decaídos) para contexto "medio"
+    RULES_CONFIG_PATH: str = ""  # Reglas de prioridad y alertas (vacío = app/notifications/rules.json)
+    EARLY_EXIT_ENABLED: bool = True  # Ruta rápida para mensajes claramente neutros/positivos
+    EARLY_EXIT_MIN_EMOTION_SCORE: float = 90.0  # Score (%) mínimo de una emoción que no es de riesgo
+    EARLY_EXIT_MAX_RISK_STYLE_SCORE: float = 40.0  # Probabilidad (%) máxima de cualquier estilo de riesgo
     
     # Configuración de monitoreo
     ENABLE_METRICS: bool = True
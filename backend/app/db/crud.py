@@ -12,7 +12,7 @@ import json
 from app.db import models
 from app.schemas.user import UserCreate, UserUpdate
 from app.schemas.message import MessageCreate
-from app.schemas.analysis_record import AnalysisRecord
+from app.schemas.analysis_record import AnalysisCreate
 from app.core.exceptions import DatabaseError, NotFoundError, ValidationError
 from app.core.logging import logger, log_database_operation
 from passlib.context import CryptContext
@@ -222,7 +222,7 @@ def get_message_count_by_user(db: Session, user_id: int) -> int:
 # ==================== ANÁLISIS ====================
 
 @log_database_operation
-def create_analysis(db: Session, record: AnalysisRecord) -> models.Analisis:
+def create_analysis(db: Session, record: AnalysisCreate) -> models.Analisis:
     """Crea un nuevo análisis."""
     try:
         db_analysis = models.Analisis(**record.model_dump())
@@ -271,6 +271,51 @@ def get_analysis_history(db: Session, user_id: int, limit: int = 10) -> List[mod
         raise DatabaseError("Error al obtener historial de análisis")
 
 
+@log_database_operation
+def get_recent_user_analyses(db: Session, user_id: int, limit: int = 10) -> List[Any]:
+    """
+    Últimos análisis de mensajes del usuario (no del bot) como filas
+    (emocion, emocion_score, estilo, creado_en), en orden cronológico.
+    Se usa para reconstruir el contexto acumulado del usuario.
+    """
+    try:
+        rows = db.query(
+            models.Analisis.emocion, models.Analisis.emocion_score, models.Analisis.estilo, models.Analisis.creado_en
+        ).join(models.Mensaje, models.Analisis.mensaje_id == models.Mensaje.id).filter(
+            models.Mensaje.usuario_id == user_id,
+            models.Mensaje.remitente == "user",
+            models.Analisis.emocion.isnot(None),
+            models.Analisis.emocion != ""
+        ).order_by(desc(models.Analisis.id)).limit(limit).all()
+        return [
+            (emocion, emocion_score or 0.0, estilo or "", creado_en)
+            for emocion, emocion_score, estilo, creado_en in reversed(rows)
+        ]
+    except SQLAlchemyError as e:
+        logger.error("Error al obtener análisis recientes del usuario", error=e, data={"user_id": user_id})
+        raise DatabaseError("Error al obtener análisis recientes")
+
+
+@log_database_operation
+def get_active_students(db: Session, since: datetime, limit: int = 1000) -> List[models.Usuario]:
+    """
+    Estudiantes que enviaron algún mensaje desde `since`, empezando por el de actividad más reciente.
+    Se usa para armar el ranking de riesgo sin depender de qué contextos hay en memoria.
+    """
+    try:
+        last_message = func.max(models.Mensaje.creado_en)
+        return db.query(models.Usuario).join(
+            models.Mensaje, models.Mensaje.usuario_id == models.Usuario.id
+        ).filter(
+            models.Usuario.rol == models.RolUsuario.ESTUDIANTE,
+            models.Mensaje.remitente == "user",
+            models.Mensaje.creado_en >= since
+        ).group_by(models.Usuario.id).order_by(desc(last_message)).limit(limit).all()
+    except SQLAlchemyError as e:
+        logger.error("Error al obtener estudiantes activos", error=e, data={"since": since.isoformat()})
+        raise DatabaseError("Error al obtener estudiantes activos")
+
+
 @log_database_operation
 def get_analyses_with_alerts(db: Session, limit: int = 50) -> List[models.Analisis]:
     """Obtiene análisis con alertas."""
@@ -283,6 +328,64 @@ def get_analyses_with_alerts(db: Session, limit: int = 50) -> List[models.Analis
         raise DatabaseError("Error al obtener análisis con alertas")
 
 
+@log_database_operation
+def get_analysis(db: Session, analisis_id: int) -> Optional[models.Analisis]:
+    """Obtiene un análisis por ID."""
+    try:
+        return db.query(models.Analisis).filter(models.Analisis.id == analisis_id).first()
+    except SQLAlchemyError as e:
+        logger.error("Error al obtener análisis", error=e, data={"analisis_id": analisis_id})
+        raise DatabaseError("Error al obtener análisis")
+
+
+# ==================== CORRECCIONES DE TUTORES ====================
+
+@log_database_operation
+def create_correction(db: Session, analisis_id: int, tutor_id: int, tarea: str, etiqueta: str, etiqueta_original: str = None) -> models.CorreccionAnalisis:
+    """Registra la etiqueta corregida por un tutor para un análisis."""
+    try:
+        db_correction = models.CorreccionAnalisis(
+            analisis_id=analisis_id,
+            tutor_id=tutor_id,
+            tarea=tarea,
+            etiqueta=etiqueta,
+            etiqueta_original=etiqueta_original
+        )
+        db.add(db_correction)
+        db.commit()
+        db.refresh(db_correction)
+        logger.info("Corrección registrada", data={"correction_id": db_correction.id, "analisis_id": analisis_id, "tarea": tarea})
+        return db_correction
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Error al registrar corrección", error=e, data={"analisis_id": analisis_id})
+        raise DatabaseError("Error al registrar corrección")
+
+
+@log_database_operation
+def get_corrections_since(db: Session, tarea: str, after_id: int = 0, limit: int = 100) -> List[Any]:
+    """
+    Obtiene las correcciones de una tarea posteriores a `after_id`, en orden de llegada,
+    como filas (id, texto del mensaje, etiqueta) listas para entrenar.
+    """
+    try:
+        return db.query(
+            models.CorreccionAnalisis.id,
+            models.Mensaje.texto,
+            models.CorreccionAnalisis.etiqueta
+        ).join(
+            models.Analisis, models.CorreccionAnalisis.analisis_id == models.Analisis.id
+        ).join(
+            models.Mensaje, models.Analisis.mensaje_id == models.Mensaje.id
+        ).filter(
+            models.CorreccionAnalisis.tarea == tarea,
+            models.CorreccionAnalisis.id > after_id
+        ).order_by(asc(models.CorreccionAnalisis.id)).limit(limit).all()
+    except SQLAlchemyError as e:
+        logger.error("Error al obtener correcciones", error=e, data={"tarea": tarea, "after_id": after_id})
+        raise DatabaseError("Error al obtener correcciones")
+
+
 # ==================== NOTIFICACIONES ====================
 
 @log_database_operation
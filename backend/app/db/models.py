@@ -140,6 +140,7 @@ class Analisis(Base):
     # Relaciones
     mensaje = relationship("Mensaje", back_populates="analisis")
     usuario = relationship("Usuario", back_populates="analisis")
+    correcciones = relationship("CorreccionAnalisis", back_populates="analisis", cascade="all, delete-orphan")
     
     # Índices
     __table_args__ = (
@@ -152,6 +153,37 @@ class Analisis(Base):
     )
 
 
+class CorreccionAnalisis(Base):
+    """
+    Tabla de etiquetas corregidas por tutores sobre un análisis.
+    Cada fila es un ejemplo etiquetado (texto del mensaje + etiqueta) para el aprendizaje en línea;
+    las correcciones no se editan: una nueva corrección del mismo análisis es una fila nueva.
+    """
+    __tablename__ = "correcciones_analisis"
+
+    id = Column(Integer, primary_key=True, index=True)
+    analisis_id = Column(Integer, ForeignKey("analisis.id"), nullable=False)
+    tutor_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    
+    # Etiqueta corregida
+    tarea = Column(String(20), nullable=False)  # emocion, estilo
+    etiqueta = Column(String(100), nullable=False)
+    etiqueta_original = Column(String(100), nullable=True)  # Predicción del modelo al momento de corregir
+    
+    # Timestamps
+    creado_en = Column(DateTime, default=func.now(), nullable=False)
+    
+    # Relaciones
+    analisis = relationship("Analisis", back_populates="correcciones")
+    tutor = relationship("Usuario")
+    
+    # Índices
+    __table_args__ = (
+        Index('idx_correccion_analisis', 'analisis_id'),
+        Index('idx_correccion_tarea', 'tarea', 'id'),
+    )
+
+
 class Notificacion(Base):
     """
     Tabla de notificaciones del sistema.
@@ -3,6 +3,7 @@ Archivo principal de arranque para la API de PsiChat.
 Incluye configuración de CORS, middleware, manejo de errores y logging.
 """
 
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
@@ -16,6 +17,12 @@ from app.api.routes import auth, chat, analysis, tutor
 from app.core.config import settings
 from app.core.logging import logger, performance_logger
 from app.core.exceptions import PsiChatException, handle_psichat_exception, handle_generic_exception
+from app.services.analysis_service import classify_pairs, set_inference_backend
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.inference_pool import ProcessInferencePool
+from app.models.registry import ModelWatcher, registry as model_registry
+from app.services.online_learning import OnlineLearningJob, default_learners
+from app.services.llm_client import start_http_client, close_http_client
 
 
 @asynccontextmanager
@@ -27,6 +34,50 @@ async def lifespan(app: FastAPI):
     logger.info(f"Debug: {settings.DEBUG}")
     logger.info(f"Base de datos: {settings.DATABASE_URL}")
     
+    # Cargar y calentar los modelos antes de recibir tráfico (si no, se cargan en el primer uso)
+    if settings.MODELS_PRELOAD:
+        await asyncio.to_thread(model_registry.load_all)
+    
+    # Recarga en caliente de los modelos al reentrenarlos
+    watcher = None
+    if settings.MODEL_RELOAD_INTERVAL > 0:
+        watcher = ModelWatcher(model_registry, interval=settings.MODEL_RELOAD_INTERVAL)
+        watcher.start()
+    
+    # Actualización en línea de los modelos con las correcciones de los tutores
+    online_job = None
+    if settings.ONLINE_LEARNING_INTERVAL > 0:
+        from app.db.session import SessionLocal
+        
+        online_job = OnlineLearningJob(
+            default_learners(settings.ONLINE_LEARNING_BATCH_SIZE),
+            SessionLocal,
+            interval=settings.ONLINE_LEARNING_INTERVAL,
+            model_registry=model_registry
+        )
+        online_job.start()
+    
+    # Pool de procesos para la inferencia de emoción y estilo
+    pool = None
+    if settings.INFERENCE_WORKERS > 0:
+        pool = ProcessInferencePool(workers=settings.INFERENCE_WORKERS)
+        pool.start()
+        set_inference_backend(pool)
+    
+    # Planificador de micro-lotes (alimenta al pool si está activo)
+    scheduler = None
+    if settings.ANALYSIS_MICROBATCH_ENABLED:
+        scheduler = InferenceScheduler(
+            pool.predict_batch if pool is not None else classify_pairs,
+            max_batch_size=settings.ANALYSIS_BATCH_SIZE,
+            window_ms=settings.ANALYSIS_BATCH_WINDOW_MS
+        )
+        scheduler.start()
+        set_inference_backend(scheduler)
+    
+    # Cliente HTTP compartido para las llamadas al LLM
+    await start_http_client()
+    
     # Crear métricas de inicio
     # try:
     #     from app.db.session import SessionLocal
@@ -49,6 +100,16 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Cerrando PsiChat Backend...")
+    set_inference_backend(None)
+    if online_job is not None:
+        online_job.stop()
+    if watcher is not None:
+        watcher.stop()
+    if scheduler is not None:
+        scheduler.shutdown()
+    if pool is not None:
+        pool.shutdown()
+    await close_http_client()
 
 
 # Crear la aplicación FastAPI
@@ -228,17 +289,11 @@ async def health_check():
     """Endpoint de health check para monitoreo."""
     try:
         # Verificar conexión a base de datos
+        from sqlalchemy import text
         from app.db.session import SessionLocal
         db = SessionLocal()
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db.close()
-        
-        return {
-            "status": "healthy",
-            "timestamp": time.time(),
-            "database": "connected",
-            "version": settings.APP_VERSION
-        }
     except Exception as e:
         logger.error("Health check falló", error=e)
         return JSONResponse(
@@ -250,6 +305,28 @@ async def health_check():
                 "error": str(e)
             }
         )
+    
+    # Solo se recibe tráfico cuando los modelos están cargados y calientes
+    models = model_registry.status()
+    models_ready = models["ready"] if settings.MODELS_PRELOAD else not model_registry.failed
+    if not models_ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting" if not model_registry.failed else "unhealthy",
+                "timestamp": time.time(),
+                "database": "connected",
+                "models": models
+            }
+        )
+    
+    return {
+        "status": "healthy",
+        "timestamp": time.time(),
+        "database": "connected",
+        "models": models,
+        "version": settings.APP_VERSION
+    }
 
 
 # Ruta de información del sistema
@@ -286,6 +363,10 @@ async def get_metrics():
     try:
         from app.db.session import SessionLocal
         from app.db.models import Metricas
+        from app.services.analysis_service import get_cache_stats, get_fast_path_stats, get_inference_stats
+        from app.services.context_state import context_store
+        from app.services.llm_client import http_client_stats
+        from app.services.llm_providers import get_breaker, get_provider
         
         db = SessionLocal()
         metrics = db.query(Metricas).order_by(Metricas.creado_en.desc()).limit(50).all()
@@ -302,7 +383,14 @@ async def get_metrics():
                     "creado_en": m.creado_en.isoformat()
                 }
                 for m in metrics
-            ]
+            ],
+            "analysis_cache": get_cache_stats(),
+            "inference": get_inference_stats(),
+            "fast_path": get_fast_path_stats(),
+            "user_context": context_store.stats(),
+            "llm_client": http_client_stats(),
+            "llm_provider": get_provider().stats(),
+            "llm_breaker": get_breaker().stats() if get_breaker() is not None else None
         }
     except Exception as e:
         logger.error("Error obteniendo métricas", error=e)
@@ -0,0 +1,398 @@
+# backend/app/models/compiled.py
+
+"""
+Scorer compilado para los pipelines TF-IDF + LogisticRegression.
+Reproduce `predict_proba` con NumPy/SciPy a partir de un artefacto compacto (vocabulario, idf y
+coeficientes), sin pasar por la validación genérica de scikit-learn ni importarlo en tiempo de ejecución.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from app.core.logging import logger
+from app.models.normalization import normalize_text
+
+# Versión del formato del artefacto compilado
+FORMAT_VERSION = 1
+
+
+def compiled_path_for(model_path: Path) -> Path:
+    """Ruta del artefacto compilado junto al modelo joblib (`emotion_model.joblib` -> `emotion_model.npz`)."""
+    return Path(model_path).with_suffix(".npz")
+
+
+def shared_path_for(model_path: Path) -> Path:
+    """Directorio del artefacto compartido (mmap) junto al modelo joblib (`emotion_model.shared/`)."""
+    return Path(model_path).with_suffix(".shared")
+
+
+def _save_array_atomic(path: Path, array: np.ndarray) -> None:
+    """
+    Escribe un `.npy` en un archivo temporal y lo renombra, para no truncar el archivo
+    que otros procesos puedan tener mapeado en memoria.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+def _expit(scores: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-scores))
+
+
+def linear_probabilities(scores: np.ndarray, probability: str) -> np.ndarray:
+    """Probabilidades a partir de los scores lineales, como `LogisticRegression.predict_proba`."""
+    if scores.shape[1] == 1:
+        positive = _expit(scores[:, 0])
+        return np.column_stack([1.0 - positive, positive])
+    if probability == "softmax":
+        return _softmax(scores)
+    probas = _expit(scores)
+    probas /= probas.sum(axis=1, keepdims=True)
+    return probas
+
+
+def _compiled_class(params: Dict[str, Any], default: type) -> type:
+    """Clase del artefacto: los modelos multitarea guardan sus cabezas en `params["heads"]`."""
+    if params.get("heads"):
+        from app.models.multitask import CompiledMultiTaskClassifier
+        return CompiledMultiTaskClassifier
+    return default
+
+
+class CompiledTextClassifier:
+    """
+    Clasificador de texto compilado con la misma interfaz mínima que el pipeline (`predict_proba`, `predict`, `classes_`).
+
+    Attributes:
+        vocabulary (Dict[str, int]): Término -> columna.
+        idf (Optional[np.ndarray]): Vector idf (None si el vectorizador no usa idf).
+        coef (np.ndarray): Matriz de coeficientes (n_clases_modelo, n_términos).
+        intercept (np.ndarray): Interceptos.
+        classes_ (np.ndarray): Etiquetas.
+        params (Dict[str, Any]): Parámetros del vectorizador y del modo de probabilidad.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: Optional[np.ndarray], coef: np.ndarray,
+                 intercept: np.ndarray, classes: np.ndarray, params: Dict[str, Any]):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.coef_t = np.ascontiguousarray(coef.T)
+        self.intercept = intercept
+        self.classes_ = classes
+        self.params = params
+        self._token_re = re.compile(params["token_pattern"])
+        self._ngram_range = tuple(params["ngram_range"])
+        self._normalize = params.get("preprocessor") == "normalize_text"
+
+    # --- Vectorización ---
+
+    def _analyze(self, text: str) -> List[str]:
+        """Tokenización equivalente al analizador 'word' de scikit-learn."""
+        if self._normalize:
+            # Con preprocessor, scikit-learn ignora lowercase y strip_accents
+            text = normalize_text(text)
+        elif self.params["lowercase"]:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+
+        min_n, max_n = self._ngram_range
+        if max_n == 1:
+            return tokens
+
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        for n in range(min_n, min(max_n + 1, len(original) + 1)):
+            for i in range(len(original) - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    def transform(self, texts: Sequence[str]) -> csr_matrix:
+        """Matriz TF-IDF normalizada (una fila por texto)."""
+        vocabulary = self.vocabulary
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        for text in texts:
+            features = Counter(
+                vocabulary[token] for token in self._analyze(text) if token in vocabulary
+            )
+            indices.extend(features.keys())
+            counts.extend(features.values())
+            indptr.append(len(indices))
+
+        data = np.asarray(counts, dtype=np.float64)
+        indices_arr = np.asarray(indices, dtype=np.int32)
+        indptr_arr = np.asarray(indptr, dtype=np.int32)
+
+        if self.params["binary"]:
+            data[:] = 1.0
+        elif self.params["sublinear_tf"]:
+            np.log(data, out=data)
+            data += 1.0
+        if self.idf is not None:
+            data *= self.idf[indices_arr]
+
+        norm = self.params["norm"]
+        if norm and data.size:
+            rows = np.repeat(np.arange(len(texts)), np.diff(indptr_arr))
+            if norm == "l2":
+                totals = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(texts)))
+            else:
+                totals = np.bincount(rows, weights=np.abs(data), minlength=len(texts))
+            totals[totals == 0.0] = 1.0
+            data /= totals[rows]
+
+        return csr_matrix((data, indices_arr, indptr_arr), shape=(len(texts), len(vocabulary)))
+
+    # --- Clasificación ---
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        scores = self.transform(texts) @ self.coef_t
+        return np.asarray(scores) + self.intercept
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidades por clase, equivalentes a `LogisticRegression.predict_proba`."""
+        return linear_probabilities(self.decision_function(texts), self.params["probability"])
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(texts), axis=1)]
+
+    def __bool__(self) -> bool:
+        return True
+
+    # --- Persistencia ---
+
+    def save(self, path: Path) -> Path:
+        """Guarda el artefacto en un `.npz` comprimido (sin objetos pickle)."""
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, index in self.vocabulary.items():
+            terms[index] = term
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                terms=terms.astype(str),
+                idf=self.idf if self.idf is not None else np.empty(0),
+                coef=self.coef_t.T,
+                intercept=self.intercept,
+                classes=self.classes_.astype(str),
+                params=np.array(json.dumps(self.params)),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledTextClassifier":
+        """Carga un artefacto `.npz` generado por `save`."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            params = json.loads(str(data["params"]))
+            if params.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Formato de modelo compilado no soportado: {params.get('format_version')}")
+            terms = data["terms"].tolist()
+            idf = data["idf"] if params["use_idf"] else None
+            return _compiled_class(params, cls)(
+                vocabulary={term: i for i, term in enumerate(terms)},
+                idf=idf,
+                coef=data["coef"],
+                intercept=data["intercept"],
+                classes=data["classes"].astype(object),
+                params=params,
+            )
+
+    def save_shared(self, directory: Path) -> Path:
+        """
+        Guarda el artefacto en formato compartido: los arreglos grandes (coeficientes, idf) como `.npy`
+        sin comprimir para cargarlos con `mmap_mode`, y el resto en `meta.json`.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        terms = [""] * len(self.vocabulary)
+        for term, index in self.vocabulary.items():
+            terms[index] = term
+
+        # Se guarda la traspuesta contigua que usa el producto disperso, para no copiarla al cargar
+        _save_array_atomic(directory / "coef_t.npy", self.coef_t)
+        _save_array_atomic(directory / "intercept.npy", self.intercept)
+        if self.idf is not None:
+            _save_array_atomic(directory / "idf.npy", self.idf)
+        # meta.json se escribe al final: marca el artefacto como completo
+        meta = {"params": self.params, "classes": [str(c) for c in self.classes_], "terms": terms}
+        tmp_meta = directory / "meta.json.tmp"
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, directory / "meta.json")
+        return directory
+
+    @classmethod
+    def load_shared(cls, directory: Path, mmap: bool = True) -> "CompiledTextClassifier":
+        """
+        Carga un artefacto compartido. Con `mmap=True` los arreglos quedan mapeados en memoria
+        (solo lectura), de modo que el sistema operativo comparte sus páginas entre workers.
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        params = meta["params"]
+        if params.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Formato de modelo compilado no soportado: {params.get('format_version')}")
+
+        mmap_mode = "r" if mmap else None
+        coef_t = np.load(directory / "coef_t.npy", mmap_mode=mmap_mode)
+        return _compiled_class(params, cls)(
+            vocabulary={term: i for i, term in enumerate(meta["terms"])},
+            idf=np.load(directory / "idf.npy", mmap_mode=mmap_mode) if params["use_idf"] else None,
+            coef=coef_t.T,
+            intercept=np.load(directory / "intercept.npy"),
+            classes=np.array(meta["classes"], dtype=object),
+            params=params,
+        )
+
+
+def vectorizer_params(vectorizer: Any) -> Dict[str, Any]:
+    """Valida el `TfidfVectorizer` ajustado y devuelve los parámetros que reproduce el scorer."""
+    if type(vectorizer).__name__ != "TfidfVectorizer":
+        raise ValueError(f"Vectorizador no soportado: {type(vectorizer).__name__}")
+    unsupported = {
+        "analyzer": vectorizer.analyzer != "word",
+        # El único preprocesador reproducible es la normalización compartida
+        "preprocessor": vectorizer.preprocessor not in (None, normalize_text),
+        "tokenizer": vectorizer.tokenizer is not None,
+        "strip_accents": vectorizer.strip_accents is not None,
+        "stop_words": vectorizer.stop_words is not None,
+    }
+    invalid = [name for name, flag in unsupported.items() if flag]
+    if invalid:
+        raise ValueError(f"Opciones del vectorizador no soportadas: {', '.join(invalid)}")
+
+    return {
+        "format_version": FORMAT_VERSION,
+        "token_pattern": vectorizer.token_pattern,
+        "lowercase": bool(vectorizer.lowercase),
+        "ngram_range": list(vectorizer.ngram_range),
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "use_idf": bool(vectorizer.use_idf),
+        "norm": vectorizer.norm,
+        "preprocessor": "normalize_text" if vectorizer.preprocessor is normalize_text else None,
+    }
+
+
+def probability_mode(classifier: Any) -> str:
+    """Modo de probabilidad del clasificador lineal: "softmax" (multinomial) u "ovr"."""
+    if not hasattr(classifier, "coef_") or not hasattr(classifier, "predict_proba"):
+        raise ValueError(f"Clasificador no soportado: {type(classifier).__name__}")
+    multi_class = getattr(classifier, "multi_class", "auto")
+    ovr = multi_class in ("ovr", "warn") or getattr(classifier, "solver", "") == "liblinear"
+    return "ovr" if ovr else "softmax"
+
+
+def compile_pipeline(pipeline: Any, source_version: str = "") -> CompiledTextClassifier:
+    """
+    Compila un pipeline `TfidfVectorizer` + `LogisticRegression` ajustado.
+
+    Args:
+        pipeline: Pipeline scikit-learn entrenado.
+        source_version (str): Versión del joblib de origen (para detectar artefactos desactualizados).
+    Returns:
+        CompiledTextClassifier: Scorer equivalente.
+    Raises:
+        ValueError: Si el pipeline usa componentes que el scorer no reproduce.
+    """
+    steps = [step for _, step in pipeline.steps]
+    if len(steps) != 2:
+        raise ValueError("Solo se soportan pipelines de dos pasos (vectorizador + clasificador)")
+    vectorizer, classifier = steps
+
+    params = vectorizer_params(vectorizer)
+    params["probability"] = probability_mode(classifier)
+    params["source_version"] = source_version
+    return CompiledTextClassifier(
+        vocabulary={term: int(i) for term, i in vectorizer.vocabulary_.items()},
+        idf=np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else None,
+        coef=np.asarray(classifier.coef_, dtype=np.float64),
+        intercept=np.asarray(classifier.intercept_, dtype=np.float64),
+        classes=np.asarray(classifier.classes_, dtype=object),
+        params=params,
+    )
+
+
+def compare_with_pipeline(compiled: CompiledTextClassifier, pipeline: Any, texts: Sequence[str]) -> Dict[str, Any]:
+    """
+    Compara las probabilidades del scorer compilado con las del pipeline original.
+
+    Returns:
+        dict con la diferencia absoluta máxima y la concordancia de etiquetas.
+    """
+    expected = pipeline.predict_proba(list(texts))
+    actual = compiled.predict_proba(list(texts))
+    return {
+        "texts": len(texts),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))) if len(texts) else 0.0,
+        "label_agreement": float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1))) if len(texts) else 1.0,
+        "classes_match": list(map(str, pipeline.classes_)) == list(map(str, compiled.classes_)),
+    }
+
+
+def load_text_classifier(model_path: Path, prefer_compiled: bool = True, mmap: bool = True) -> Tuple[Any, str]:
+    """
+    Carga el clasificador de `model_path`, usando un artefacto compilado si existe y corresponde al joblib.
+
+    Orden de preferencia: artefacto compartido (`.shared/`, mapeado en memoria si `mmap`),
+    artefacto `.npz` y, por último, el pipeline joblib.
+
+    Args:
+        model_path (Path): Ruta al pipeline joblib.
+        prefer_compiled (bool): Si es False se carga siempre el pipeline scikit-learn.
+        mmap (bool): Mapear en memoria los arreglos grandes (artefacto compartido y joblib sin comprimir).
+    Returns:
+        Tuple[modelo, versión]: El modelo cargado y la versión del joblib de origen.
+    """
+    from app.models.prediction import model_file_version
+
+    model_path = Path(model_path)
+    version = model_file_version(model_path)
+
+    candidates = []
+    if prefer_compiled:
+        shared_path = shared_path_for(model_path)
+        if mmap and (shared_path / "meta.json").exists():
+            candidates.append((shared_path, lambda: CompiledTextClassifier.load_shared(shared_path, mmap=True)))
+        compiled_path = compiled_path_for(model_path)
+        if compiled_path.exists():
+            candidates.append((compiled_path, lambda: CompiledTextClassifier.load(compiled_path)))
+
+    for path, loader in candidates:
+        compiled = loader()
+        source_version = compiled.params.get("source_version", "")
+        if version == "sin-modelo" or source_version == version:
+            return compiled, source_version
+        logger.warning("Modelo compilado desactualizado; se usa el joblib", data={
+            "compiled": str(path),
+            "model": str(model_path),
+            "source_version": source_version,
+            "version": version
+        })
+
+    import joblib
+
+    # joblib solo mapea arreglos de volcados sin comprimir (el formato por defecto de train.py)
+    return joblib.load(model_path, mmap_mode="r" if mmap else None), version
@@ -1,25 +1,58 @@
 # backend/app/models/emotion.py
 
 """
-Cargador y predictor de emociones desde texto, usando un modelo scikit-learn exportado (joblib).
+Cargador y predictor de emociones desde texto, usando un modelo scikit-learn exportado (joblib)
+o su versión compilada a NumPy (ver `ml_models/compile_models.py`).
 """
 
 import os
 from pathlib import Path
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Sequence
 from datetime import datetime
 
-import joblib
+from app.models.registry import ModelHandle, TaskHandle, registry
+from app.models import multitask
+from app.models.prediction import Prediction, predict_text, predict_texts
 
 # Ruta al modelo entrenado
 MODEL_PATH = Path(os.environ.get("EMOTION_MODEL_PATH", "ml_models/emotion_detection/emotion_model.joblib"))
 
-# Cargar modelo al inicio
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception as e:
-    print(f"[WARN] No se pudo cargar el modelo de emoción: {e}")
-    model = None
+# Usar el scorer compilado (NumPy) cuando exista junto al joblib
+USE_COMPILED = os.environ.get("USE_COMPILED_MODELS", "true").lower() in ("1", "true", "yes")
+
+# Mapear en memoria los arreglos del modelo para compartir páginas entre workers
+USE_MMAP = os.environ.get("MODEL_MMAP", "true").lower() in ("1", "true", "yes")
+
+# Modelo registrado con carga diferida (se carga en el primer uso o en el arranque de la API)
+# Con USE_MULTITASK_MODEL la cabeza de emoción del modelo multitarea reemplaza al pipeline propio
+if multitask.USE_MULTITASK:
+    model_handle = TaskHandle(multitask.model_handle, "emotion")
+else:
+    model_handle = registry.register(ModelHandle("emotion", MODEL_PATH, prefer_compiled=USE_COMPILED, mmap=USE_MMAP))
+
+def get_emotion_prediction(text: str) -> Prediction:
+    """
+    Clasifica el texto con una sola pasada del modelo de emoción.
+    
+    Args:
+        text (str): Texto de entrada.
+    Returns:
+        Prediction: Emoción dominante, score% y distribución completa.
+    """
+    model, version = model_handle.snapshot()
+    return predict_text(model, text, version=version)
+
+def predict_emotions_batch(texts: Sequence[str]) -> List[Prediction]:
+    """
+    Clasifica una lista de textos con una sola llamada `transform` + `predict_proba` del modelo de emoción.
+    
+    Args:
+        texts (Sequence[str]): Textos de entrada.
+    Returns:
+        List[Prediction]: Una predicción por texto, en el mismo orden.
+    """
+    model, version = model_handle.snapshot()
+    return predict_texts(model, texts, version=version)
 
 def predict_emotion(text: str) -> Tuple[str, float]:
     """
@@ -30,29 +63,23 @@ def predict_emotion(text: str) -> Tuple[str, float]:
     Returns:
         Tuple[str, float]: (emoción_predicha, score en porcentaje)
     """
-    if not model or not text.strip():
-        return "neutro", 0.0
-
-    pred = model.predict([text])[0]
-    proba = round(max(model.predict_proba([text])[0]) * 100, 2)
-    return pred, proba
+    return get_emotion_prediction(text).as_tuple()
 
-def predict_all_emotions(text: str) -> List[Tuple[str, float]]:
+def predict_all_emotions(text: str, top_k: Optional[int] = None, min_prob: float = 0.0) -> List[Tuple[str, float]]:
     """
     Retorna todas las emociones posibles con sus probabilidades en porcentaje, ordenadas de mayor a menor.
     
     Args:
         text (str): Texto de entrada.
+        top_k (Optional[int]): Devolver solo las k clases más probables (None = todas).
+        min_prob (float): Omitir clases con probabilidad (0-1) menor a este valor.
     Returns:
         List[Tuple[str, float]]: Lista de (emoción, score%) ordenada.
     """
-    if not model or not text.strip():
-        return [("neutro", 0.0)]
+    return get_emotion_prediction(text).top(top_k, min_prob)
 
-    probas = model.predict_proba([text])[0]
-    emotions = model.classes_
-    scores = list(zip(emotions, [round(p * 100, 2) for p in probas]))
-    return sorted(scores, key=lambda x: x[1], reverse=True)
+# Respuesta empática genérica, sin LLM
+EMPATHETIC_REPLY = "Gracias por compartir cómo te sientes. Estoy aquí para ayudarte."
 
 def generate_reply(user_text: str) -> Dict:
     """
@@ -63,18 +90,17 @@ def generate_reply(user_text: str) -> Dict:
     Returns:
         Diccionario con la respuesta y metadatos emocionales
     """
-    emotion, score = predict_emotion(user_text)
-    all_emotions = predict_all_emotions(user_text)
+    prediction = get_emotion_prediction(user_text)
 
-    reply = "Gracias por compartir cómo te sientes. Estoy aquí para ayudarte."  # Placeholder empático
+    reply = EMPATHETIC_REPLY  # Placeholder empático
 
     return {
         "reply": reply,
         "meta": {
             "timestamp": datetime.utcnow().isoformat(),
-            "dominant_emotion": emotion,
-            "emotion_score_percent": score,
-            "all_emotions_percent": all_emotions,
+            "dominant_emotion": prediction.label,
+            "emotion_score_percent": prediction.score,
+            "all_emotions_percent": prediction.distribution,
             "info": "Respuesta generada con análisis emocional automático."
         }
     }
@@ -89,8 +115,9 @@ if __name__ == "__main__":
     ]
 
     for txt in textos:
-        dominant, score = predict_emotion(txt)
-        all_probs = predict_all_emotions(txt)
+        prediction = get_emotion_prediction(txt)
+        dominant, score = prediction.as_tuple()
+        all_probs = prediction.distribution
 
         print(f"\nTexto: {txt}")
         print(f"  ➤ Emoción dominante: {dominant} (score={score:.2f}%)")
@@ -0,0 +1,206 @@
+# backend/app/models/multitask.py
+
+"""
+Modelo multitarea: un único vectorizador TF-IDF compartido que alimenta una cabeza lineal por tarea
+(emoción y estilo). Cada texto se tokeniza y vectoriza una sola vez por solicitud, y el vocabulario
+y el idf se cargan una sola vez en memoria.
+
+Se entrena con `ml_models/multitask/train.py` a partir de ambos CSV y se compila al formato NumPy de
+`app.models.compiled` (las cabezas se guardan concatenadas en los mismos arreglos `coef`/`intercept`).
+Se activa con `USE_MULTITASK_MODEL=true`: `predict_emotion`/`predict_style` mantienen su interfaz y
+leen de la cabeza correspondiente.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.compiled import CompiledTextClassifier, linear_probabilities, probability_mode, vectorizer_params
+from app.models.prediction import Prediction
+from app.models.registry import ModelHandle, registry
+
+# Ruta al modelo multitarea entrenado
+MODEL_PATH = Path(os.environ.get("MULTITASK_MODEL_PATH", "ml_models/multitask/multitask_model.joblib"))
+
+# Servir emoción y estilo desde el modelo multitarea en lugar de los dos pipelines
+USE_MULTITASK = os.environ.get("USE_MULTITASK_MODEL", "false").lower() in ("1", "true", "yes")
+
+# Mismas opciones de carga que los modelos separados (artefacto compilado y mmap)
+USE_COMPILED = os.environ.get("USE_COMPILED_MODELS", "true").lower() in ("1", "true", "yes")
+USE_MMAP = os.environ.get("MODEL_MMAP", "true").lower() in ("1", "true", "yes")
+
+TASKS = ("emotion", "style")
+
+
+class TaskHead:
+    """
+    Vista de una tarea del modelo multitarea con la interfaz de un pipeline (`predict_proba`, `classes_`),
+    para usarla con `predict_text`/`predict_texts`.
+    """
+
+    def __init__(self, model: Any, task: str):
+        self.model = model
+        self.task = task
+        self.classes_ = model.classes_for(task)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.predict_proba_task(texts, self.task)
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(texts), axis=1)]
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class MultiTaskTextClassifier:
+    """
+    Modelo multitarea scikit-learn (artefacto de entrenamiento).
+
+    Attributes:
+        vectorizer: `TfidfVectorizer` ajustado sobre los textos de todas las tareas.
+        heads (Dict[str, Any]): Tarea -> clasificador lineal ajustado sobre la salida del vectorizador.
+    """
+
+    def __init__(self, vectorizer: Any, heads: Dict[str, Any]):
+        self.vectorizer = vectorizer
+        self.heads = dict(heads)
+
+    @property
+    def tasks(self) -> List[str]:
+        return list(self.heads)
+
+    @property
+    def classes_(self) -> np.ndarray:
+        """Etiquetas de todas las cabezas concatenadas (en el orden de `predict_proba`)."""
+        return np.concatenate([np.asarray(self.heads[task].classes_, dtype=object) for task in self.heads])
+
+    def classes_for(self, task: str) -> np.ndarray:
+        return np.asarray(self.heads[task].classes_, dtype=object)
+
+    def head(self, task: str) -> TaskHead:
+        return TaskHead(self, task)
+
+    def predict_proba_task(self, texts: Sequence[str], task: str) -> np.ndarray:
+        return self.heads[task].predict_proba(self.vectorizer.transform(texts))
+
+    def predict_proba_all(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Probabilidades de todas las tareas con una sola vectorización."""
+        X = self.vectorizer.transform(texts)
+        return {task: head.predict_proba(X) for task, head in self.heads.items()}
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidades de todas las cabezas concatenadas, en el orden de `classes_`."""
+        return np.hstack(list(self.predict_proba_all(texts).values()))
+
+
+class CompiledMultiTaskClassifier(CompiledTextClassifier):
+    """
+    Versión compilada: vocabulario e idf compartidos y las cabezas concatenadas en `coef`/`intercept`.
+    `params["heads"]` guarda para cada tarea sus rangos de filas de coeficientes y de clases.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._heads = {
+            head["task"]: (slice(*head["coef"]), slice(*head["classes"]), head["probability"])
+            for head in self.params["heads"]
+        }
+        self._views = {task: TaskHead(self, task) for task in self._heads}
+
+    @property
+    def tasks(self) -> List[str]:
+        return list(self._heads)
+
+    def classes_for(self, task: str) -> np.ndarray:
+        return self.classes_[self._heads[task][1]]
+
+    def head(self, task: str) -> TaskHead:
+        return self._views[task]
+
+    def _task_probabilities(self, X: Any, task: str) -> np.ndarray:
+        coef, _, probability = self._heads[task]
+        scores = np.asarray(X @ self.coef_t[:, coef]) + self.intercept[coef]
+        return linear_probabilities(scores, probability)
+
+    def predict_proba_task(self, texts: Sequence[str], task: str) -> np.ndarray:
+        return self._task_probabilities(self.transform(texts), task)
+
+    def predict_proba_all(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Probabilidades de todas las tareas con una sola tokenización y vectorización."""
+        X = self.transform(texts)
+        return {task: self._task_probabilities(X, task) for task in self._heads}
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidades de todas las cabezas concatenadas, en el orden de `classes_`."""
+        return np.hstack(list(self.predict_proba_all(texts).values()))
+
+
+def compile_multitask(model: MultiTaskTextClassifier, source_version: str = "") -> CompiledMultiTaskClassifier:
+    """
+    Compila un `MultiTaskTextClassifier` ajustado (vectorizador TF-IDF + cabezas LogisticRegression).
+
+    Raises:
+        ValueError: Si el vectorizador o alguna cabeza usa componentes que el scorer no reproduce.
+    """
+    vectorizer = model.vectorizer
+    params = vectorizer_params(vectorizer)
+    params["probability"] = "multitask"
+    params["source_version"] = source_version
+
+    heads, coefs, intercepts, classes = [], [], [], []
+    coef_start = class_start = 0
+    for task, classifier in model.heads.items():
+        coef = np.asarray(classifier.coef_, dtype=np.float64)
+        heads.append({
+            "task": task,
+            "coef": [coef_start, coef_start + coef.shape[0]],
+            "classes": [class_start, class_start + len(classifier.classes_)],
+            "probability": probability_mode(classifier),
+        })
+        coefs.append(coef)
+        intercepts.append(np.asarray(classifier.intercept_, dtype=np.float64))
+        classes.extend(classifier.classes_)
+        coef_start += coef.shape[0]
+        class_start += len(classifier.classes_)
+    params["heads"] = heads
+
+    return CompiledMultiTaskClassifier(
+        vocabulary={term: int(i) for term, i in vectorizer.vocabulary_.items()},
+        idf=np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else None,
+        coef=np.vstack(coefs),
+        intercept=np.concatenate(intercepts),
+        classes=np.asarray(classes, dtype=object),
+        params=params,
+    )
+
+
+# Modelo registrado solo si está activo (si no, emoción y estilo usan sus propios pipelines)
+model_handle: Optional[ModelHandle] = (
+    registry.register(ModelHandle("multitask", MODEL_PATH, prefer_compiled=USE_COMPILED, mmap=USE_MMAP)) if USE_MULTITASK else None
+)
+
+
+def predict_pairs_batch(texts: Sequence[str]) -> List[Tuple[Prediction, Prediction]]:
+    """
+    Emoción y estilo de varios textos con una sola vectorización compartida.
+
+    Returns:
+        List[Tuple[Prediction, Prediction]]: (emoción, estilo) por texto, en el mismo orden.
+    """
+    model, version = model_handle.snapshot()
+    pairs = [(Prediction.empty(version=version), Prediction.empty(version=version)) for _ in texts]
+    indices = [i for i, text in enumerate(texts) if text.strip()]
+    if not model or not indices:
+        return pairs
+
+    probas = model.predict_proba_all([texts[i] for i in indices])
+    emotion_classes, style_classes = model.classes_for("emotion"), model.classes_for("style")
+    for row, i in enumerate(indices):
+        pairs[i] = (
+            Prediction.from_probabilities(probas["emotion"][row], emotion_classes, version),
+            Prediction.from_probabilities(probas["style"][row], style_classes, version),
+        )
+    return pairs
@@ -0,0 +1,67 @@
+# backend/app/models/normalization.py
+
+"""
+Normalización de texto compartida entre entrenamiento e inferencia.
+Quita tildes y diacríticos, elimina signos de puntuación y pasa a minúsculas, con el mismo resultado
+que `limpiar_texto` (NFD + ASCII + regex), pero resuelto con una tabla de traducción precalculada:
+los textos representables en Latin-1 (el caso normal en español: á, é, ñ, ü, ¿, ¡) se normalizan con
+un único `bytes.translate`, y solo el resto (emojis, comillas tipográficas...) pasa por `unicodedata`.
+
+Los pipelines se entrenan con `TfidfVectorizer(preprocessor=normalize_text)`, de modo que la
+normalización queda guardada dentro del modelo y se aplica igual al entrenar y al predecir.
+"""
+
+import re
+import unicodedata
+from typing import List, Sequence
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_text_unicodedata(text: str) -> str:
+    """
+    Implementación de referencia (la de `ml_models/*/utils.py`): NFD, descarte de no-ASCII,
+    eliminación de signos y minúsculas. Se usa para construir las tablas y en las comparativas.
+    """
+    text = unicodedata.normalize("NFD", text)
+    text = text.encode("ascii", "ignore").decode("utf-8")
+    text = _PUNCT_RE.sub("", text)
+    return text.lower()
+
+
+def _build_tables():
+    # NFD se aplica carácter a carácter, así que la tabla por carácter equivale a normalizar el texto completo.
+    # En Latin-1 cada carácter se reduce a lo sumo a un carácter ASCII, lo que permite usar bytes.translate.
+    folded = [normalize_text_unicodedata(chr(code)) for code in range(256)]
+    latin1_table = bytes(ord(f) if f else code for code, f in enumerate(folded))
+    latin1_delete = bytes(code for code, f in enumerate(folded) if not f)
+    ascii_table = bytes(latin1_table[:128]) + bytes(range(128, 256))
+    ascii_delete = bytes(code for code in latin1_delete if code < 128)
+    return latin1_table, latin1_delete, ascii_table, ascii_delete
+
+
+_LATIN1_TABLE, _LATIN1_DELETE, _ASCII_TABLE, _ASCII_DELETE = _build_tables()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para los clasificadores: sin tildes ni signos y en minúsculas.
+
+    Args:
+        text (str): Texto de entrada (cualquier otro tipo devuelve "").
+    Returns:
+        str: Texto normalizado.
+    """
+    if not isinstance(text, str):
+        return ""
+    try:
+        return text.encode("latin-1").translate(_LATIN1_TABLE, _LATIN1_DELETE).decode("ascii")
+    except UnicodeEncodeError:
+        # Caracteres fuera de Latin-1: descomponer y quedarse con la parte ASCII
+        ascii_bytes = unicodedata.normalize("NFD", text).encode("ascii", "ignore")
+        return ascii_bytes.translate(_ASCII_TABLE, _ASCII_DELETE).decode("ascii")
+
+
+def normalize_texts(texts: Sequence[str]) -> List[str]:
+    """Normaliza una lista de textos (misma salida que aplicar `normalize_text` a cada uno)."""
+    return [normalize_text(text) for text in texts]
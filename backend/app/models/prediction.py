@@ -0,0 +1,144 @@
+# backend/app/models/prediction.py
+
+"""
+Resultado unificado de los clasificadores de texto (emoción y estilo).
+Una sola llamada a `predict_proba` alimenta la etiqueta dominante, su score y la distribución completa.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Prediction:
+    """
+    Predicción de un clasificador para un texto.
+
+    Attributes:
+        label (str): Etiqueta dominante.
+        score (float): Probabilidad de la etiqueta dominante en porcentaje.
+        probabilities (np.ndarray): Probabilidades crudas (0-1) en el orden de `classes`.
+        classes (np.ndarray): Etiquetas del modelo.
+        version (Optional[str]): Versión del modelo que produjo la predicción.
+    """
+
+    __slots__ = ("label", "score", "probabilities", "classes", "version")
+
+    def __init__(self, label: str, score: float, probabilities: np.ndarray, classes: Sequence[str], version: Optional[str] = None):
+        self.label = label
+        self.score = score
+        self.probabilities = probabilities
+        self.classes = classes
+        self.version = version
+
+    @classmethod
+    def from_probabilities(cls, probabilities: np.ndarray, classes: Sequence[str], version: Optional[str] = None) -> "Prediction":
+        """Construye la predicción a partir de una fila de `predict_proba`."""
+        top = int(np.argmax(probabilities))
+        return cls(str(classes[top]), round(float(probabilities[top]) * 100, 2), probabilities, classes, version)
+
+    @classmethod
+    def empty(cls, default_label: str = "neutro", version: Optional[str] = None) -> "Prediction":
+        """Predicción por defecto cuando no hay modelo o el texto está vacío."""
+        return cls(default_label, 0.0, np.array([0.0]), np.array([default_label]), version)
+
+    @property
+    def distribution(self) -> List[Tuple[str, float]]:
+        """Lista de (etiqueta, score%) ordenada de mayor a menor."""
+        return self.top()
+
+    def top(self, k: Optional[int] = None, min_prob: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Distribución reducida: las `k` clases más probables y/o las que superan `min_prob`.
+        Con `k` se usa `argpartition` (O(n)) y solo se ordenan las k seleccionadas.
+        La etiqueta dominante se incluye siempre.
+
+        Args:
+            k (Optional[int]): Número máximo de clases (None o 0 = todas).
+            min_prob (float): Probabilidad mínima (0-1) para incluir una clase.
+        Returns:
+            List[Tuple[str, float]]: Lista de (etiqueta, score%) ordenada de mayor a menor.
+        """
+        probabilities = self.probabilities
+        if k and k < len(probabilities):
+            # Índices ordenados antes del argsort estable: empates en el mismo orden que la distribución completa
+            selected = np.sort(np.argpartition(-probabilities, k - 1)[:k])
+            order = selected[np.argsort(-probabilities[selected], kind="stable")]
+        else:
+            order = np.argsort(-probabilities, kind="stable")
+        if min_prob > 0:
+            keep = probabilities[order] >= min_prob
+            keep[0] = True
+            order = order[keep]
+
+        percents = np.round(probabilities[order] * 100, 2)
+        return [(str(self.classes[i]), float(p)) for i, p in zip(order, percents)]
+
+    def as_tuple(self) -> Tuple[str, float]:
+        """Compatibilidad con la API previa `(etiqueta, score%)`."""
+        return self.label, self.score
+
+    def __repr__(self) -> str:
+        return f"Prediction(label={self.label!r}, score={self.score})"
+
+
+def predict_text(model: Any, text: str, default_label: str = "neutro", version: Optional[str] = None) -> Prediction:
+    """
+    Ejecuta `predict_proba` una única vez sobre el texto y devuelve la predicción completa.
+
+    Args:
+        model: Pipeline scikit-learn (o compatible) con `predict_proba` y `classes_`.
+        text (str): Texto de entrada.
+        default_label (str): Etiqueta usada si no hay modelo o el texto está vacío.
+        version (Optional[str]): Versión del modelo, registrada en la predicción.
+    Returns:
+        Prediction: Resultado con etiqueta, score y distribución.
+    """
+    if not model or not text.strip():
+        return Prediction.empty(default_label, version)
+
+    probas = model.predict_proba([text])[0]
+    return Prediction.from_probabilities(probas, model.classes_, version)
+
+
+def predict_texts(model: Any, texts: Sequence[str], default_label: str = "neutro", version: Optional[str] = None) -> List[Prediction]:
+    """
+    Clasifica varios textos con una sola llamada matricial a `predict_proba`.
+
+    Los textos vacíos no se envían al modelo y reciben la predicción por defecto.
+
+    Args:
+        model: Pipeline scikit-learn (o compatible) con `predict_proba` y `classes_`.
+        texts (Sequence[str]): Textos de entrada.
+        default_label (str): Etiqueta usada si no hay modelo o el texto está vacío.
+        version (Optional[str]): Versión del modelo, registrada en cada predicción.
+    Returns:
+        List[Prediction]: Una predicción por texto, en el mismo orden.
+    """
+    results = [Prediction.empty(default_label, version) for _ in texts]
+    if not model:
+        return results
+
+    indices = [i for i, text in enumerate(texts) if text.strip()]
+    if not indices:
+        return results
+
+    probas = model.predict_proba([texts[i] for i in indices])
+    classes = model.classes_
+    for row, i in enumerate(indices):
+        results[i] = Prediction.from_probabilities(probas[row], classes, version)
+    return results
+
+
+def model_file_version(path: Path) -> str:
+    """
+    Versión de un artefacto de modelo: nombre del archivo y hash corto de su contenido.
+    Devuelve "sin-modelo" si el archivo no existe.
+    """
+    try:
+        digest = hashlib.sha1(Path(path).read_bytes()).hexdigest()[:12]
+    except OSError:
+        return "sin-modelo"
+    return f"{Path(path).stem}@{digest}"
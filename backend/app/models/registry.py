@@ -0,0 +1,310 @@
+# backend/app/models/registry.py
+
+"""
+Registro de modelos de clasificación con carga diferida, calentamiento y recarga en caliente.
+Los modelos ya no se cargan al importar el módulo: se cargan la primera vez que se usan o,
+en la API, durante el arranque (`lifespan`), seguidos de una inferencia de calentamiento.
+`ModelWatcher` vigila los archivos de los modelos y, si cambian (reentrenamiento), carga la
+nueva versión en segundo plano y la intercambia de forma atómica: las solicitudes en curso
+terminan con la versión anterior. El estado de cada modelo se expone para el endpoint `/health`.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.logging import logger
+from app.models.compiled import compiled_path_for, load_text_classifier, shared_path_for
+
+# Estados posibles de un modelo
+UNLOADED = "unloaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+NO_MODEL_VERSION = "sin-modelo"
+
+# Textos usados para calentar el modelo (traer páginas a memoria y cachés del analizador)
+WARMUP_TEXTS = [
+    "hola, ¿cómo estás?",
+    "No entiendo nada de la clase y me frustra mucho.",
+]
+
+
+class ModelHandle:
+    """
+    Referencia versionada a un modelo, cargado una sola vez de forma segura entre hilos.
+    El par (modelo, versión) se guarda en un único atributo, de modo que cada lectura obtiene
+    siempre una pareja coherente aunque haya una recarga en curso.
+    Si la carga falla, `get()` devuelve None (las predicciones caen al valor por defecto)
+    y el estado queda en "failed" hasta que se reintente con `load(force=True)` o cambie el archivo.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Union[str, Path],
+        prefer_compiled: bool = True,
+        mmap: bool = True,
+        warmup_texts: Sequence[str] = WARMUP_TEXTS
+    ):
+        self.name = name
+        self.path = Path(path)
+        self.prefer_compiled = prefer_compiled
+        self.mmap = mmap
+        self.warmup_texts = list(warmup_texts)
+        self._lock = threading.Lock()
+        self._current: Tuple[Any, str] = (None, NO_MODEL_VERSION)
+        self._signature: Optional[Tuple] = None
+        self.state = UNLOADED
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.loaded_at: Optional[str] = None
+        self.reloads = 0
+        self.history: deque = deque(maxlen=5)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def version(self) -> str:
+        """Versión del modelo cargado (lo carga si aún no se ha hecho)."""
+        return self.snapshot()[1]
+
+    def get(self) -> Any:
+        """Devuelve el modelo, cargándolo en el primer uso."""
+        return self.snapshot()[0]
+
+    def snapshot(self) -> Tuple[Any, str]:
+        """Devuelve el par (modelo, versión) vigente, cargándolo en el primer uso."""
+        if self.state not in (READY, FAILED):
+            self.load()
+        return self._current
+
+    def _file_signature(self) -> Tuple:
+        """Fecha y tamaño del joblib y de sus artefactos compilados (None si no existen)."""
+        signature = []
+        for path in (self.path, compiled_path_for(self.path), shared_path_for(self.path) / "meta.json"):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def changed(self) -> bool:
+        """Indica si el modelo o sus artefactos compilados cambiaron desde la última carga."""
+        return self._file_signature() != self._signature
+
+    def load(self, warm_up: bool = True, force: bool = False) -> bool:
+        """
+        Carga el modelo y ejecuta la inferencia de calentamiento.
+
+        Returns:
+            bool: True si el modelo quedó listo.
+        """
+        with self._lock:
+            if self.state in (READY, FAILED) and not force:
+                return self.ready
+
+            self.state = LOADING
+            loaded = self._load_version(warm_up)
+            if loaded is None:
+                self._current = (None, NO_MODEL_VERSION)
+                self.state = FAILED
+                return False
+
+            self._swap(*loaded)
+            self.state = READY
+            logger.analysis(f"Modelo de {self.name} listo", self.status())
+            return True
+
+    def reload(self, warm_up: bool = True) -> bool:
+        """
+        Carga la versión actual del archivo sin detener el servicio y la intercambia si es nueva.
+        Mientras tanto se sigue sirviendo la versión anterior; si la carga falla, se conserva.
+
+        Returns:
+            bool: True si se instaló una versión nueva.
+        """
+        with self._lock:
+            previous = self._current[1]
+            loaded = self._load_version(warm_up)
+            if loaded is None:
+                if self._current[0] is None:
+                    self.state = FAILED
+                return False
+            # Misma versión y mismo tipo de artefacto: no hay nada que intercambiar
+            if loaded[1] == previous and type(loaded[0]) is type(self._current[0]) and self.state == READY:
+                return False
+
+            self._swap(*loaded)
+            self.state = READY
+            self.reloads += 1
+            logger.analysis(f"Modelo de {self.name} recargado", {"previous_version": previous, **self.status()})
+            return True
+
+    def _load_version(self, warm_up: bool) -> Optional[Tuple[Any, str]]:
+        """Carga y calienta el modelo del archivo; devuelve None (y registra el error) si falla."""
+        # La firma se toma antes de leer: un cambio durante la carga se detecta en la siguiente revisión
+        self._signature = self._file_signature()
+        start = time.perf_counter()
+        try:
+            model, version = load_text_classifier(self.path, prefer_compiled=self.prefer_compiled, mmap=self.mmap)
+            self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+            if warm_up:
+                self._warm_up(model)
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"No se pudo cargar el modelo de {self.name}", error=e, data={"path": str(self.path)})
+            return None
+        self.error = None
+        return model, version
+
+    def _swap(self, model: Any, version: str) -> None:
+        # Asignación única: los lectores ven la pareja anterior o la nueva, nunca una mezcla
+        self._current = (model, version)
+        self.loaded_at = datetime.utcnow().isoformat()
+        self.history.appendleft({"version": version, "loaded_at": self.loaded_at})
+
+    def _warm_up(self, model: Any) -> None:
+        start = time.perf_counter()
+        model.predict_proba(self.warmup_texts)
+        self.warmup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def status(self) -> Dict[str, Any]:
+        """Estado del modelo para monitoreo."""
+        return {
+            "state": self.state,
+            "version": self._current[1],
+            "path": str(self.path),
+            "loaded_at": self.loaded_at,
+            "load_ms": self.load_ms,
+            "warmup_ms": self.warmup_ms,
+            "reloads": self.reloads,
+            "history": list(self.history),
+            "error": self.error,
+        }
+
+
+class TaskHandle:
+    """
+    Vista de una tarea de un modelo multitarea con la interfaz de `ModelHandle` que usan los predictores
+    (`snapshot`, `get`, `version`). La carga, el estado y la recarga pertenecen al modelo padre.
+    """
+
+    def __init__(self, parent: ModelHandle, task: str):
+        self.parent = parent
+        self.task = task
+        self.name = task
+
+    @property
+    def state(self) -> str:
+        return self.parent.state
+
+    @property
+    def ready(self) -> bool:
+        return self.parent.ready
+
+    @property
+    def version(self) -> str:
+        return self.parent.version
+
+    def get(self) -> Any:
+        return self.snapshot()[0]
+
+    def snapshot(self) -> Tuple[Any, str]:
+        """Devuelve (cabeza de la tarea, versión del modelo padre)."""
+        model, version = self.parent.snapshot()
+        return (model.head(self.task) if model is not None else None), version
+
+
+class ModelRegistry:
+    """Conjunto de modelos con nombre y su estado agregado."""
+
+    def __init__(self):
+        self._handles: Dict[str, ModelHandle] = {}
+
+    def register(self, handle: ModelHandle) -> ModelHandle:
+        self._handles[handle.name] = handle
+        return handle
+
+    def get(self, name: str) -> ModelHandle:
+        return self._handles[name]
+
+    def names(self) -> List[str]:
+        return list(self._handles)
+
+    def load_all(self, warm_up: bool = True) -> bool:
+        """Carga y calienta todos los modelos registrados. Devuelve True si todos quedaron listos."""
+        results = [handle.load(warm_up=warm_up) for handle in self._handles.values()]
+        return all(results)
+
+    def reload_changed(self) -> List[str]:
+        """Recarga los modelos ya cargados cuyo archivo cambió. Devuelve los nombres actualizados."""
+        reloaded = []
+        for name, handle in self._handles.items():
+            if handle.state in (READY, FAILED) and handle.changed() and handle.reload():
+                reloaded.append(name)
+        return reloaded
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._handles) and all(handle.ready for handle in self._handles.values())
+
+    @property
+    def failed(self) -> bool:
+        return any(handle.state == FAILED for handle in self._handles.values())
+
+    def status(self) -> Dict[str, Any]:
+        """Estado de cada modelo y disponibilidad global."""
+        return {
+            "ready": self.ready,
+            "failed": self.failed,
+            "models": {name: handle.status() for name, handle in self._handles.items()},
+        }
+
+
+class ModelWatcher:
+    """Hilo que revisa periódicamente los archivos de los modelos y recarga los que cambian."""
+
+    def __init__(self, model_registry: ModelRegistry, interval: float = 10.0):
+        self.registry = model_registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        logger.analysis("Vigilancia de modelos iniciada", {"interval_s": self.interval, "models": self.registry.names()})
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.reload_changed()
+            except Exception as e:
+                logger.error("Error revisando cambios en los modelos", error=e)
+
+
+# Registro global usado por los módulos de emoción y estilo
+registry = ModelRegistry()
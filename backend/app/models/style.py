@@ -1,24 +1,57 @@
 # backend/app/models/style.py
 
 """
-Cargador y predictor de estilo comunicativo usando un modelo scikit-learn exportado (joblib).
+Cargador y predictor de estilo comunicativo usando un modelo scikit-learn exportado (joblib)
+o su versión compilada a NumPy (ver `ml_models/compile_models.py`).
 """
 
 import os
 from pathlib import Path
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Sequence
 
-import joblib
+from app.models.registry import ModelHandle, TaskHandle, registry
+from app.models import multitask
+from app.models.prediction import Prediction, predict_text, predict_texts
 
 # Ruta al modelo entrenado
 MODEL_PATH = Path(os.environ.get("STYLE_MODEL_PATH", "ml_models/style_classification/style_model.joblib"))
 
-# Cargar modelo al inicio
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception as e:
-    print(f"[WARN] No se pudo cargar el modelo de estilo: {e}")
-    model = None
+# Usar el scorer compilado (NumPy) cuando exista junto al joblib
+USE_COMPILED = os.environ.get("USE_COMPILED_MODELS", "true").lower() in ("1", "true", "yes")
+
+# Mapear en memoria los arreglos del modelo para compartir páginas entre workers
+USE_MMAP = os.environ.get("MODEL_MMAP", "true").lower() in ("1", "true", "yes")
+
+# Modelo registrado con carga diferida (se carga en el primer uso o en el arranque de la API)
+# Con USE_MULTITASK_MODEL la cabeza de estilo del modelo multitarea reemplaza al pipeline propio
+if multitask.USE_MULTITASK:
+    model_handle = TaskHandle(multitask.model_handle, "style")
+else:
+    model_handle = registry.register(ModelHandle("style", MODEL_PATH, prefer_compiled=USE_COMPILED, mmap=USE_MMAP))
+
+def get_style_prediction(text: str) -> Prediction:
+    """
+    Clasifica el texto con una sola pasada del modelo de estilo.
+    
+    Args:
+        text (str): Texto de entrada.
+    Returns:
+        Prediction: Estilo dominante, score% y distribución completa.
+    """
+    model, version = model_handle.snapshot()
+    return predict_text(model, text, version=version)
+
+def predict_styles_batch(texts: Sequence[str]) -> List[Prediction]:
+    """
+    Clasifica una lista de textos con una sola llamada `transform` + `predict_proba` del modelo de estilo.
+    
+    Args:
+        texts (Sequence[str]): Textos de entrada.
+    Returns:
+        List[Prediction]: Una predicción por texto, en el mismo orden.
+    """
+    model, version = model_handle.snapshot()
+    return predict_texts(model, texts, version=version)
 
 def predict_style(text: str) -> Tuple[str, float]:
     """
@@ -29,29 +62,20 @@ def predict_style(text: str) -> Tuple[str, float]:
     Returns:
         Tuple[str, float]: (estilo_detectado, score%)
     """
-    if not model or not text.strip():
-        return "neutro", 0.0
+    return get_style_prediction(text).as_tuple()
 
-    pred = model.predict([text])[0]
-    proba = round(max(model.predict_proba([text])[0]) * 100, 2)
-    return pred, proba
-
-def predict_all_styles(text: str) -> List[Tuple[str, float]]:
+def predict_all_styles(text: str, top_k: Optional[int] = None, min_prob: float = 0.0) -> List[Tuple[str, float]]:
     """
     Retorna todos los estilos posibles con sus scores en porcentaje, ordenados de mayor a menor.
     
     Args:
         text (str): Texto de entrada.
+        top_k (Optional[int]): Devolver solo las k clases más probables (None = todas).
+        min_prob (float): Omitir clases con probabilidad (0-1) menor a este valor.
     Returns:
         List[Tuple[str, float]]: Lista de (estilo, score%) ordenada.
     """
-    if not model or not text.strip():
-        return [("neutro", 0.0)]
-
-    probas = model.predict_proba([text])[0]
-    styles = model.classes_
-    scores = list(zip(styles, [round(p * 100, 2) for p in probas]))
-    return sorted(scores, key=lambda x: x[1], reverse=True)
+    return get_style_prediction(text).top(top_k, min_prob)
 
 # --- Test manual ---
 if __name__ == "__main__":
@@ -63,8 +87,9 @@ if __name__ == "__main__":
     ]
 
     for txt in textos:
-        dominant, score = predict_style(txt)
-        all_probs = predict_all_styles(txt)
+        prediction = get_style_prediction(txt)
+        dominant, score = prediction.as_tuple()
+        all_probs = prediction.distribution
 
         print(f"\nTexto: {txt}")
         print(f"  ➤ Estilo dominante: {dominant} (score={score:.2f}%)")
@@ -3,20 +3,19 @@
 """
 Módulo de evaluación de alertas emocionales.
 Basado en principios de psicología educativa y salud mental preventiva.
+
+Los umbrales se declaran en `rules.json` junto con las reglas de prioridad (ver `app.notifications.rules`).
 """
 
 from typing import Tuple
 
+from app.notifications.rules import engine
+
 
-# Definición de emociones de riesgo y sus umbrales
-EMOTION_THRESHOLDS = {
-    "frustración": 70,
-    "tristeza": 70,
-    "ansiedad": 65,
-    "desánimo": 60,
-}
+# Definición de emociones de riesgo y sus umbrales (cargadas de la configuración de reglas)
+EMOTION_THRESHOLDS = dict(engine.alert_emotions)
 
-STYLE_RISKY = {"evasivo", "pasivo-agresivo", "irónico"}
+STYLE_RISKY = set(engine.alert_styles)
 EMOTION_RISKY = set(EMOTION_THRESHOLDS.keys())
 
 
@@ -24,15 +23,14 @@ def is_emotion_alert(emotion: str, score: float) -> bool:
     """
     Verifica si una emoción supera su umbral de alerta.
     """
-    threshold = EMOTION_THRESHOLDS.get(emotion.lower())
-    return threshold is not None and score >= threshold
+    return engine.emotions.alerted(emotion, score)
 
 
 def is_style_alert(style: str, score: float) -> bool:
     """
     Verifica si un estilo es considerado riesgoso con score alto.
     """
-    return style.lower() in STYLE_RISKY and score >= 60
+    return engine.styles.alerted(style, score)
 
 
 def check_emotion_alert(emotion: str, score: float) -> Tuple[bool, str]:
@@ -44,20 +42,30 @@ def check_emotion_alert(emotion: str, score: float) -> Tuple[bool, str]:
     return False, ""
 
 
-def check_combined_alert(emotion: str, emotion_score: float, style: str, style_score: float) -> Tuple[bool, str]:
+def alert_reason(emotion: str, emotion_score: float, style: str, style_score: float, emotion_alert: bool, style_alert: bool) -> str:
     """
-    Evalúa si se debe activar una alerta considerando la combinación emoción + estilo.
+    Motivo de la alerta a partir de las banderas ya evaluadas ("" si no hay alerta).
     """
-    if is_emotion_alert(emotion, emotion_score) and is_style_alert(style, style_score):
-        return True, (
+    if emotion_alert and style_alert:
+        return (
             f"Alerta combinada: emoción '{emotion}' ({emotion_score}%) "
             f"y estilo '{style}' ({style_score}%) indican posible desconexión o riesgo emocional."
         )
 
-    if is_emotion_alert(emotion, emotion_score):
-        return True, f"Emoción '{emotion}' con intensidad {emotion_score}% supera el umbral."
+    if emotion_alert:
+        return f"Emoción '{emotion}' con intensidad {emotion_score}% supera el umbral."
     
-    if is_style_alert(style, style_score):
-        return True, f"Estilo '{style}' detectado con intensidad {style_score}% sugiere evasión o tensión."
+    if style_alert:
+        return f"Estilo '{style}' detectado con intensidad {style_score}% sugiere evasión o tensión."
 
-    return False, ""
+    return ""
+
+
+def check_combined_alert(emotion: str, emotion_score: float, style: str, style_score: float) -> Tuple[bool, str]:
+    """
+    Evalúa si se debe activar una alerta considerando la combinación emoción + estilo.
+    """
+    emotion_alert, style_alert = engine.alert(emotion, emotion_score, style, style_score)
+    if not (emotion_alert or style_alert):
+        return False, ""
+    return True, alert_reason(emotion, emotion_score, style, style_score, emotion_alert, style_alert)
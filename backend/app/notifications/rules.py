@@ -0,0 +1,206 @@
+# backend/app/notifications/rules.py
+
+"""
+Motor de reglas de prioridad y alertas.
+
+Las reglas se declaran en `rules.json` (o en `RULES_CONFIG_PATH`) y se compilan una sola vez en
+tablas indexadas por id de etiqueta: para cada emoción y estilo, sus umbrales y puntos de riesgo,
+su umbral de caso crítico y su umbral de alerta. Una etiqueta desconocida tiene el id 0, cuyos
+umbrales son infinitos.
+
+    - `priority` / `alert`   evalúan un análisis (una búsqueda en diccionario por etiqueta)
+    - `evaluate_batch`       evalúa muchos análisis con operaciones vectorizadas de NumPy
+
+Formato de `priority.<emotions|styles>.tiers`: cada nivel asigna `points[0]` desde el umbral de la
+etiqueta y `points[1]` desde `umbral - margin`. `critical` fuerza al menos `critical_points` desde
+su umbral y `context_bonus` suma puntos según el riesgo de contexto. La prioridad es el primer
+elemento de `levels` cuyo mínimo alcanza el total (o `default_level`).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("rules.json")
+
+INF = float("inf")
+
+
+class LabelTable:
+    """
+    Reglas de un tipo de etiqueta (emoción o estilo) compiladas en arreglos indexados por id.
+
+    Attributes:
+        ids (Dict[str, int]): Etiqueta en minúsculas -> id (0 = desconocida).
+        high_threshold / high_points: Umbral y puntos del nivel completo.
+        low_threshold / low_points: Umbral (umbral - margen) y puntos del nivel reducido.
+        critical (np.ndarray): Umbral que fuerza prioridad crítica.
+        alert (np.ndarray): Umbral de alerta.
+    """
+
+    def __init__(self, priority: Dict[str, Any], alerts: Dict[str, float]):
+        labels: List[str] = []
+        for tier in priority.get("tiers", []):
+            labels.extend(tier["labels"])
+        labels.extend(priority.get("critical", {}))
+        labels.extend(alerts)
+        self.ids: Dict[str, int] = {}
+        for label in labels:
+            self.ids.setdefault(label.lower(), len(self.ids) + 1)
+
+        size = len(self.ids) + 1
+        self.high_threshold = np.full(size, INF)
+        self.high_points = np.zeros(size)
+        self.low_threshold = np.full(size, INF)
+        self.low_points = np.zeros(size)
+        self.critical = np.full(size, INF)
+        self.alert = np.full(size, INF)
+
+        assigned = set()
+        for tier in priority.get("tiers", []):
+            high, low = tier["points"]
+            for label, threshold in tier["labels"].items():
+                i = self.ids[label.lower()]
+                if i in assigned:  # La etiqueta queda en el primer nivel que la declara
+                    continue
+                assigned.add(i)
+                self.high_threshold[i], self.high_points[i] = threshold, high
+                self.low_threshold[i], self.low_points[i] = threshold - tier["margin"], low
+        for label, threshold in priority.get("critical", {}).items():
+            self.critical[self.ids[label.lower()]] = threshold
+        for label, threshold in alerts.items():
+            self.alert[self.ids[label.lower()]] = threshold
+
+        # Copias como listas de Python: indexarlas es más rápido que indexar arreglos en la ruta escalar
+        self._rows = list(zip(*(array.tolist() for array in (
+            self.high_threshold, self.high_points, self.low_threshold, self.low_points, self.critical, self.alert
+        ))))
+        self._alert = self.alert.tolist()
+
+    def id(self, label: Optional[str]) -> int:
+        if not label:
+            return 0
+        i = self.ids.get(label)
+        return i if i is not None else self.ids.get(label.lower(), 0)
+
+    def ids_for(self, labels: Sequence[Optional[str]]) -> np.ndarray:
+        return np.fromiter((self.id(label) for label in labels), dtype=np.intp, count=len(labels))
+
+    def points(self, label: Optional[str], score: float) -> Tuple[float, bool, bool]:
+        """(puntos de riesgo, caso crítico, alerta) de una etiqueta con su score."""
+        high, high_points, low, low_points, critical, alert = self._rows[self.id(label)]
+        points = high_points if score >= high else low_points if score >= low else 0
+        return points, score >= critical, score >= alert
+
+    def alerted(self, label: Optional[str], score: float) -> bool:
+        return score >= self._alert[self.id(label)]
+
+    def points_batch(self, ids: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        points = np.where(
+            scores >= self.high_threshold[ids], self.high_points[ids],
+            np.where(scores >= self.low_threshold[ids], self.low_points[ids], 0.0)
+        )
+        return points, scores >= self.critical[ids], scores >= self.alert[ids]
+
+    def risk_labels(self) -> frozenset:
+        """Etiquetas que pueden sumar puntos, ser caso crítico o disparar una alerta."""
+        finite = np.isfinite(self.low_threshold) | np.isfinite(self.critical) | np.isfinite(self.alert)
+        return frozenset(label for label, i in self.ids.items() if finite[i])
+
+    def min_trigger(self) -> float:
+        """Score mínimo con el que alguna etiqueta suma puntos, es crítica o dispara alerta."""
+        return float(np.min(np.concatenate([self.low_threshold, self.critical, self.alert])))
+
+
+class RulesEngine:
+    """
+    Reglas de prioridad y alertas compiladas a partir de su configuración declarativa.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        priority, alerts = config["priority"], config["alerts"]
+        self.config = config
+        self.emotions = LabelTable(priority["emotions"], alerts.get("emotions", {}))
+        self.styles = LabelTable(priority["styles"], alerts.get("styles", {}))
+        self.context_bonus: Dict[str, float] = dict(priority.get("context_bonus", {}))
+        self.critical_points = float(priority["critical_points"])
+        self.levels: List[Tuple[str, float]] = [(name, float(minimum)) for name, minimum in priority["levels"]]
+        self.default_level: str = priority["default_level"]
+
+        self.alert_emotions: Dict[str, float] = dict(alerts.get("emotions", {}))
+        self.alert_styles: Dict[str, float] = dict(alerts.get("styles", {}))
+
+        # Etiquetas que pueden elevar la prioridad o disparar una alerta
+        self.risk_emotions = self.emotions.risk_labels()
+        self.risk_styles = self.styles.risk_labels()
+
+        self._level_minimums = np.array([minimum for _, minimum in self.levels])
+        self._level_names = np.array([name for name, _ in self.levels] + [self.default_level], dtype=object)
+
+    @classmethod
+    def from_file(cls, path: Optional[Path] = None) -> "RulesEngine":
+        path = Path(path or settings.RULES_CONFIG_PATH or DEFAULT_RULES_PATH)
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _level(self, total: float) -> str:
+        for name, minimum in self.levels:
+            if total >= minimum:
+                return name
+        return self.default_level
+
+    def priority(self, emotion: Optional[str], emotion_score: float, style: Optional[str], style_score: float = 0.0, context_risk: str = "normal") -> str:
+        """Prioridad de un análisis ("crítica", "alta", "media", "baja", "normal" con las reglas por defecto)."""
+        emotion_points, emotion_critical, _ = self.emotions.points(emotion, emotion_score)
+        style_points, style_critical, _ = self.styles.points(style, style_score)
+        total = emotion_points + style_points + self.context_bonus.get(context_risk, 0)
+        if emotion_critical or style_critical:
+            total = max(total, self.critical_points)
+        return self._level(total)
+
+    def alert(self, emotion: Optional[str], emotion_score: float, style: Optional[str], style_score: float) -> Tuple[bool, bool]:
+        """(alerta por emoción, alerta por estilo)."""
+        return self.emotions.alerted(emotion, emotion_score), self.styles.alerted(style, style_score)
+
+    def evaluate_batch(
+        self,
+        emotions: Sequence[Optional[str]],
+        emotion_scores: Sequence[float],
+        styles: Sequence[Optional[str]],
+        style_scores: Sequence[float],
+        context_risks: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Prioridad y alertas de muchos análisis a la vez.
+
+        Returns:
+            Dict[str, np.ndarray]: `priority` (etiquetas), `risk_score` (puntos totales),
+            `emotion_alert` y `style_alert` (booleanos), alineados con la entrada.
+        """
+        emotion_scores = np.asarray(emotion_scores, dtype=np.float64)
+        style_scores = np.asarray(style_scores, dtype=np.float64)
+        emotion_points, emotion_critical, emotion_alert = self.emotions.points_batch(self.emotions.ids_for(emotions), emotion_scores)
+        style_points, style_critical, style_alert = self.styles.points_batch(self.styles.ids_for(styles), style_scores)
+
+        total = emotion_points + style_points
+        if context_risks is not None:
+            total = total + np.fromiter((self.context_bonus.get(risk, 0) for risk in context_risks), dtype=np.float64, count=len(context_risks))
+        total = np.where(emotion_critical | style_critical, np.maximum(total, self.critical_points), total)
+
+        # Primer nivel cuyo mínimo alcanza el total; si ninguno, el nivel por defecto
+        reached = total[:, None] >= self._level_minimums[None, :]
+        level = np.where(reached.any(axis=1), reached.argmax(axis=1), len(self.levels))
+        return {
+            "priority": self._level_names[level],
+            "risk_score": total,
+            "emotion_alert": emotion_alert,
+            "style_alert": style_alert,
+        }
+
+
+# Reglas cargadas una sola vez al importar el módulo
+engine = RulesEngine.from_file()
@@ -39,3 +39,5 @@ class AnalysisResult(BaseModel):
     alert_reason: Optional[str] = None
     context_alert: Optional[bool] = False
     context_risk_level: Optional[str] = "normal"
+    context_risk_score: Optional[float] = None
+    fast_path: Optional[bool] = False
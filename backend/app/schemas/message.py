@@ -17,6 +17,7 @@ class MessageBase(BaseModel):
 class MessageCreate(MessageBase):
     """Schema para crear un mensaje."""
     usuario_id: int
+    remitente: str = "user"  # "user" o "bot"
 
 
 class MessageInDB(MessageBase):
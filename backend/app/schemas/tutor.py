@@ -51,4 +51,9 @@ class InterventionRequest(BaseModel):
 # Esquemas para revisión de alertas
 class AlertReviewRequest(BaseModel):
     notes: Optional[str] = None
-    action_taken: Optional[str] = None 
\ No newline at end of file
+    action_taken: Optional[str] = None 
+
+# Esquemas para corrección de etiquetas (aprendizaje en línea)
+class AnalysisCorrectionRequest(BaseModel):
+    emotion: Optional[str] = None
+    style: Optional[str] = None
@@ -0,0 +1,106 @@
+# backend/app/services/analysis_cache.py
+
+"""
+Caché LRU con TTL para resultados de clasificación de texto.
+Las claves son un hash del texto normalizado más la versión de los modelos,
+de modo que reentrenar un modelo invalida automáticamente sus entradas.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.models.normalization import normalize_text
+
+
+def normalize_cache_text(text: str) -> str:
+    """
+    Normaliza el texto para la clave de caché.
+
+    Misma normalización que aplican los modelos (`normalize_text`) con los espacios colapsados.
+    El modelo recibe exactamente ese texto y el tokenizador ignora los espacios repetidos,
+    así que "No sé." y "no se" comparten entrada.
+    """
+    return " ".join(normalize_text(text).split())
+
+
+def make_cache_key(text: str, version: str) -> str:
+    """Genera la clave de caché a partir del texto normalizado y la versión de los modelos."""
+    payload = f"{version}\x00{normalize_cache_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Caché LRU acotada con expiración por TTL y contadores de aciertos/fallos.
+    Segura para hilos (las rutas síncronas de FastAPI corren en un threadpool).
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 300, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled and max_entries > 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Devuelve el valor cacheado o None si no existe o expiró."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if self.ttl and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Guarda un valor, desalojando la entrada menos usada si se supera el límite."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Resumen de uso de la caché."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
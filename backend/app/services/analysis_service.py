@@ -1,30 +1,193 @@
-from typing import List, Dict, Any, Optional
-from app.models.emotion import predict_emotion, predict_all_emotions
-from app.models.style import predict_style, predict_all_styles
-from app.notifications.alerts import check_combined_alert
+from typing import List, Dict, Any, Optional, Tuple
+from app.models import emotion as emotion_model
+from app.models import style as style_model
+from app.models import multitask as multitask_model
+from app.models.emotion import get_emotion_prediction, predict_emotions_batch
+from app.models.style import get_style_prediction, predict_styles_batch
+from app.models.prediction import Prediction
+from app.notifications.alerts import alert_reason, check_combined_alert
+from app.notifications.rules import engine as rules_engine
+from app.services.analysis_cache import AnalysisCache, make_cache_key
+from app.services.context_state import RollingContext
+from app.core.config import settings
 import json
+import threading
 
 
-def analyze_emotion(text: str) -> dict:
-    dominant_emotion, score = predict_emotion(text)
-    all_emotions = predict_all_emotions(text)
+# Caché de predicciones (emoción, estilo) por texto normalizado + versión de modelos
+prediction_cache = AnalysisCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl=settings.CACHE_TTL,
+    enabled=settings.CACHE_ENABLED
+)
+
+
+# Cualquier etiqueta que pueda elevar la prioridad o disparar una alerta (según `rules.json`)
+RISK_EMOTIONS = rules_engine.risk_emotions
+RISK_STYLES = rules_engine.risk_styles
+MIN_RISK_STYLE_TRIGGER = rules_engine.styles.min_trigger()
+
+
+class FastPathStats:
+    """Contadores de la ruta rápida de `build_analysis` (seguros entre hilos)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.analyses = 0
+        self.fast_path = 0
+        self.recommendations_skipped = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.analyses = self.fast_path = self.recommendations_skipped = 0
+
+    def record(self, fast: bool) -> None:
+        with self._lock:
+            self.analyses += 1
+            if fast:
+                self.fast_path += 1
+
+    def record_recommendations_skipped(self) -> None:
+        with self._lock:
+            self.recommendations_skipped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": settings.EARLY_EXIT_ENABLED,
+                "min_emotion_score": settings.EARLY_EXIT_MIN_EMOTION_SCORE,
+                "max_risk_style_score": settings.EARLY_EXIT_MAX_RISK_STYLE_SCORE,
+                "analyses": self.analyses,
+                "fast_path": self.fast_path,
+                "skip_rate": round(self.fast_path / self.analyses, 4) if self.analyses else 0.0,
+                "recommendations_skipped": self.recommendations_skipped,
+            }
+
+
+fast_path_stats = FastPathStats()
+
+
+# Backend de inferencia opcional (p. ej. planificador de micro-lotes); None = llamada directa
+inference_backend = None
+
+
+def set_inference_backend(backend) -> None:
+    """
+    Instala (o retira, con None) el backend que resuelve las predicciones.
+    El backend debe exponer `predict(text, timeout)`, `predict_batch(texts)` y `stats()`.
+    """
+    global inference_backend
+    inference_backend = backend
+
+
+def classify_pairs(texts: List[str]) -> List[Tuple[Prediction, Prediction]]:
+    """
+    Clasifica un lote de textos con ambos modelos (una llamada matricial por modelo), sin caché.
+    Con el modelo multitarea, ambas cabezas comparten una sola vectorización.
+    """
+    if multitask_model.USE_MULTITASK:
+        return multitask_model.predict_pairs_batch(texts)
+    return list(zip(predict_emotions_batch(texts), predict_styles_batch(texts)))
+
+
+def _classify_one(text: str) -> Tuple[Prediction, Prediction]:
+    backend = inference_backend
+    if backend is not None:
+        return backend.predict(text, timeout=settings.ANALYSIS_TIMEOUT)
+    if multitask_model.USE_MULTITASK:
+        return multitask_model.predict_pairs_batch([text])[0]
+    return get_emotion_prediction(text), get_style_prediction(text)
+
+
+def _classify_many(texts: List[str]) -> List[Tuple[Prediction, Prediction]]:
+    backend = inference_backend
+    if backend is not None:
+        return backend.predict_batch(texts)
+    return classify_pairs(texts)
+
+
+def get_inference_stats() -> Dict[str, Any]:
+    """Estado del backend de inferencia activo."""
+    backend = inference_backend
+    if backend is None:
+        return {"backend": "local"}
+    return backend.stats()
+
+
+def models_version() -> str:
+    """Versión combinada de los modelos de emoción y estilo cargados."""
+    return f"{emotion_model.model_handle.version}|{style_model.model_handle.version}"
+
+
+def predict_pair(text: str) -> Tuple[Prediction, Prediction]:
+    """
+    Predicciones de emoción y estilo para un texto, pasando por la caché.
+    """
+    key = make_cache_key(text, models_version())
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    pair = _classify_one(text)
+    prediction_cache.set(key, pair)
+    return pair
+
+
+def predict_pairs(texts: List[str]) -> List[Tuple[Prediction, Prediction]]:
+    """
+    Predicciones de emoción y estilo para varios textos.
+    Los aciertos de caché se resuelven sin modelo y los fallos se clasifican en un solo lote.
+    """
+    version = models_version()
+    keys = [make_cache_key(text, version) for text in texts]
+    pairs: List[Optional[Tuple[Prediction, Prediction]]] = [prediction_cache.get(key) for key in keys]
+
+    missing = [i for i, pair in enumerate(pairs) if pair is None]
+    if missing:
+        classified = _classify_many([texts[i] for i in missing])
+        for i, pair in zip(missing, classified):
+            pairs[i] = pair
+            prediction_cache.set(keys[i], pair)
+
+    return pairs
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Contadores de la caché de predicciones."""
+    return {**prediction_cache.stats(), "models_version": models_version()}
+
+
+def _distribution(prediction: Prediction, top_k: Optional[int], min_prob: Optional[float]) -> List[Tuple[str, float]]:
+    """Distribución recortada según los parámetros o, si no se indican, según la configuración."""
+    top_k = settings.DISTRIBUTION_TOP_K if top_k is None else top_k
+    min_prob = settings.DISTRIBUTION_MIN_PROB if min_prob is None else min_prob
+    return prediction.top(top_k, min_prob)
+
+
+def emotion_result(prediction: Prediction, top_k: Optional[int] = None, min_prob: Optional[float] = None) -> dict:
     return {
-        "emotion": dominant_emotion,
-        "emotion_score": score,
-        "emotion_distribution": all_emotions
+        "emotion": prediction.label,
+        "emotion_score": prediction.score,
+        "emotion_distribution": _distribution(prediction, top_k, min_prob)
     }
 
 
-def analyze_style(text: str) -> dict:
-    dominant_style, score = predict_style(text)
-    all_styles = predict_all_styles(text)
+def style_result(prediction: Prediction, top_k: Optional[int] = None, min_prob: Optional[float] = None) -> dict:
     return {
-        "style": dominant_style,
-        "style_score": score,
-        "style_distribution": all_styles
+        "style": prediction.label,
+        "style_score": prediction.score,
+        "style_distribution": _distribution(prediction, top_k, min_prob)
     }
 
 
+def analyze_emotion(text: str) -> dict:
+    return emotion_result(get_emotion_prediction(text))
+
+
+def analyze_style(text: str) -> dict:
+    return style_result(get_style_prediction(text))
+
+
 def evaluate_priority(emotion: str, emotion_score: float, style: str, style_score: float = 0.0, context_risk: str = "normal") -> str:
     """
     Evalúa la prioridad de atención basada en múltiples criterios:
@@ -33,102 +196,12 @@ def evaluate_priority(emotion: str, emotion_score: float, style: str, style_scor
     - Combinación de factores
     - Contexto de riesgo acumulativo
     
+    Las reglas (umbrales, puntos y niveles) se declaran en `app/notifications/rules.json`.
+    
     Returns:
         str: "crítica", "alta", "media", "baja", "normal"
     """
-    # Definir emociones de alto riesgo con sus umbrales específicos
-    high_risk_emotions = {
-        "frustración": 75,
-        "tristeza": 80,
-        "ansiedad": 70,
-        "desánimo": 75,
-        "ira": 70,
-        "desesperación": 60,
-        "soledad": 75
-    }
-    
-    # Definir emociones de riesgo medio
-    medium_risk_emotions = {
-        "preocupación": 65,
-        "confusión": 60,
-        "inseguridad": 70,
-        "nostalgia": 75
-    }
-    
-    # Definir estilos de alto riesgo
-    high_risk_styles = {
-        "evasivo": 65,
-        "pasivo-agresivo": 60,
-        "agresivo": 55,
-        "defensivo": 70
-    }
-    
-    # Definir estilos de riesgo medio
-    medium_risk_styles = {
-        "formal": 80,
-        "distante": 70,
-        "sarcástico": 65
-    }
-    
-    # Calcular puntuación de riesgo emocional
-    emotion_risk_score = 0
-    if emotion.lower() in high_risk_emotions:
-        if emotion_score >= high_risk_emotions[emotion.lower()]:
-            emotion_risk_score = 3  # Alto riesgo
-        elif emotion_score >= high_risk_emotions[emotion.lower()] - 10:
-            emotion_risk_score = 2  # Riesgo medio-alto
-    elif emotion.lower() in medium_risk_emotions:
-        if emotion_score >= medium_risk_emotions[emotion.lower()]:
-            emotion_risk_score = 2  # Riesgo medio
-        elif emotion_score >= medium_risk_emotions[emotion.lower()] - 15:
-            emotion_risk_score = 1  # Riesgo bajo-medio
-    
-    # Calcular puntuación de riesgo de estilo
-    style_risk_score = 0
-    if style.lower() in high_risk_styles:
-        if style_score >= high_risk_styles[style.lower()]:
-            style_risk_score = 3  # Alto riesgo
-        elif style_score >= high_risk_styles[style.lower()] - 10:
-            style_risk_score = 2  # Riesgo medio-alto
-    elif style.lower() in medium_risk_styles:
-        if style_score >= medium_risk_styles[style.lower()]:
-            style_risk_score = 2  # Riesgo medio
-        elif style_score >= medium_risk_styles[style.lower()] - 15:
-            style_risk_score = 1  # Riesgo bajo-medio
-    
-    # Calcular puntuación total de riesgo
-    total_risk_score = emotion_risk_score + style_risk_score
-    
-    # Ajustar por contexto de riesgo acumulativo
-    if context_risk == "alto":
-        total_risk_score += 1
-    elif context_risk == "medio":
-        total_risk_score += 0.5
-    
-    # Casos especiales que elevan la prioridad
-    special_cases = {
-        "frustración": emotion_score >= 90,  # Frustración extrema
-        "tristeza": emotion_score >= 95,     # Tristeza profunda
-        "ansiedad": emotion_score >= 85,     # Ansiedad severa
-        "desánimo": emotion_score >= 90,     # Desánimo profundo
-    }
-    
-    # Verificar casos especiales
-    for emotion_type, condition in special_cases.items():
-        if emotion.lower() == emotion_type and condition:
-            total_risk_score = max(total_risk_score, 4)  # Forzar prioridad crítica
-    
-    # Determinar prioridad final
-    if total_risk_score >= 4:
-        return "crítica"
-    elif total_risk_score >= 3:
-        return "alta"
-    elif total_risk_score >= 2:
-        return "media"
-    elif total_risk_score >= 1:
-        return "baja"
-    else:
-        return "normal"
+    return rules_engine.priority(emotion, emotion_score, style, style_score, context_risk)
 
 
 def generate_recommendations(emotion: str, emotion_score: float, style: str, style_score: float, priority: str) -> Dict[str, List[str]]:
@@ -194,6 +267,22 @@ def generate_recommendations(emotion: str, emotion_score: float, style: str, sty
     return recommendations
 
 
+def recommendations_for(analysis: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Recomendaciones de un resultado de `analyze_text`; vacías si se resolvió por la ruta rápida.
+    """
+    if analysis.get("fast_path"):
+        fast_path_stats.record_recommendations_skipped()
+        return {key: [] for key in ("immediate_actions", "emotional_support", "communication_tips", "long_term_suggestions")}
+    return generate_recommendations(
+        analysis["emotion"],
+        analysis["emotion_score"],
+        analysis["style"],
+        analysis["style_score"],
+        analysis["priority"]
+    )
+
+
 def generate_summary(analysis: Dict[str, Any]) -> Dict[str, str]:
     """
     Genera un resumen ejecutivo del análisis.
@@ -242,75 +331,157 @@ def generate_summary(analysis: Dict[str, Any]) -> Dict[str, str]:
 def analyze_chat_context(history: List[str]) -> Dict[str, Any]:
     """
     Analiza el historial completo del chat para detectar patrones acumulativos de riesgo.
+    Clasifica todos los mensajes; con el contexto acumulado del usuario (`context_state`)
+    se evita volver a hacerlo en cada mensaje.
     Returns:
         dict con resumen de emociones y estilos repetidos.
     """
-    emotion_counter = {}
-    style_counter = {}
-    high_risk_count = 0
+    context = RollingContext()
+    for emotion_prediction, style_prediction in predict_pairs(history):
+        context.update(emotion_prediction.label, emotion_prediction.score, style_prediction.label, emotion_prediction.top())
+    return context.summary()
 
-    for msg in history:
-        emo, emo_score = predict_emotion(msg)
-        style, style_score = predict_style(msg)
 
-        emotion_counter[emo] = emotion_counter.get(emo, 0) + 1
-        style_counter[style] = style_counter.get(style, 0) + 1
+def is_fast_path(emotion_prediction: Prediction, style_prediction: Prediction) -> bool:
+    """
+    Ruta rápida: la emoción dominante no es de riesgo y su score supera `EARLY_EXIT_MIN_EMOTION_SCORE`,
+    y ningún estilo de riesgo llega a `EARLY_EXIT_MAX_RISK_STYLE_SCORE`. El límite nunca supera el menor
+    umbral de estilo de las reglas, así que ni la prioridad ni la alerta pueden elevarse por el mensaje en sí.
+    """
+    if not settings.EARLY_EXIT_ENABLED:
+        return False
+    if emotion_prediction.label.lower() in RISK_EMOTIONS or emotion_prediction.score < settings.EARLY_EXIT_MIN_EMOTION_SCORE:
+        return False
+    risk_style_score = 100 * max((
+        float(probability)
+        for label, probability in zip(style_prediction.classes, style_prediction.probabilities)
+        if str(label).lower() in RISK_STYLES
+    ), default=0.0)
+    return risk_style_score < min(settings.EARLY_EXIT_MAX_RISK_STYLE_SCORE, MIN_RISK_STYLE_TRIGGER)
 
-        if emo in ["frustración", "tristeza", "desánimo"] and emo_score >= 70:
-            high_risk_count += 1
 
-    context_flag = high_risk_count >= 2
-    return {
-        "emotion_frequency": emotion_counter,
-        "style_frequency": style_counter,
-        "context_alert": context_flag,
-        "context_risk_level": "alto" if context_flag else "normal"
-    }
+def get_fast_path_stats() -> Dict[str, Any]:
+    """Tasa de análisis resueltos por la ruta rápida y trabajo omitido."""
+    return fast_path_stats.stats()
 
 
-def analyze_text(text: str, history: Optional[List[str]] = None) -> dict:
+def build_analysis(
+    text: str,
+    emotion_prediction: Prediction,
+    style_prediction: Prediction,
+    history: Optional[List[str]] = None,
+    top_k: Optional[int] = None,
+    min_prob: Optional[float] = None,
+    context: Optional[RollingContext] = None,
+    evaluation: Optional[Tuple[str, bool, Optional[str]]] = None
+) -> dict:
     """
-    Analiza el texto individualmente, y opcionalmente el contexto (historial).
+    Construye el resultado de análisis a partir de predicciones ya calculadas.
+    `top_k` y `min_prob` recortan las distribuciones (por defecto, según la configuración).
+    Con `context` (contexto acumulado del usuario) el riesgo de contexto sale de su resumen en O(1)
+    en lugar de clasificar `history`, y el mensaje actual se agrega al contexto.
+    El riesgo de contexto se evalúa siempre: puede elevar la prioridad aunque el mensaje en sí sea
+    claramente neutro. Solo si el mensaje toma la ruta rápida (`is_fast_path`) y el contexto no
+    tiene riesgo, el resultado se marca con `fast_path` para que no se generen recomendaciones.
+    `evaluation` (prioridad, alerta, motivo) ya calculada en lote (`evaluate_pairs`) evita evaluar
+    las reglas de nuevo; solo se usa sin contexto.
     """
-    emotion_result = analyze_emotion(text)
-    style_result = analyze_style(text)
-
-    # Obtener contexto de riesgo si hay historial
-    context_risk = "normal"
-    if history:
-        context_info = analyze_chat_context(history)
-        context_risk = context_info.get("context_risk_level", "normal")
+    emotion_data = emotion_result(emotion_prediction, top_k, min_prob)
+    style_data = style_result(style_prediction, top_k, min_prob)
+
+    # Obtener contexto de riesgo: acumulado del usuario o, si no lo hay, clasificando el historial
+    if context is not None:
+        context_info = context.summary()
+    else:
+        context_info = analyze_chat_context(history) if history else None
+    context_risk = context_info.get("context_risk_level", "normal") if context_info else "normal"
+
+    fast_path = context_risk == "normal" and is_fast_path(emotion_prediction, style_prediction)
+    fast_path_stats.record(fast_path)
     
-    priority = evaluate_priority(
-        emotion_result["emotion"],
-        emotion_result["emotion_score"],
-        style_result["style"],
-        style_result["style_score"],
-        context_risk
-    )
+    if evaluation is not None and not context_info:
+        priority, alert_flag, reason = evaluation
+    else:
+        priority = evaluate_priority(
+            emotion_data["emotion"],
+            emotion_data["emotion_score"],
+            style_data["style"],
+            style_data["style_score"],
+            context_risk
+        )
 
-    alert_flag, alert_reason = check_combined_alert(
-        emotion_result["emotion"],
-        emotion_result["emotion_score"],
-        style_result["style"],
-        style_result["style_score"]
-    )
+        alert_flag, reason = check_combined_alert(
+            emotion_data["emotion"],
+            emotion_data["emotion_score"],
+            style_data["style"],
+            style_data["style_score"]
+        )
 
     result = {
         "text": text,
-        **emotion_result,
-        **style_result,
+        **emotion_data,
+        **style_data,
         "priority": priority,
         "alert": alert_flag,
-        "alert_reason": alert_reason if alert_flag else None,
+        "alert_reason": reason if alert_flag else None,
+        "model_version": f"{emotion_prediction.version}|{style_prediction.version}",
+        "fast_path": fast_path,
     }
 
-    if history:
-        context_info = analyze_chat_context(history)
+    if context_info:
         result.update(context_info)
 
+    if context is not None:
+        context.update(emotion_prediction.label, emotion_prediction.score, style_prediction.label, emotion_prediction.top())
+
     return result
 
+
+def evaluate_pairs(pairs: List[Tuple[Prediction, Prediction]]) -> List[Tuple[str, bool, Optional[str]]]:
+    """
+    Prioridad y alerta de varios pares (emoción, estilo) con una sola evaluación vectorizada de las reglas.
+
+    Returns:
+        List[Tuple[str, bool, Optional[str]]]: (prioridad, alerta, motivo) por par, en el mismo orden.
+    """
+    if not pairs:
+        return []
+    emotions, styles = zip(*pairs)
+    emotion_labels, emotion_scores = [p.label for p in emotions], [p.score for p in emotions]
+    style_labels, style_scores = [p.label for p in styles], [p.score for p in styles]
+    rules = rules_engine.evaluate_batch(emotion_labels, emotion_scores, style_labels, style_scores)
+
+    evaluations = []
+    for i, priority in enumerate(rules["priority"].tolist()):
+        emotion_alert, style_alert = bool(rules["emotion_alert"][i]), bool(rules["style_alert"][i])
+        reason = None
+        if emotion_alert or style_alert:
+            reason = alert_reason(emotion_labels[i], emotion_scores[i], style_labels[i], style_scores[i], emotion_alert, style_alert)
+        evaluations.append((priority, emotion_alert or style_alert, reason))
+    return evaluations
+
+
+def analyze_text(text: str, history: Optional[List[str]] = None, context: Optional[RollingContext] = None) -> dict:
+    """
+    Analiza el texto individualmente, y opcionalmente el contexto: el acumulado del usuario
+    (`context`, ver `context_state.context_store`) o el historial de textos (`history`).
+    """
+    emotion_prediction, style_prediction = predict_pair(text)
+    return build_analysis(text, emotion_prediction, style_prediction, history, context=context)
+
+
+def analyze_texts(texts: List[str], top_k: Optional[int] = None, min_prob: Optional[float] = None) -> List[dict]:
+    """
+    Analiza varios textos clasificándolos en lote (una llamada matricial por modelo)
+    y evaluando las reglas de prioridad y alerta de todos a la vez.
+    Equivale a `[analyze_text(t) for t in texts]` sin historial.
+    """
+    pairs = predict_pairs(texts)
+    return [
+        build_analysis(text, emotion_prediction, style_prediction, top_k=top_k, min_prob=min_prob, evaluation=evaluation)
+        for text, (emotion_prediction, style_prediction), evaluation in zip(texts, pairs, evaluate_pairs(pairs))
+    ]
+
 if __name__ == "__main__":
     history_msgs = [
         "¡Hola! Soy PsiChat, tu asistente emocional. ¿En qué puedo ayudarte hoy?"
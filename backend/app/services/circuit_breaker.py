@@ -0,0 +1,127 @@
+# backend/app/services/circuit_breaker.py
+
+"""
+Circuit breaker para dependencias externas (el proveedor de LLM).
+
+    - closed      las llamadas pasan; `failure_threshold` fallos seguidos abren el circuito
+    - open        las llamadas se rechazan al instante durante `recovery_timeout` segundos
+    - half_open   pasado ese tiempo se permiten hasta `half_open_max_calls` llamadas de prueba:
+                  si una tiene éxito el circuito se cierra y si falla se vuelve a abrir
+
+Uso:
+    if not breaker.allow():
+        ...  # respuesta alternativa sin llamar a la dependencia
+    try:
+        result = call()
+    except Exception:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.logging import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Attributes:
+        name (str): Dependencia protegida (para logs y métricas).
+        failure_threshold (int): Fallos seguidos que abren el circuito.
+        recovery_timeout (float): Segundos que el circuito queda abierto antes de probar de nuevo.
+        half_open_max_calls (int): Llamadas de prueba simultáneas en estado semiabierto.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at: Optional[float] = None
+            self._probes = 0
+            self.opened = 0
+            self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Indica si la llamada puede hacerse (en estado semiabierto, ocupa un lugar de prueba)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuito {self.name} cerrado")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+                self.opened += 1
+                logger.warning(f"Circuito {self.name} abierto", data={
+                    "failures": self._failures,
+                    "recovery_timeout": self.recovery_timeout
+                })
+
+    def release(self) -> None:
+        """Libera un lugar de prueba sin resultado (p. ej. la petición se canceló)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,321 @@
+# backend/app/services/context_state.py
+
+"""
+Contexto acumulado por usuario para la evaluación de riesgo.
+
+En lugar de volver a clasificar el historial en cada mensaje, cada usuario tiene un estado que se
+actualiza en O(número de clases) al analizar cada mensaje:
+
+    - trayectoria   scores por emoción con decaimiento exponencial en el tiempo (vida media
+                    `CONTEXT_HALF_LIFE_MINUTES`): los mensajes recientes pesan más que los antiguos
+    - riesgo        conteo decaído de mensajes de alto riesgo; alimenta `context_risk` de
+                    `evaluate_priority` ("alto" / "medio" / "normal")
+    - ventana       frecuencias de emoción y estilo de los últimos `CONTEXT_WINDOW` mensajes
+
+Si el usuario no está en memoria (reinicio o expulsado del LRU), el estado se reconstruye a partir
+de sus últimos registros de `Analisis`. Cada proceso tiene su propia caché: con varios workers, los
+mensajes que atiende otro proceso no llegan a este estado, así que un contexto en caché se vuelve a
+reconstruir desde la base de datos pasados `CONTEXT_TTL_SECONDS` (0 = sin caducidad, solo válido con
+un único worker).
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Emociones que, con score suficiente, cuentan como mensaje de alto riesgo en el contexto
+HIGH_RISK_CONTEXT_EMOTIONS = ("frustración", "tristeza", "desánimo")
+HIGH_RISK_CONTEXT_SCORE = 70
+
+
+def is_high_risk_message(emotion: str, emotion_score: float) -> bool:
+    return emotion in HIGH_RISK_CONTEXT_EMOTIONS and emotion_score >= HIGH_RISK_CONTEXT_SCORE
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """Segundos desde epoch de un datetime (naive = UTC, como `func.now()` en la base de datos)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RollingContext:
+    """
+    Trayectoria emocional de un usuario.
+
+    Attributes:
+        window (Optional[int]): Mensajes que se conservan para las frecuencias (None = sin límite).
+        half_life (Optional[float]): Vida media del decaimiento en segundos (None o 0 = sin decaimiento).
+        emotion_counts (Dict[str, int]): Frecuencia de cada emoción en la ventana.
+        style_counts (Dict[str, int]): Frecuencia de cada estilo en la ventana.
+        high_risk_count (int): Mensajes de alto riesgo en la ventana.
+        emotion_scores (Dict[str, float]): Probabilidad decaída acumulada por emoción.
+        weight (float): Número decaído de mensajes.
+        risk_score (float): Número decaído de mensajes de alto riesgo.
+        messages (int): Mensajes agregados desde que se creó el estado.
+        updated_at (Optional[float]): Instante (epoch) al que están referidos los valores decaídos.
+    """
+
+    def __init__(self, window: Optional[int] = None, half_life: Optional[float] = None):
+        self.window = window
+        self.half_life = half_life
+        self.emotion_counts: Dict[str, int] = {}
+        self.style_counts: Dict[str, int] = {}
+        self.high_risk_count = 0
+        self.emotion_scores: Dict[str, float] = {}
+        self.weight = 0.0
+        self.risk_score = 0.0
+        self.messages = 0
+        self.updated_at: Optional[float] = None
+        self._entries: deque = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _decay(self, seconds: float) -> float:
+        return 0.5 ** (seconds / self.half_life) if self.half_life and seconds > 0 else 1.0
+
+    def _advance(self, now: float) -> float:
+        """
+        Lleva los valores decaídos al instante `now` y devuelve el peso de un mensaje de ese instante
+        (menor que 1 si llega con marca de tiempo anterior a la última actualización).
+        """
+        if self.updated_at is None:
+            self.updated_at = now
+        if now <= self.updated_at:
+            return self._decay(self.updated_at - now)
+
+        factor = self._decay(now - self.updated_at)
+        if factor != 1.0:
+            for label in self.emotion_scores:
+                self.emotion_scores[label] *= factor
+            self.weight *= factor
+            self.risk_score *= factor
+        self.updated_at = now
+        return 1.0
+
+    def update(
+        self,
+        emotion: str,
+        emotion_score: float,
+        style: str,
+        distribution: Optional[Sequence[Tuple[str, float]]] = None,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Agrega un mensaje analizado.
+
+        Args:
+            distribution: (emoción, score%) de todas las clases; sin ella solo suma la dominante.
+            timestamp: Instante del mensaje en epoch (por defecto, ahora).
+        """
+        high_risk = is_high_risk_message(emotion, emotion_score)
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            weight = self._advance(now)
+            for label, score in distribution or ((emotion, emotion_score),):
+                self.emotion_scores[label] = self.emotion_scores.get(label, 0.0) + weight * score / 100
+            self.weight += weight
+            self.risk_score += weight if high_risk else 0.0
+            self.messages += 1
+
+            self._entries.append((emotion, style, high_risk))
+            self._add(emotion, style, high_risk, 1)
+            if self.window is not None and len(self._entries) > self.window:
+                self._add(*self._entries.popleft(), -1)
+
+    def _add(self, emotion: str, style: str, high_risk: bool, delta: int) -> None:
+        for counts, label in ((self.emotion_counts, emotion), (self.style_counts, style)):
+            counts[label] = counts.get(label, 0) + delta
+            if not counts[label]:
+                del counts[label]
+        self.high_risk_count += delta if high_risk else 0
+
+    def _risk_level(self) -> str:
+        if self.risk_score >= settings.CONTEXT_RISK_HIGH:
+            return "alto"
+        if self.risk_score >= settings.CONTEXT_RISK_MEDIUM:
+            return "medio"
+        return "normal"
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Resumen con el formato de `analyze_chat_context`, con el riesgo decaído hasta `now`."""
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            level = self._risk_level()
+            return {
+                "emotion_frequency": dict(self.emotion_counts),
+                "style_frequency": dict(self.style_counts),
+                "context_alert": level == "alto",
+                "context_risk_level": level,
+                "context_risk_score": round(self.risk_score, 3)
+            }
+
+    def trajectory(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Estado de la trayectoria para paneles: participación decaída de cada emoción (0-1, suma 1),
+        emoción dominante y riesgo acumulado.
+        """
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            total = sum(self.emotion_scores.values())
+            shares = {
+                label: round(score / total, 4)
+                for label, score in sorted(self.emotion_scores.items(), key=lambda item: -item[1])
+            } if total > 0 else {}
+            return {
+                "messages": self.messages,
+                "effective_messages": round(self.weight, 3),
+                "emotions": shares,
+                "dominant_emotion": next(iter(shares), None),
+                "risk_score": round(self.risk_score, 3),
+                "context_risk_level": self._risk_level(),
+                "updated_at": datetime.fromtimestamp(self.updated_at, timezone.utc).isoformat() if self.updated_at else None,
+                "half_life_minutes": self.half_life / 60 if self.half_life else None,
+            }
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[Any, ...]], window: Optional[int] = None, half_life: Optional[float] = None) -> "RollingContext":
+        """
+        Construye el estado a partir de tuplas (emoción, score, estilo[, creado_en]) en orden cronológico.
+        """
+        context = cls(window, half_life)
+        for emotion, emotion_score, style, *created in records:
+            context.update(emotion, emotion_score, style, timestamp=_epoch(created[0]) if created else None)
+        return context
+
+
+class ContextStore:
+    """
+    Contextos por usuario en memoria, con expulsión LRU al superar `max_users`.
+
+    Attributes:
+        ttl (Optional[float]): Segundos tras los que un contexto en caché se reconstruye desde la base de
+            datos, para incorporar los mensajes que atendieron otros workers (None o 0 = sin caducidad).
+    """
+
+    def __init__(
+        self,
+        window: int = 10,
+        max_users: int = 10000,
+        half_life: Optional[float] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window = window
+        self.max_users = max_users
+        self.half_life = half_life
+        self.ttl = ttl
+        self._clock = clock
+        self._contexts: "OrderedDict[int, RollingContext]" = OrderedDict()
+        self._synced_at: Dict[int, float] = {}  # Última reconstrucción desde la base de datos
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _is_fresh(self, user_id: int) -> bool:
+        return not self.ttl or self._clock() - self._synced_at[user_id] < self.ttl
+
+    def get(self, user_id: int, db: Optional[Session] = None) -> RollingContext:
+        """
+        Contexto del usuario. Si no está en memoria, o con sesión y pasado `ttl`, se reconstruye desde
+        la base de datos (o se crea vacío si no se pasa sesión).
+        """
+        with self._lock:
+            context = self._contexts.get(user_id)
+            if context is not None:
+                if db is None or self._is_fresh(user_id):
+                    self._contexts.move_to_end(user_id)
+                    self.hits += 1
+                    return context
+                self.expired += 1
+
+        started = self._clock()
+        records = []
+        if db is not None:
+            from app.db import crud
+            records = crud.get_recent_user_analyses(db, user_id, limit=self.window)
+        context = RollingContext.from_records(records, self.window, self.half_life)
+
+        with self._lock:
+            # Otro hilo pudo reconstruirlo mientras se consultaba la base de datos
+            existing = self._contexts.get(user_id)
+            if existing is not None and self._synced_at[user_id] >= started:
+                return existing
+            self._contexts[user_id] = context
+            self._contexts.move_to_end(user_id)
+            self._synced_at[user_id] = self._clock()
+            self.rebuilds += 1
+            while len(self._contexts) > self.max_users:
+                evicted, _ = self._contexts.popitem(last=False)
+                del self._synced_at[evicted]
+                self.evictions += 1
+        return context
+
+    def top_risk(
+        self,
+        limit: int = 20,
+        user_ids: Optional[Iterable[int]] = None,
+        db: Optional[Session] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Usuarios ordenados por riesgo acumulado (mayor primero), con su trayectoria. Recorre los estados,
+        no el historial de mensajes.
+
+        Args:
+            user_ids: Usuarios a considerar (el filtro se aplica antes de `limit`); los que no estén en
+                memoria se reconstruyen con `get`. Sin ellos, solo los usuarios en memoria de este proceso.
+        """
+        if user_ids is not None:
+            contexts = [(user_id, self.get(user_id, db)) for user_id in user_ids]
+        else:
+            with self._lock:
+                contexts = list(self._contexts.items())
+        now = time.time()
+        trajectories = [(user_id, context.trajectory(now)) for user_id, context in contexts]
+        trajectories.sort(key=lambda item: -item[1]["risk_score"])
+        return trajectories[:limit]
+
+    def discard(self, user_id: int) -> None:
+        with self._lock:
+            self._contexts.pop(user_id, None)
+            self._synced_at.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+            self._synced_at.clear()
+            self.hits = self.rebuilds = self.expired = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._contexts),
+                "window": self.window,
+                "half_life_minutes": self.half_life / 60 if self.half_life else None,
+                "max_users": self.max_users,
+                "ttl_seconds": self.ttl or None,
+                "hits": self.hits,
+                "rebuilds": self.rebuilds,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+context_store = ContextStore(
+    window=settings.CONTEXT_WINDOW,
+    max_users=settings.CONTEXT_MAX_USERS,
+    half_life=settings.CONTEXT_HALF_LIFE_MINUTES * 60,
+    ttl=settings.CONTEXT_TTL_SECONDS
+)
@@ -0,0 +1,119 @@
+# backend/app/services/inference_pool.py
+
+"""
+Backend de inferencia con un pool de procesos.
+Cada proceso carga los modelos de emoción y estilo una sola vez y atiende lotes de textos
+recibidos por la cola del pool, de modo que la clasificación escala con los núcleos y no
+queda limitada por el GIL del proceso de la API.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.logging import logger
+
+
+def _init_worker() -> None:
+    """Inicializador de cada proceso: carga y calienta los modelos una sola vez."""
+    import app.models.emotion  # noqa: F401
+    import app.models.style  # noqa: F401
+    from app.core.config import settings
+    from app.models.registry import ModelWatcher, registry
+
+    registry.load_all()
+    # Cada proceso vigila sus propios modelos para recargarlos sin reiniciar el pool
+    if settings.MODEL_RELOAD_INTERVAL > 0:
+        ModelWatcher(registry, interval=settings.MODEL_RELOAD_INTERVAL).start()
+
+
+def _classify_in_worker(texts: Sequence[str]) -> List[Tuple[Any, Any]]:
+    """Clasifica un lote de textos dentro del proceso trabajador."""
+    from app.models import multitask
+    from app.models.emotion import predict_emotions_batch
+    from app.models.style import predict_styles_batch
+
+    if multitask.USE_MULTITASK:
+        return multitask.predict_pairs_batch(texts)
+    return list(zip(predict_emotions_batch(texts), predict_styles_batch(texts)))
+
+
+class ProcessInferencePool:
+    """
+    Pool de procesos que sirve predicciones (emoción, estilo).
+    Expone la misma interfaz que el planificador de micro-lotes: `predict`, `predict_batch`, `stats`.
+    """
+
+    def __init__(self, workers: int = 2, chunk_size: int = 64):
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Arranca los procesos y espera a que todos tengan los modelos cargados."""
+        if self.running:
+            return
+        # "spawn" evita heredar hilos y locks del proceso de la API
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker
+        )
+        # Forzar el arranque de cada proceso antes de recibir tráfico
+        warmups = [self._executor.submit(_classify_in_worker, ["hola"]) for _ in range(self.workers)]
+        for future in warmups:
+            future.result()
+        logger.analysis("Pool de inferencia iniciado", {"workers": self.workers})
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancela las tareas no iniciadas, espera las que están en curso y cierra los procesos."""
+        if not self.running:
+            return
+        executor, self._executor = self._executor, None
+        executor.shutdown(wait=wait, cancel_futures=True)
+        logger.analysis("Pool de inferencia detenido", self.stats())
+
+    def predict(self, text: str, timeout: Optional[float] = None) -> Tuple[Any, Any]:
+        """Clasifica un texto en un proceso trabajador."""
+        return self.predict_batch([text], timeout=timeout)[0]
+
+    def predict_batch(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[Tuple[Any, Any]]:
+        """Reparte el lote en fragmentos entre los procesos y reúne los resultados en orden."""
+        executor = self._executor
+        if executor is None:
+            raise RuntimeError("El pool de inferencia no está en ejecución")
+
+        texts = list(texts)
+        # Fragmentos equilibrados entre procesos, sin superar chunk_size
+        size = min(self.chunk_size, max(1, -(-len(texts) // self.workers)))
+        futures = [executor.submit(_classify_in_worker, texts[i:i + size]) for i in range(0, len(texts), size)]
+
+        results: List[Tuple[Any, Any]] = []
+        for future in futures:
+            results.extend(future.result(timeout))
+
+        with self._stats_lock:
+            self.requests += 1
+            self.items += len(texts)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del pool."""
+        with self._stats_lock:
+            return {
+                "backend": "process_pool",
+                "running": self.running,
+                "workers": self.workers,
+                "chunk_size": self.chunk_size,
+                "requests": self.requests,
+                "items": self.items,
+            }
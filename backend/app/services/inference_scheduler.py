@@ -0,0 +1,159 @@
+# backend/app/services/inference_scheduler.py
+
+"""
+Planificador de inferencia por micro-lotes.
+Agrupa los textos que llegan dentro de una ventana de pocos milisegundos (hasta un tamaño máximo
+de lote) en una sola llamada vectorizada a los modelos y entrega a cada solicitante su resultado.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.logging import logger
+
+# Función que clasifica un lote de textos y devuelve un resultado por texto, en orden
+BatchFunction = Callable[[Sequence[str]], List[Any]]
+
+_STOP = object()
+
+
+class InferenceScheduler:
+    """
+    Micro-batching en proceso para las predicciones de emoción y estilo.
+
+    Un hilo de fondo toma el primer texto pendiente, espera hasta `window_ms` a que lleguen más
+    (o hasta completar `max_batch_size`) y ejecuta `batch_fn` una única vez para todo el lote.
+    """
+
+    def __init__(self, batch_fn: BatchFunction, max_batch_size: int = 10, window_ms: float = 5.0, name: str = "inference-scheduler"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_observed_batch = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Arranca el hilo de despacho."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.analysis("Planificador de micro-lotes iniciado", {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000
+        })
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Procesa los textos pendientes y detiene el hilo de despacho."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.analysis("Planificador de micro-lotes detenido", self.stats())
+
+    def submit(self, text: str) -> Future:
+        """Encola un texto y devuelve un Future con su resultado."""
+        future: Future = Future()
+        if not self.running:
+            future.set_exception(RuntimeError("El planificador de inferencia no está en ejecución"))
+            return future
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text: str, timeout: Optional[float] = None) -> Any:
+        """Encola un texto y espera su resultado."""
+        return self.submit(text).result(timeout)
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Any]:
+        """Un lote ya formado no necesita ventana: se clasifica directamente."""
+        return self.batch_fn(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de lotes procesados."""
+        with self._stats_lock:
+            return {
+                "backend": "microbatch",
+                "running": self.running,
+                "max_batch_size": self.max_batch_size,
+                "window_ms": self.window * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_observed_batch": self.max_observed_batch,
+                "errors": self.errors,
+                "pending": self._queue.qsize(),
+            }
+
+    def _collect(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        """Reúne el lote a partir del primer elemento. Devuelve (lote, detener)."""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]) -> None:
+        """Ejecuta el lote y reparte resultados (o la excepción) entre los solicitantes."""
+        pending = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+
+        try:
+            results = self.batch_fn([text for text, _ in pending])
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            logger.error("Error en lote de inferencia", error=e, data={"batch_size": len(pending)})
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(pending)
+            self.max_observed_batch = max(self.max_observed_batch, len(pending))
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stop = self._collect(item)
+            self._dispatch(batch)
+
+        # Vaciar lo que quede encolado antes de salir
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        for start in range(0, len(leftovers), self.max_batch_size):
+            self._dispatch(leftovers[start:start + self.max_batch_size])
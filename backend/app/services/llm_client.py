@@ -0,0 +1,119 @@
+# backend/app/services/llm_client.py
+
+"""
+Cliente HTTP asíncrono compartido para las llamadas al LLM.
+
+Un único `httpx.AsyncClient` con conexiones keep-alive y límites de pool para toda la aplicación:
+se crea en el `lifespan` de la API (`start_http_client`) y se cierra al apagarla (`close_http_client`).
+Las conversaciones en curso esperan la respuesta del LLM sin ocupar un hilo del threadpool.
+
+HTTP/2 se usa si `LLM_HTTP2` está activo y el paquete `h2` está instalado (`pip install httpx[http2]`);
+si no, HTTP/1.1 con keep-alive.
+
+El código que corre su propio bucle de eventos (p. ej. `generate_bot_reply` con `asyncio.run`) usa
+`scoped_http_client`, un cliente de vida corta que se cierra al salir, en lugar del compartido.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None  # Bucle de eventos en el que se creó el cliente
+_scoped: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("llm_scoped_http_client", default=None)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Cliente con los límites de pool y timeouts de la configuración."""
+    return httpx.AsyncClient(
+        http2=settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+        headers={"Content-Type": "application/json"}
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Crea el cliente compartido (llamar desde el `lifespan`)."""
+    global _client, _loop
+    if _client is None or _client.is_closed or _loop is not asyncio.get_running_loop():
+        if _client is not None and not _client.is_closed:
+            await _close_stale(_client)
+        _client = create_http_client()
+        _loop = asyncio.get_running_loop()
+        logger.info("Cliente HTTP del LLM iniciado", data={
+            "http2": settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+            "max_connections": settings.LLM_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+        })
+    return _client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente compartido y sus conexiones."""
+    global _client, _loop
+    client, _client, _loop = _client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+async def _close_stale(client: httpx.AsyncClient) -> None:
+    """Cierra el cliente de un bucle de eventos anterior para liberar sus conexiones keep-alive."""
+    try:
+        await client.aclose()
+    except Exception as e:
+        # Las conexiones de un bucle ya cerrado no siempre se pueden cerrar desde otro
+        logger.warning("No se pudo cerrar el cliente HTTP anterior del LLM", data={"error": str(e)})
+
+
+@asynccontextmanager
+async def scoped_http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Cliente propio para el bloque (y las tareas que lance), cerrado al salir; no toca el compartido."""
+    async with create_http_client() as client:
+        token = _scoped.set(client)
+        try:
+            yield client
+        finally:
+            _scoped.reset(token)
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Cliente compartido, o el de `scoped_http_client` si hay uno activo. Si la aplicación se usa sin
+    `lifespan` (p. ej. TestClient sin `with`), se crea en el primer uso; las conexiones de un cliente
+    pertenecen a su bucle de eventos, así que también se recrea (cerrando el anterior) si el bucle cambió.
+    """
+    scoped = _scoped.get()
+    if scoped is not None:
+        return scoped
+    if _client is None or _client.is_closed or _loop is not asyncio.get_running_loop():
+        return await start_http_client()
+    return _client
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """Estado del cliente compartido."""
+    return {
+        "started": _client is not None and not _client.is_closed,
+        "http2": settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+        "max_connections": settings.LLM_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        "timeout": settings.LLM_TIMEOUT,
+    }
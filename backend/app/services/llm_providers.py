@@ -0,0 +1,388 @@
+# backend/app/services/llm_providers.py
+
+"""
+Proveedores de LLM intercambiables para el chat.
+
+Todos reciben la conversación como mensajes `{"role": "system" | "user" | "assistant", "content"}`
+y exponen la misma interfaz:
+
+    - `complete(messages)`   respuesta completa (str)
+    - `stream(messages)`     fragmentos de la respuesta a medida que se generan
+    - `stats()`              llamadas, reintentos y errores
+
+Proveedores (`LLM_PROVIDER`):
+
+    - gemini       API de Gemini (`GEMINI_API_KEY`, `GEMINI_MODEL`); sin API key se usa `mock`
+    - openai       cualquier API compatible con OpenAI (`OPENAI_BASE_URL`, `OPENAI_API_KEY`, `OPENAI_MODEL`)
+    - openrouter   OpenRouter (`OPENROUTER_API_KEY`, `MODEL_ID`)
+    - mock         respuestas deterministas locales con latencia y tasa de fallos configurables,
+                   para pruebas de carga sin red (`LLM_MOCK_*`)
+
+Los proveedores HTTP usan el cliente compartido de `llm_client` (timeouts y conexiones reutilizadas)
+y reintentan con backoff exponencial los errores de conexión, los timeouts y los estados 429/5xx.
+Un stream solo se reintenta antes de recibir el primer fragmento.
+
+`get_breaker()` devuelve el circuit breaker del proveedor activo (`LLM_BREAKER_*`), que el chat usa
+para responder sin llamar al LLM mientras este falla.
+"""
+
+import asyncio
+import json
+import random
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.logging import logger
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.llm_client import get_http_client
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# Parámetros de generación comunes a todos los proveedores
+MAX_OUTPUT_TOKENS = 150
+TEMPERATURE = 0.7
+TOP_P = 0.9
+
+
+class LLMError(ExternalServiceError):
+    """Respuesta de error del proveedor de LLM."""
+
+    def __init__(self, service: str, upstream_status: int, message: str):
+        super().__init__(service, message, {"upstream_status": upstream_status})
+        self.upstream_status = upstream_status  # Estado HTTP devuelto por el proveedor
+
+    @property
+    def retryable(self) -> bool:
+        return self.upstream_status in RETRYABLE_STATUS
+
+
+def _json_body(raw: bytes) -> Dict[str, Any]:
+    """Cuerpo JSON de una respuesta de error (algunas APIs lo devuelven dentro de una lista)."""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return {}
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return data if isinstance(data, dict) else {}
+
+
+class LLMProvider:
+    """
+    Interfaz común de los proveedores.
+
+    Attributes:
+        name (str): Nombre en `LLM_PROVIDER`.
+        label (str): Nombre que aparece en los mensajes de error de la respuesta del chat.
+        description (str): Modelo que generó la respuesta, para los metadatos.
+    """
+
+    name = "base"
+    label = "LLM"
+
+    def __init__(self, max_retries: int = 0, backoff: float = 0.5):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+
+    @property
+    def description(self) -> str:
+        return self.label
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def _retrying(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta `attempt` reintentando los errores transitorios."""
+        self.calls += 1
+        for retry in range(self.max_retries + 1):
+            try:
+                return await attempt()
+            except (httpx.TransportError, LLMError) as e:
+                transient = not isinstance(e, LLMError) or e.retryable
+                if not transient or retry == self.max_retries:
+                    self.errors += 1
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** retry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "description": self.description,
+            "calls": self.calls,
+            "retries": self.retries,
+            "errors": self.errors,
+            "max_retries": self.max_retries,
+        }
+
+
+class HTTPProvider(LLMProvider):
+    """
+    Proveedor sobre HTTP. Las subclases definen la URL, las cabeceras, el payload y cómo leer
+    la respuesta, el error y cada línea del stream (SSE).
+    """
+
+    def url(self, stream: bool) -> str:
+        raise NotImplementedError
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def parse_reply(self, data: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def parse_error(self, data: Dict[str, Any]) -> str:
+        return data.get("error", {}).get("message", f"Error desconocido de {self.label}")
+
+    def parse_stream_line(self, line: str) -> str:
+        raise NotImplementedError
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        async def attempt() -> str:
+            client = await get_http_client()
+            response = await client.post(self.url(False), json=self.payload(messages, False), headers=self.headers())
+            if response.status_code != 200:
+                raise LLMError(self.label, response.status_code, self.parse_error(_json_body(response.content)))
+            return self.parse_reply(response.json())
+
+        return await self._retrying(attempt)
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        async def open_stream() -> httpx.Response:
+            client = await get_http_client()
+            request = client.build_request("POST", self.url(True), json=self.payload(messages, True), headers=self.headers())
+            response = await client.send(request, stream=True)
+            if response.status_code != 200:
+                body = await response.aread()
+                await response.aclose()
+                raise LLMError(self.label, response.status_code, self.parse_error(_json_body(body)))
+            return response
+
+        response = await self._retrying(open_stream)
+        try:
+            async for line in response.aiter_lines():
+                text = self.parse_stream_line(line)
+                if text:
+                    yield text
+        finally:
+            await response.aclose()
+
+
+class GeminiProvider(HTTPProvider):
+    """API `generateContent` de Gemini. El prompt de sistema va como primer mensaje del usuario."""
+
+    name = "gemini"
+    label = "Gemini"
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash", **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.model = model
+
+    @property
+    def description(self) -> str:
+        return self.model.replace("-", " ").title()  # "gemini-2.0-flash" -> "Gemini 2.0 Flash"
+
+    def url(self, stream: bool) -> str:
+        if stream:
+            return f"{self.BASE_URL}/models/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        return f"{self.BASE_URL}/models/{self.model}:generateContent?key={self.api_key}"
+
+    def payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        return {
+            "contents": [
+                {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages
+            ],
+            "generationConfig": {
+                "maxOutputTokens": MAX_OUTPUT_TOKENS,
+                "temperature": TEMPERATURE,
+                "topP": TOP_P
+            }
+        }
+
+    def parse_reply(self, data: Dict[str, Any]) -> str:
+        # Gemini responde en 'candidates' -> 'content' -> 'parts' -> 'text'
+        return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+
+    def parse_stream_line(self, line: str) -> str:
+        if not line.startswith("data:"):
+            return ""
+        chunk = json.loads(line[len("data:"):].strip())
+        candidates = chunk.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+class OpenAICompatibleProvider(HTTPProvider):
+    """API `chat/completions` de OpenAI y compatibles (OpenRouter, vLLM, Ollama, servidores locales)."""
+
+    name = "openai"
+    label = "OpenAI"
+
+    def __init__(self, base_url: str, api_key: str, model: str, label: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        if label:
+            self.label = label
+
+    @property
+    def description(self) -> str:
+        return f"{self.label} {self.model}"
+
+    def url(self, stream: bool) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "temperature": TEMPERATURE,
+            "top_p": TOP_P,
+            "stream": stream
+        }
+
+    def parse_reply(self, data: Dict[str, Any]) -> str:
+        return (data["choices"][0]["message"]["content"] or "").strip()
+
+    def parse_stream_line(self, line: str) -> str:
+        if not line.startswith("data:"):
+            return ""
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return ""
+        choices = json.loads(data).get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
+
+
+class MockProvider(LLMProvider):
+    """
+    LLM local y determinista para pruebas de carga del chat sin red: la respuesta depende solo
+    del último mensaje del usuario; la latencia y los fallos (error 503, reintentable) son configurables
+    y los fallos siguen una secuencia reproducible (`seed`).
+    """
+
+    name = "mock"
+    label = "Mock"
+
+    REPLIES = (
+        "Entiendo cómo te sientes. ¿Quieres contarme un poco más?",
+        "Gracias por compartirlo conmigo. Vamos paso a paso, ¿qué es lo que más te preocupa?",
+        "Es válido sentirse así. ¿Qué crees que te ayudaría ahora mismo?",
+        "Estoy aquí para ayudarte. ¿Quieres que revisemos juntos la tarea?",
+    )
+
+    def __init__(self, latency_ms: float = 200.0, token_latency_ms: float = 20.0, failure_rate: float = 0.0, seed: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency_ms / 1000
+        self.token_latency = token_latency_ms / 1000
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    def reply_for(self, messages: List[Dict[str, str]]) -> str:
+        last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        return self.REPLIES[zlib.crc32(last.encode("utf-8")) % len(self.REPLIES)]
+
+    async def _respond(self) -> None:
+        await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise LLMError(self.label, 503, "Fallo simulado")
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        await self._retrying(self._respond)
+        return self.reply_for(messages)
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        await self._retrying(self._respond)
+        words = self.reply_for(messages).split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield word if i == len(words) - 1 else word + " "
+
+
+def create_provider(name: Optional[str] = None) -> LLMProvider:
+    """Crea el proveedor `name` (por defecto, `LLM_PROVIDER`) con la configuración actual."""
+    name = (name or settings.LLM_PROVIDER).lower()
+    retries = {"max_retries": settings.LLM_MAX_RETRIES, "backoff": settings.LLM_RETRY_BACKOFF}
+    if name == "gemini":
+        if settings.GEMINI_API_KEY:
+            return GeminiProvider(settings.GEMINI_API_KEY, settings.GEMINI_MODEL, **retries)
+        logger.warning("GEMINI_API_KEY no está configurada: se usa el proveedor de LLM local (mock)")
+        name = "mock"
+    if name == "openai":
+        return OpenAICompatibleProvider(settings.OPENAI_BASE_URL, settings.OPENAI_API_KEY, settings.OPENAI_MODEL, **retries)
+    if name == "openrouter":
+        return OpenAICompatibleProvider(settings.OPENROUTER_BASE_URL, settings.OPENROUTER_API_KEY, settings.MODEL_ID, label="OpenRouter", **retries)
+    if name == "mock":
+        return MockProvider(
+            settings.LLM_MOCK_LATENCY_MS,
+            settings.LLM_MOCK_TOKEN_LATENCY_MS,
+            settings.LLM_MOCK_FAILURE_RATE,
+            settings.LLM_MOCK_SEED,
+            **retries
+        )
+    raise ValueError(f"Proveedor de LLM desconocido: {name}")
+
+
+_provider: Optional[LLMProvider] = None
+_breaker: Optional[CircuitBreaker] = None
+
+
+def create_breaker() -> Optional[CircuitBreaker]:
+    if not settings.LLM_BREAKER_ENABLED:
+        return None
+    return CircuitBreaker(
+        "llm",
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=settings.LLM_BREAKER_RECOVERY_SECONDS,
+        half_open_max_calls=settings.LLM_BREAKER_HALF_OPEN_CALLS
+    )
+
+
+def get_provider() -> LLMProvider:
+    """Proveedor activo (se crea en el primer uso a partir de la configuración)."""
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+
+def get_breaker() -> Optional[CircuitBreaker]:
+    """Circuit breaker del proveedor activo (None si `LLM_BREAKER_ENABLED` está desactivado)."""
+    global _breaker
+    if _breaker is None:
+        _breaker = create_breaker()
+    return _breaker
+
+
+def set_provider(provider: Optional[LLMProvider], breaker: Optional[CircuitBreaker] = None) -> None:
+    """
+    Instala otro proveedor (o vuelve al de la configuración, con None) con un circuit breaker
+    nuevo (por defecto, según la configuración).
+    """
+    global _provider, _breaker
+    _provider = provider
+    _breaker = breaker
@@ -0,0 +1,250 @@
+# backend/app/services/online_learning.py
+
+"""
+Aprendizaje en línea a partir de las correcciones de los tutores.
+Cada modelo (emoción, estilo) tiene una variante `SGDClassifier` sobre un espacio `HashingVectorizer`:
+el vectorizador no tiene estado, así que basta `partial_fit` del clasificador con cada mini-lote de
+correcciones nuevas (`CorreccionAnalisis`) para actualizar el modelo en segundos, sin releer el CSV
+ni reentrenar desde cero.
+
+El modelo se guarda como checkpoint joblib (escritura atómica) junto a un `.json` con el cursor de la
+última corrección consumida. El checkpoint inicial se crea con `ml_models/online_update.py --bootstrap`;
+para servirlo basta apuntar `EMOTION_MODEL_PATH`/`STYLE_MODEL_PATH` al checkpoint y el registro de
+modelos lo recarga en caliente tras cada actualización.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from app.core.logging import logger
+from app.models.normalization import normalize_text
+
+# Modelo -> tarea con la que se guardan sus correcciones
+TASKS = {"emotion": "emocion", "style": "estilo"}
+
+# Mismo tamaño por defecto que la variante hashing de ml_models/text_pipelines.py
+N_FEATURES = 2 ** 14
+
+
+def build_online_pipeline(n_features: int = N_FEATURES) -> Pipeline:
+    """Pipeline sin entrenar: hashing normalizado (sin estado) + regresión logística por SGD."""
+    return Pipeline([
+        ("hashing", HashingVectorizer(preprocessor=normalize_text, n_features=n_features, alternate_sign=False)),
+        ("clf", SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42))
+    ])
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class OnlineLearner:
+    """
+    Modelo actualizable con `partial_fit` y su checkpoint.
+
+    Attributes:
+        name (str): Nombre del modelo ("emotion" o "style").
+        task (str): Tarea de las correcciones que consume ("emocion" o "estilo").
+        checkpoint_path (Path): Pipeline joblib del modelo en línea.
+        state (Dict): Cursor (`last_correction_id`), ejemplos y actualizaciones acumulados.
+    """
+
+    def __init__(self, name: str, checkpoint_path: Union[str, Path], batch_size: int = 64):
+        self.name = name
+        self.task = TASKS[name]
+        self.checkpoint_path = Path(checkpoint_path)
+        self.state_path = self.checkpoint_path.with_suffix(".json")
+        self.batch_size = max(1, batch_size)
+        self.pipeline: Optional[Pipeline] = None
+        self._classes: Optional[List[str]] = None
+        self.state: Dict[str, Any] = {"last_correction_id": 0, "samples": 0, "updates": 0, "updated_at": None}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def classes(self) -> Optional[List[str]]:
+        """Etiquetas del modelo (fijadas en el primer `partial_fit`)."""
+        clf = self.pipeline.named_steps["clf"] if self.pipeline is not None else None
+        if hasattr(clf, "classes_"):
+            return [str(label) for label in clf.classes_]
+        return self._classes
+
+    def load(self) -> bool:
+        """Carga el checkpoint y su cursor. Devuelve False si todavía no existe."""
+        signature = _file_signature(self.checkpoint_path)
+        if signature is None:
+            return False
+        self.pipeline = joblib.load(self.checkpoint_path)
+        if self.state_path.exists():
+            self.state.update(json.loads(self.state_path.read_text(encoding="utf-8")))
+        self._signature = signature
+        return True
+
+    def reset(self, classes: Sequence[str], n_features: int = N_FEATURES) -> None:
+        """Empieza un modelo nuevo con las etiquetas dadas (cursor en cero)."""
+        self.pipeline = build_online_pipeline(n_features)
+        self._classes = sorted(str(label) for label in classes)
+        self.state = {"last_correction_id": 0, "samples": 0, "updates": 0, "updated_at": None}
+
+    def partial_fit(self, texts: Sequence[str], labels: Sequence[str]) -> int:
+        """
+        Actualiza el modelo con un mini-lote. Se descartan los textos vacíos y las etiquetas
+        que el modelo no conoce (el conjunto de clases de SGD queda fijo tras el primer lote).
+
+        Returns:
+            int: Ejemplos usados.
+        """
+        known = set(self.classes or ())
+        pairs = [(text, label) for text, label in zip(texts, labels)
+                 if label in known and isinstance(text, str) and text.strip()]
+        if not pairs:
+            return 0
+
+        batch_texts, batch_labels = zip(*pairs)
+        X = self.pipeline.named_steps["hashing"].transform(batch_texts)
+        self.pipeline.named_steps["clf"].partial_fit(X, list(batch_labels), classes=self.classes)
+        self.state["samples"] += len(pairs)
+        return len(pairs)
+
+    def save(self) -> Path:
+        """
+        Escribe el checkpoint y el cursor, cada uno con un reemplazo atómico (el registro puede estar
+        leyéndolos). El checkpoint se reemplaza primero y el cursor al final: si el proceso falla entre
+        ambos, el siguiente `load()` vuelve a aplicar algunas correcciones, pero nunca se salta ninguna.
+        """
+        self.state["updated_at"] = datetime.utcnow().isoformat()
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.checkpoint_path.with_suffix(".joblib.tmp")
+        joblib.dump(self.pipeline, tmp_path)
+        tmp_state = self.state_path.with_suffix(".json.tmp")
+        tmp_state.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+        os.replace(tmp_state, self.state_path)
+
+        self._signature = _file_signature(self.checkpoint_path)
+        return self.checkpoint_path
+
+    def update(self, db: Any) -> int:
+        """
+        Consume las correcciones nuevas de la base de datos en mini-lotes y guarda un checkpoint.
+
+        Returns:
+            int: Ejemplos usados (0 si no había correcciones o no hay checkpoint inicial).
+        """
+        from app.db import crud
+
+        with self._lock:
+            # Otro proceso (p. ej. un bootstrap) pudo reescribir el checkpoint
+            signature = _file_signature(self.checkpoint_path)
+            if (self.pipeline is None or signature != self._signature) and not self.load():
+                logger.analysis("Modelo en línea sin checkpoint inicial; ejecutar online_update.py --bootstrap",
+                                {"model": self.name, "path": str(self.checkpoint_path)})
+                return 0
+
+            start = time.perf_counter()
+            used = consumed = 0
+            while True:
+                rows = crud.get_corrections_since(db, self.task, self.state["last_correction_id"], self.batch_size)
+                if not rows:
+                    break
+                used += self.partial_fit([row.texto for row in rows], [row.etiqueta for row in rows])
+                consumed += len(rows)
+                self.state["last_correction_id"] = rows[-1].id
+
+            if not consumed:
+                return 0
+            if used:
+                self.state["updates"] += 1
+            self.save()
+            logger.analysis("Modelo en línea actualizado", {
+                "model": self.name,
+                "corrections": consumed,
+                "samples": used,
+                "last_correction_id": self.state["last_correction_id"],
+                "elapsed_s": round(time.perf_counter() - start, 3)
+            })
+            return used
+
+
+class OnlineLearningJob:
+    """Hilo que aplica periódicamente las correcciones nuevas a los modelos en línea."""
+
+    def __init__(
+        self,
+        learners: Sequence[OnlineLearner],
+        session_factory: Callable[[], Any],
+        interval: float = 60.0,
+        model_registry: Any = None
+    ):
+        self.learners = list(learners)
+        self.session_factory = session_factory
+        self.interval = interval
+        self.registry = model_registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="online-learning", daemon=True)
+        self._thread.start()
+        logger.analysis("Aprendizaje en línea iniciado", {
+            "interval_s": self.interval,
+            "models": [learner.name for learner in self.learners]
+        })
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def run_once(self) -> Dict[str, int]:
+        """Actualiza todos los modelos una vez. Devuelve los ejemplos usados por modelo."""
+        db = self.session_factory()
+        try:
+            results = {learner.name: learner.update(db) for learner in self.learners}
+        finally:
+            db.close()
+        # Si la API sirve un checkpoint en línea, cambiarlo ya sin esperar al ModelWatcher
+        if self.registry is not None and any(results.values()):
+            self.registry.reload_changed()
+        return results
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Error en la actualización de modelos en línea", error=e)
+
+
+def default_learners(batch_size: int = 64) -> List[OnlineLearner]:
+    """Modelos en línea de emoción y estilo en las rutas de la configuración."""
+    from app.core.config import settings
+
+    return [
+        OnlineLearner("emotion", settings.EMOTION_ONLINE_MODEL_PATH, batch_size=batch_size),
+        OnlineLearner("style", settings.STYLE_ONLINE_MODEL_PATH, batch_size=batch_size),
+    ]
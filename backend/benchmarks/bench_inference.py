@@ -0,0 +1,285 @@
+# backend/benchmarks/bench_inference.py
+
+"""
+Benchmark reproducible de la capa de inferencia: `app/models/emotion.py`, `app/models/style.py`
+y `analyze_text`, reproduciendo los textos de `dataset_emocion.csv` y `dataset_estilo.csv`
+(mezclados con semilla fija, de modo que cada ejecución usa los mismos textos en el mismo orden).
+
+Mide:
+    - single       latencia p50/p95/p99 por llamada (predicción de emoción, de estilo y analyze_text sin caché)
+    - batch        throughput (textos/s) y latencia por lote de `classify_pairs` con varios tamaños de lote
+    - cold_start   importación y carga + calentamiento de los modelos en un proceso nuevo, y su RSS máximo
+    - peak_rss_mb  RSS máximo del proceso del benchmark
+
+El reporte JSON incluye el commit, las versiones de las librerías y la configuración de los modelos
+(`USE_COMPILED_MODELS`, `MODEL_MMAP`, `USE_MULTITASK_MODEL`), para compararlo entre commits con
+`benchmarks/compare.py`. Requiere la misma configuración (.env) que la API.
+
+Uso (desde backend/):
+    python benchmarks/bench_inference.py
+    python benchmarks/bench_inference.py --texts 5000 --batch-sizes 1 8 32 128 --output benchmarks/results/base.json
+    USE_MULTITASK_MODEL=true python benchmarks/bench_inference.py --output benchmarks/results/multitask.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+DATASETS = [
+    BACKEND_DIR / "ml_models" / "emotion_detection" / "dataset_emocion.csv",
+    BACKEND_DIR / "ml_models" / "style_classification" / "dataset_estilo.csv",
+]
+
+# Variables de entorno que cambian el modelo servido
+MODEL_ENV = ["USE_COMPILED_MODELS", "MODEL_MMAP", "USE_MULTITASK_MODEL", "EMOTION_MODEL_PATH", "STYLE_MODEL_PATH", "MULTITASK_MODEL_PATH"]
+
+
+def load_texts(limit: int, seed: int = 42) -> List[str]:
+    """Textos de ambos datasets mezclados con semilla fija (los primeros `limit`)."""
+    texts = []
+    for path in DATASETS:
+        texts.extend(pd.read_csv(path)["texto"].dropna().astype(str).tolist())
+    random.Random(seed).shuffle(texts)
+    return texts[:limit]
+
+
+def peak_rss_mb() -> float:
+    """RSS máximo del proceso (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def latency_stats(timings: Sequence[float]) -> Dict[str, Any]:
+    """Percentiles de una lista de tiempos en segundos, en microsegundos."""
+    values = np.asarray(timings) * 1e6
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "n": len(values),
+        "p50_us": round(float(p50), 1),
+        "p95_us": round(float(p95), 1),
+        "p99_us": round(float(p99), 1),
+        "mean_us": round(float(values.mean()), 1),
+        "max_us": round(float(values.max()), 1),
+    }
+
+
+def bench_single(fn: Callable[[str], Any], texts: Sequence[str], warmup: int) -> Dict[str, Any]:
+    for text in texts[:warmup]:
+        fn(text)
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return latency_stats(timings)
+
+
+def bench_batches(fn: Callable[[List[str]], Any], texts: Sequence[str], batch_sizes: Sequence[int]) -> Dict[str, Any]:
+    results = {}
+    for size in batch_sizes:
+        batches = [list(texts[i:i + size]) for i in range(0, len(texts) - size + 1, size)]
+        if not batches:
+            continue
+        fn(batches[0])
+        timings = []
+        start_total = time.perf_counter()
+        for batch in batches:
+            start = time.perf_counter()
+            fn(batch)
+            timings.append(time.perf_counter() - start)
+        total = time.perf_counter() - start_total
+        stats = latency_stats(timings)
+        results[str(size)] = {
+            "batches": len(batches),
+            "texts_per_s": round(len(batches) * size / total, 1),
+            "batch_p50_us": stats["p50_us"],
+            "batch_p99_us": stats["p99_us"],
+        }
+    return results
+
+
+def quiet_console_logs() -> None:
+    """Los logs de carga de modelos van a stdout; en consola solo se dejan advertencias y errores."""
+    for handler in logging.getLogger("psichat").handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+
+
+def cold_start_child() -> None:
+    """Proceso hijo: importa y carga los modelos desde cero e imprime las mediciones en JSON."""
+    start = time.perf_counter()
+    from app.models import emotion, style  # noqa: F401
+    from app.models.registry import registry
+    import_s = time.perf_counter() - start
+    quiet_console_logs()
+
+    start = time.perf_counter()
+    ready = registry.load_all()
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    emotion.get_emotion_prediction("hola, ¿cómo estás?")
+    style.get_style_prediction("hola, ¿cómo estás?")
+    first_ms = (time.perf_counter() - start) * 1000
+
+    models = registry.status()["models"]
+    print(json.dumps({
+        "ready": ready,
+        "import_s": import_s,
+        "load_s": load_s,
+        "first_prediction_ms": first_ms,
+        "rss_mb": peak_rss_mb(),
+        "models": {name: {"load_ms": m["load_ms"], "warmup_ms": m["warmup_ms"]} for name, m in models.items()},
+    }))
+
+
+def bench_cold_start(runs: int) -> Dict[str, Any]:
+    """Mediana de `runs` arranques en frío (proceso nuevo en cada uno)."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--cold-start-child"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    def median(key: str, scale: float = 1.0, digits: int = 1) -> float:
+        return round(float(np.median([sample[key] for sample in samples])) * scale, digits)
+
+    return {
+        "runs": runs,
+        "ready": all(sample["ready"] for sample in samples),
+        "import_ms": median("import_s", 1000),
+        "load_ms": median("load_s", 1000),
+        "first_prediction_ms": median("first_prediction_ms", digits=2),
+        "rss_mb": median("rss_mb"),
+        "models": samples[-1]["models"],
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Commit, plataforma, librerías y configuración de modelos del reporte."""
+    import scipy
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip() or None
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--", "app", "ml_models"], cwd=BACKEND_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+    except OSError:
+        commit, dirty = None, None
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "libraries": {"numpy": np.__version__, "scipy": scipy.__version__, "sklearn": sklearn.__version__, "pandas": pd.__version__},
+        "model_env": {name: os.environ[name] for name in MODEL_ENV if name in os.environ},
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    from app.models.emotion import get_emotion_prediction
+    from app.models.registry import registry
+    from app.models.style import get_style_prediction
+    from app.services import analysis_service
+    quiet_console_logs()
+
+    texts = load_texts(args.texts, args.seed)
+    registry.load_all()
+    # La caché devolvería los textos repetidos sin pasar por el modelo
+    analysis_service.prediction_cache.enabled = args.with_cache
+
+    report = {
+        "environment": environment(),
+        "config": {"texts": len(texts), "seed": args.seed, "warmup": args.warmup, "batch_sizes": args.batch_sizes, "cache": args.with_cache},
+        "models": {name: status["version"] for name, status in registry.status()["models"].items()},
+        "single": {
+            "emotion": bench_single(get_emotion_prediction, texts, args.warmup),
+            "style": bench_single(get_style_prediction, texts, args.warmup),
+            "analyze_text": bench_single(analysis_service.analyze_text, texts, args.warmup),
+        },
+        "batch": bench_batches(analysis_service.classify_pairs, texts, args.batch_sizes),
+        "fast_path": analysis_service.get_fast_path_stats(),
+    }
+    if args.cold_start_runs > 0:
+        report["cold_start"] = bench_cold_start(args.cold_start_runs)
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    env = report["environment"]
+    print(f"\n📏 Benchmark de inferencia ({report['config']['texts']} textos, commit {(env['commit'] or '?')[:10]}"
+          f"{' +cambios' if env['dirty'] else ''})")
+    print(f"   Modelos: {', '.join(f'{name}={version}' for name, version in report['models'].items())}")
+
+    print(f"\n   {'llamada':<14}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}{'media µs':>10}")
+    for name, stats in report["single"].items():
+        print(f"   {name:<14}{stats['p50_us']:>10.1f}{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}{stats['mean_us']:>10.1f}")
+
+    print(f"\n   {'lote':<14}{'textos/s':>10}{'p50 µs':>12}{'p99 µs':>12}")
+    for size, stats in report["batch"].items():
+        print(f"   {size:<14}{stats['texts_per_s']:>10.0f}{stats['batch_p50_us']:>12.1f}{stats['batch_p99_us']:>12.1f}")
+
+    fast = report["fast_path"]
+    print(f"\n   Ruta rápida de analyze_text: {fast['fast_path']}/{fast['analyses']} análisis ({fast['skip_rate']:.1%})")
+
+    cold = report.get("cold_start")
+    if cold:
+        print(f"\n   Arranque en frío (mediana de {cold['runs']}): importación {cold['import_ms']:.1f} ms, "
+              f"carga {cold['load_ms']:.1f} ms, primera predicción {cold['first_prediction_ms']:.2f} ms, RSS {cold['rss_mb']:.1f} MB")
+    print(f"   RSS máximo del benchmark: {report['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latencia y throughput de la capa de inferencia.")
+    parser.add_argument("--texts", type=int, default=2000, help="Textos del dataset a reproducir")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de la mezcla de textos")
+    parser.add_argument("--warmup", type=int, default=50, help="Llamadas de calentamiento antes de medir")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128], help="Tamaños de lote")
+    parser.add_argument("--cold-start-runs", type=int, default=3, help="Arranques en frío a medir (0 = omitir)")
+    parser.add_argument("--with-cache", action="store_true", help="Mantener la caché de predicciones en analyze_text")
+    parser.add_argument("--output", type=Path, default=None, help="Guardar el reporte JSON en esta ruta")
+    parser.add_argument("--json", action="store_true", help="Imprimir el reporte en JSON")
+    parser.add_argument("--cold-start-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_child:
+        cold_start_child()
+        return
+
+    report = run(args)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+        if args.output:
+            print(f"\n✅ Reporte guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
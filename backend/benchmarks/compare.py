@@ -0,0 +1,86 @@
+# backend/benchmarks/compare.py
+
+"""
+Compara dos reportes de `bench_inference.py` (p. ej. de dos commits) métrica por métrica.
+
+Las métricas de tiempo y memoria (`*_us`, `*_ms`, `*_mb`) mejoran al bajar y las de throughput
+(`*_per_s`) al subir. Termina con código 1 si alguna empeora más que `--threshold`, para usarlo en CI.
+
+Uso (desde backend/):
+    python benchmarks/compare.py benchmarks/results/base.json benchmarks/results/multitask.json
+    python benchmarks/compare.py base.json nuevo.json --threshold 5
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+LOWER_IS_BETTER = ("_us", "_ms", "_mb")
+HIGHER_IS_BETTER = ("_per_s",)
+
+# Secciones que describen el entorno, no el rendimiento
+SKIPPED = ("environment", "config", "models", "cold_start.models")
+
+# Un único valor extremo (GC, planificador del sistema): se reporta pero no se compara
+NOISY = ("max_us",)
+
+
+def metrics(report: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Recorre el reporte y produce (ruta.de.la.métrica, valor) para cada métrica comparable."""
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if path in SKIPPED:
+            continue
+        if isinstance(value, dict):
+            yield from metrics(value, f"{path}.")
+        elif key in NOISY:
+            continue
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key.endswith(LOWER_IS_BETTER + HIGHER_IS_BETTER):
+            yield path, float(value)
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Cambio porcentual de cada métrica presente en ambos reportes (positivo = mejora)."""
+    new_metrics = dict(metrics(new))
+    rows = []
+    for path, before in metrics(base):
+        if path not in new_metrics or before == 0:
+            continue
+        after = new_metrics[path]
+        change = (after - before) / before * 100
+        improvement = change if path.endswith(HIGHER_IS_BETTER) else -change
+        rows.append({"metric": path, "base": before, "new": after, "improvement_pct": round(improvement, 1)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos reportes de benchmark.")
+    parser.add_argument("base", type=Path, help="Reporte de referencia")
+    parser.add_argument("new", type=Path, help="Reporte a comparar")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento máximo tolerado (%)")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    rows = compare(base, new)
+
+    print(f"\n📊 {(base['environment']['commit'] or '?')[:10]} -> {(new['environment']['commit'] or '?')[:10]}")
+    print(f"   {'métrica':<40}{'base':>12}{'nuevo':>12}{'mejora':>10}")
+    regressions = []
+    for row in rows:
+        flag = ""
+        if row["improvement_pct"] < -args.threshold:
+            flag = "  ❌"
+            regressions.append(row["metric"])
+        print(f"   {row['metric']:<40}{row['base']:>12.1f}{row['new']:>12.1f}{row['improvement_pct']:>9.1f}%{flag}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} métricas empeoran más de {args.threshold:.0f}%")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones mayores a {args.threshold:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
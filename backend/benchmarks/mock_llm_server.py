@@ -0,0 +1,99 @@
+# backend/benchmarks/mock_llm_server.py
+
+"""
+Servidor local compatible con la API `chat/completions` de OpenAI que responde con el proveedor
+`mock` de `app/services/llm_providers.py` (respuestas deterministas, latencia y tasa de fallos
+configurables). Permite probar la carga de todo el camino del chat, incluido el cliente HTTP
+compartido, sin red ni API keys.
+
+Uso (desde backend/):
+    python benchmarks/mock_llm_server.py --port 8001 --latency-ms 300 --failure-rate 0.05
+
+y en otra terminal, la API apuntando a él:
+    LLM_PROVIDER=openai OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+
+from app.services.llm_providers import LLMError, MockProvider  # noqa: E402
+
+
+def create_app(provider: MockProvider) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "mock")
+
+        if not body.get("stream"):
+            try:
+                reply = await provider.complete(messages)
+            except LLMError as e:
+                return JSONResponse({"error": {"message": e.message}}, status_code=e.upstream_status)
+            return {
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            }
+
+        tokens = provider.stream(messages)
+        try:
+            first = await tokens.__anext__()
+        except LLMError as e:
+            return JSONResponse({"error": {"message": e.message}}, status_code=e.upstream_status)
+
+        async def events():
+            yield _chunk(model, first)
+            async for text in tokens:
+                yield _chunk(model, text)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return provider.stats()
+
+    return app
+
+
+def _chunk(model: str, text: str) -> str:
+    return "data: " + json.dumps({
+        "object": "chat.completion.chunk",
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": text}}],
+    }, ensure_ascii=False) + "\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor LLM local para pruebas de carga.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Espera hasta el primer fragmento")
+    parser.add_argument("--token-latency-ms", type=float, default=20.0, help="Espera entre fragmentos del stream")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    # Los reintentos los hace el cliente (la API), no el servidor
+    provider = MockProvider(args.latency_ms, args.token_latency_ms, args.failure_rate, args.seed, max_retries=0)
+    uvicorn.run(create_app(provider), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# backend/ml_models/benchmark_normalization.py
+
+"""
+Compara la normalización compartida (`app.models.normalization.normalize_text`, tabla de traducción)
+con la implementación anterior por llamada (`unicodedata.normalize` NFD + ASCII + regex) sobre los
+textos de los datasets incluidos, verificando primero que ambas producen exactamente la misma salida.
+
+Uso (desde backend/):
+    python ml_models/benchmark_normalization.py
+    python ml_models/benchmark_normalization.py --repeat 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+from app.models.normalization import normalize_text, normalize_text_unicodedata  # noqa: E402
+
+DATASETS = [
+    BASE_DIR / "emotion_detection" / "dataset_emocion.csv",
+    BASE_DIR / "style_classification" / "dataset_estilo.csv",
+]
+
+
+def best_time(fn, texts, repeat: int) -> float:
+    """Mejor tiempo (s) de `repeat` pasadas de `fn` sobre todos los textos."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara normalize_text con la normalización por unicodedata.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se reporta la mejor)")
+    args = parser.parse_args()
+
+    texts = []
+    for path in DATASETS:
+        texts.extend(pd.read_csv(path)["texto"].dropna().astype(str).tolist())
+
+    mismatches = [text for text in texts if normalize_text(text) != normalize_text_unicodedata(text)]
+    if mismatches:
+        sys.exit(f"❌ {len(mismatches)} textos con salida distinta, p. ej.: {mismatches[0]!r}")
+
+    latin1 = sum(1 for text in texts if max(text, default="\0") <= "\xff")
+    reference = best_time(normalize_text_unicodedata, texts, args.repeat)
+    shared = best_time(normalize_text, texts, args.repeat)
+
+    print(f"\n✅ Salidas idénticas en {len(texts)} textos ({latin1 / len(texts) * 100:.1f}% en Latin-1)")
+    print(f"   unicodedata (NFD + ASCII + regex): {reference * 1000:.1f} ms ({reference / len(texts) * 1e6:.2f} µs/texto)")
+    print(f"   tabla de traducción:               {shared * 1000:.1f} ms ({shared / len(texts) * 1e6:.2f} µs/texto)")
+    print(f"   Aceleración: {reference / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# backend/ml_models/compile_models.py
+
+"""
+Compila los pipelines entrenados (joblib) al formato NumPy de `app.models.compiled`
+y valida que las probabilidades coinciden con scikit-learn sobre los datasets incluidos.
+
+Formatos:
+    npz     Artefacto único comprimido (`emotion_model.npz`).
+    shared  Directorio con arreglos `.npy` sin comprimir para cargarlos con mmap (`emotion_model.shared/`).
+
+Uso (desde backend/):
+    python ml_models/compile_models.py
+    python ml_models/compile_models.py --models emotion --atol 1e-10 --format shared
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+import shutil  # noqa: E402
+
+from app.models.compiled import CompiledTextClassifier, compile_pipeline, compare_with_pipeline, compiled_path_for, shared_path_for  # noqa: E402
+from app.models.prediction import model_file_version  # noqa: E402
+
+MODELS = {
+    "emotion": (BASE_DIR / "emotion_detection" / "emotion_model.joblib", BASE_DIR / "emotion_detection" / "dataset_emocion.csv"),
+    "style": (BASE_DIR / "style_classification" / "style_model.joblib", BASE_DIR / "style_classification" / "dataset_estilo.csv"),
+}
+
+
+def _save(compiled: CompiledTextClassifier, model_path: Path, fmt: str):
+    """Guarda el artefacto y devuelve (ruta, recargado tal como se usará en producción)."""
+    if fmt == "shared":
+        output = compiled.save_shared(shared_path_for(model_path))
+        return output, CompiledTextClassifier.load_shared(output, mmap=True)
+    output = compiled.save(compiled_path_for(model_path))
+    return output, CompiledTextClassifier.load(output)
+
+
+def _size_kb(path: Path) -> float:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir()) / 1024
+    return path.stat().st_size / 1024
+
+
+def compile_model(name: str, atol: float, fmt: str) -> bool:
+    model_path, dataset_path = MODELS[name]
+    pipeline = joblib.load(model_path)
+
+    compiled = compile_pipeline(pipeline, source_version=model_file_version(model_path))
+    output, reloaded = _save(compiled, model_path, fmt)
+
+    # Validar el artefacto tal como se cargará en producción
+    texts = pd.read_csv(dataset_path)["texto"].dropna().astype(str).tolist()
+    report = compare_with_pipeline(reloaded, pipeline, texts)
+
+    start = time.perf_counter()
+    pipeline.predict_proba(texts)
+    sklearn_time = time.perf_counter() - start
+    start = time.perf_counter()
+    reloaded.predict_proba(texts)
+    compiled_time = time.perf_counter() - start
+
+    ok = report["classes_match"] and report["max_abs_diff"] <= atol and report["label_agreement"] == 1.0
+    print(f"\n{'✅' if ok else '❌'} {name} ({fmt}): {output}")
+    print(f"   Textos validados: {report['texts']}")
+    print(f"   Diferencia absoluta máxima: {report['max_abs_diff']:.3e} (tolerancia {atol:.0e})")
+    print(f"   Concordancia de etiquetas: {report['label_agreement'] * 100:.2f}%")
+    print(f"   Tamaño: joblib {model_path.stat().st_size / 1024:.1f} KB -> compilado {_size_kb(output):.1f} KB")
+    print(f"   Lote completo: sklearn {sklearn_time * 1000:.1f} ms, compilado {compiled_time * 1000:.1f} ms")
+
+    if not ok:
+        if output.is_dir():
+            shutil.rmtree(output)
+        else:
+            output.unlink()
+        print("   Artefacto eliminado por no superar la validación.")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila y valida los modelos de emoción y estilo.")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=sorted(MODELS), help="Modelos a compilar")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Diferencia absoluta máxima permitida en probabilidades")
+    parser.add_argument("--format", choices=["npz", "shared", "both"], default="both", help="Formato del artefacto")
+    args = parser.parse_args()
+
+    formats = ["npz", "shared"] if args.format == "both" else [args.format]
+    results = [compile_model(name, args.atol, fmt) for name in args.models for fmt in formats]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
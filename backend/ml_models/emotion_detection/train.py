@@ -1,17 +1,21 @@
-# backend/ml_models/style_classification/train.py
+# backend/ml_models/emotion_detection/train.py
 
 import os
+import sys
 import argparse
 import pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 
-def main(dataset_path: str, output_dir: str):
+# Permite importar los pipelines compartidos (y `app`) al ejecutar desde cualquier directorio
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+from text_pipelines import DEFAULT_N_FEATURES, VECTORIZERS, build_pipeline, model_filename  # noqa: E402
+
+def main(dataset_path: str, output_dir: str, vectorizer: str = "tfidf", n_features: int = DEFAULT_N_FEATURES):
     # 1. Verificar dataset
     dataset_file = Path(dataset_path)
     if not dataset_file.exists():
@@ -19,22 +23,21 @@ def main(dataset_path: str, output_dir: str):
 
     # 2. Cargar datos
     df = pd.read_csv(dataset_file)
-    if "texto" not in df.columns or "estilo" not in df.columns:
-        raise ValueError("El CSV debe tener columnas 'texto' y 'estilo'.")
+    if "texto" not in df.columns or "emocion" not in df.columns:
+        raise ValueError("El CSV debe tener columnas 'texto' y 'emocion'.")
+
+    df = df.dropna(subset=["texto", "emocion"])
 
     X = df["texto"]
-    y = df["estilo"]
+    y = df["emocion"]
 
     # 3. Separar train/test
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, stratify=y, random_state=42
     )
 
-    # 4. Crear pipeline
-    pipeline = Pipeline([
-        ("tfidf", TfidfVectorizer()),
-        ("clf", LogisticRegression(max_iter=300))
-    ])
+    # 4. Crear pipeline (la normalización queda guardada dentro del modelo)
+    pipeline = build_pipeline(vectorizer, n_features)
 
     # 5. Entrenar modelo
     pipeline.fit(X_train, y_train)
@@ -49,13 +52,18 @@ def main(dataset_path: str, output_dir: str):
     # 7. Guardar modelo
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
-    model_file = output_path / "style_model.joblib"
-    joblib.dump(pipeline, model_file)
+    model_file = output_path / model_filename("emotion_model", vectorizer)
+    # Escritura atómica: la API puede tener el modelo anterior mapeado en memoria y recargarlo en caliente
+    tmp_file = model_file.with_suffix(".joblib.tmp")
+    joblib.dump(pipeline, tmp_file)
+    os.replace(tmp_file, model_file)
     print(f"\n✅ Modelo guardado en: {model_file.resolve()}")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Entrena un modelo de estilo comunicativo.")
-    parser.add_argument("--dataset", type=str, default="dataset_estilo.csv", help="Ruta al CSV de entrenamiento")
-    parser.add_argument("--output", type=str, default="ml_models/style_classification", help="Directorio de salida del modelo")
+    parser = argparse.ArgumentParser(description="Entrena un modelo de detección de emociones.")
+    parser.add_argument("--dataset", type=str, default=str(BASE_DIR / "dataset_emocion.csv"), help="Ruta al CSV de entrenamiento")
+    parser.add_argument("--output", type=str, default=str(BASE_DIR), help="Directorio de salida del modelo")
+    parser.add_argument("--vectorizer", choices=VECTORIZERS, default="tfidf", help="Vocabulario TF-IDF o hashing de tamaño fijo")
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES, help="Columnas del espacio de hashing")
     args = parser.parse_args()
-    main(args.dataset, args.output)
+    main(args.dataset, args.output, args.vectorizer, args.n_features)
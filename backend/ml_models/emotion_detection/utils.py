@@ -1,23 +1,15 @@
 # backend/ml_models/emotion_detection/utils.py
 
-import re
-import unicodedata
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.models.normalization import normalize_text  # noqa: E402
 
 def limpiar_texto(texto: str) -> str:
     """
     Limpia y normaliza un texto eliminando tildes, puntuación y convirtiendo a minúsculas.
+    Usa la misma normalización que los modelos entrenados (`app.models.normalization`).
     """
-    if not isinstance(texto, str):
-        return ""
-    
-    # Eliminar tildes y acentos
-    texto = unicodedata.normalize("NFD", texto)
-    texto = texto.encode("ascii", "ignore").decode("utf-8")
-    
-    # Eliminar puntuación y caracteres no alfabéticos
-    texto = re.sub(r"[^\w\s]", "", texto)
-
-    # Convertir a minúsculas
-    texto = texto.lower()
-
-    return texto
+    return normalize_text(texto)
@@ -0,0 +1,108 @@
+# backend/ml_models/evaluate_vectorizers.py
+
+"""
+Reporte comparativo de las variantes de vectorizador (ver `text_pipelines.py`).
+
+Para cada modelo (emoción y estilo) entrena, con la misma partición que `train.py`, el pipeline
+TF-IDF actual y la variante HashingVectorizer con uno o más tamaños, y compara:
+    - exactitud y F1 macro sobre el conjunto de prueba
+    - tamaño del joblib
+    - tiempo de carga (joblib.load)
+    - latencia por mensaje (predict_proba de un texto, mediana)
+
+Uso (desde backend/):
+    python ml_models/evaluate_vectorizers.py
+    python ml_models/evaluate_vectorizers.py --models style --n-features 4096 65536 262144 --json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+from sklearn.metrics import accuracy_score, f1_score
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+from text_pipelines import DATASETS, DEFAULT_N_FEATURES, build_pipeline, load_split  # noqa: E402
+
+
+def median_latency_us(pipeline, texts, runs: int) -> float:
+    """Mediana (µs) de `predict_proba` sobre un solo texto, como en una solicitud de chat."""
+    timings = []
+    for text in texts[:runs]:
+        start = time.perf_counter()
+        pipeline.predict_proba([text])
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1e6, 1)
+
+
+def evaluate_variant(name: str, vectorizer: str, n_features: int, split, workdir: Path, runs: int) -> dict:
+    X_train, X_test, y_train, y_test = split
+    pipeline = build_pipeline(vectorizer, n_features)
+
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    y_pred = pipeline.predict(X_test)
+    path = workdir / f"{name}_{vectorizer}_{n_features}.joblib"
+    joblib.dump(pipeline, path)
+
+    load_times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        loaded = joblib.load(path)
+        load_times.append(time.perf_counter() - start)
+
+    return {
+        "model": name,
+        "vectorizer": vectorizer,
+        "n_features": n_features if vectorizer == "hashing" else len(pipeline.steps[0][1].vocabulary_),
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "f1_macro": round(f1_score(y_test, y_pred, average="macro"), 4),
+        "size_kb": round(path.stat().st_size / 1024, 1),
+        "load_ms": round(min(load_times) * 1000, 2),
+        "latency_us": median_latency_us(loaded, list(X_test), runs),
+        "fit_s": round(fit_s, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los pipelines TF-IDF y HashingVectorizer.")
+    parser.add_argument("--models", nargs="+", choices=sorted(DATASETS), default=sorted(DATASETS), help="Modelos a evaluar")
+    parser.add_argument("--n-features", nargs="+", type=int, default=[2 ** 12, DEFAULT_N_FEATURES, 2 ** 18], help="Tamaños de hashing")
+    parser.add_argument("--runs", type=int, default=300, help="Mensajes usados para medir la latencia")
+    parser.add_argument("--json", action="store_true", help="Imprimir el reporte en JSON")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for name in args.models:
+            split = load_split(name)
+
+            rows.append(evaluate_variant(name, "tfidf", 0, split, workdir, args.runs))
+            for n_features in args.n_features:
+                rows.append(evaluate_variant(name, "hashing", n_features, split, workdir, args.runs))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    header = f"   {'variante':<18}{'columnas':>10}{'exactitud':>11}{'F1':>8}{'tamaño KB':>11}{'carga ms':>10}{'µs/msg':>9}"
+    for name in args.models:
+        print(f"\n📊 {name}")
+        print(header)
+        for row in (r for r in rows if r["model"] == name):
+            print(f"   {row['vectorizer']:<18}{row['n_features']:>10}{row['accuracy']:>11.4f}{row['f1_macro']:>8.4f}"
+                  f"{row['size_kb']:>11.1f}{row['load_ms']:>10.2f}{row['latency_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
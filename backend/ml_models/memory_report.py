@@ -0,0 +1,116 @@
+# backend/ml_models/memory_report.py
+
+"""
+Reporte de memoria residente por worker al cargar los modelos con y sin mmap.
+
+Lanza N procesos que cargan los modelos de emoción y estilo a la vez, primero como copia privada
+(artefacto `.npz`) y luego mapeados en memoria (artefacto `.shared/`), y compara el RSS y el PSS
+(memoria proporcional: las páginas compartidas se reparten entre los procesos que las usan).
+Requiere Linux (`/proc/self/smaps_rollup`).
+
+Uso (desde backend/):
+    python ml_models/compile_models.py --format both
+    python ml_models/memory_report.py --workers 4
+    python ml_models/memory_report.py --workers 8 --json
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+MODEL_PATHS = [
+    BASE_DIR / "emotion_detection" / "emotion_model.joblib",
+    BASE_DIR / "style_classification" / "style_model.joblib",
+]
+
+
+def read_memory_kb() -> dict:
+    """Lee Rss, Pss y páginas compartidas del proceso actual (en KB)."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Shared_Clean:", "Shared_Dirty:"):
+                values[parts[0].rstrip(":").lower()] = int(parts[1])
+    return values
+
+
+def _worker(mmap: bool, barrier, results) -> None:
+    from app.models.compiled import load_text_classifier
+
+    before = read_memory_kb()
+    models = [load_text_classifier(path, prefer_compiled=True, mmap=mmap)[0] for path in MODEL_PATHS]
+    # Recorrer todos los arreglos para traer sus páginas a memoria
+    for model in models:
+        model.predict_proba(["hola, ¿cómo estás?"])
+        float(model.coef_t.sum())
+        if model.idf is not None:
+            float(model.idf.sum())
+
+    # Medir cuando todos los workers tienen los modelos cargados
+    barrier.wait()
+    after = read_memory_kb()
+    results.put({
+        "rss_kb": after["rss"] - before["rss"],
+        "pss_kb": after["pss"] - before["pss"],
+        "shared_kb": (after["shared_clean"] + after["shared_dirty"]) - (before["shared_clean"] + before["shared_dirty"]),
+    })
+    barrier.wait()
+
+
+def measure(workers: int, mmap: bool) -> dict:
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(mmap, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        key: round(sum(sample[key] for sample in samples) / len(samples), 1)
+        for key in ("rss_kb", "pss_kb", "shared_kb")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la memoria por worker con modelos privados y mapeados (mmap).")
+    parser.add_argument("--workers", type=int, default=4, help="Número de workers simultáneos")
+    parser.add_argument("--json", action="store_true", help="Imprimir el reporte en JSON")
+    args = parser.parse_args()
+
+    missing = [path for path in MODEL_PATHS if not path.with_suffix(".shared").exists()]
+    if missing:
+        sys.exit("❌ Faltan artefactos compartidos; ejecuta primero ml_models/compile_models.py --format shared")
+
+    private = measure(args.workers, mmap=False)
+    shared = measure(args.workers, mmap=True)
+    report = {
+        "workers": args.workers,
+        "private": private,
+        "mmap": shared,
+        "pss_saved_per_worker_kb": round(private["pss_kb"] - shared["pss_kb"], 1),
+        "pss_saved_total_kb": round((private["pss_kb"] - shared["pss_kb"]) * args.workers, 1),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n📦 Memoria por worker ({args.workers} workers, modelos de emoción + estilo)")
+    print(f"   {'modo':<10}{'RSS KB':>10}{'PSS KB':>10}{'compartida KB':>16}")
+    for name, values in (("privado", private), ("mmap", shared)):
+        print(f"   {name:<10}{values['rss_kb']:>10}{values['pss_kb']:>10}{values['shared_kb']:>16}")
+    print(f"\n✅ PSS ahorrado por worker: {report['pss_saved_per_worker_kb']} KB "
+          f"(total {report['pss_saved_total_kb']} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/ml_models/multitask/train.py
+
+"""
+Entrena el modelo multitarea (ver `app/models/multitask.py`): un TfidfVectorizer ajustado sobre los
+textos de entrenamiento de ambos CSV y una LogisticRegression por tarea sobre esa misma vectorización.
+Usa las mismas particiones que los `train.py` de emoción y estilo, guarda el joblib y lo compila
+(`.npz` y `.shared/`) validando las probabilidades contra scikit-learn.
+
+Uso (desde backend/):
+    python ml_models/multitask/train.py
+    python ml_models/multitask/train.py --output /tmp/multitask
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report
+
+# Permite importar los pipelines compartidos (y `app`) al ejecutar desde cualquier directorio
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+from text_pipelines import MODEL_DIRS, load_split  # noqa: E402
+from app.models.compiled import CompiledTextClassifier, compiled_path_for, load_text_classifier, shared_path_for  # noqa: E402
+from app.models.multitask import TASKS, MultiTaskTextClassifier, compile_multitask  # noqa: E402
+from app.models.normalization import normalize_text  # noqa: E402
+from app.models.prediction import model_file_version  # noqa: E402
+
+
+def _median_us(fn, texts) -> float:
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        fn([text])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main(output_dir: str, atol: float = 1e-9):
+    # 1. Particiones de cada tarea (idénticas a las de train.py)
+    splits = {task: load_split(task) for task in TASKS}
+
+    # 2. Vectorizador compartido sobre los textos de entrenamiento de todas las tareas
+    vectorizer = TfidfVectorizer(preprocessor=normalize_text)
+    vectorizer.fit(pd.concat([splits[task][0] for task in TASKS]))
+
+    # 3. Una cabeza lineal por tarea
+    heads = {}
+    for task in TASKS:
+        X_train, _, y_train, _ = splits[task]
+        heads[task] = LogisticRegression(max_iter=300).fit(vectorizer.transform(X_train), y_train)
+    model = MultiTaskTextClassifier(vectorizer, heads)
+
+    # 4. Evaluar cada cabeza
+    for task in TASKS:
+        _, X_test, _, y_test = splits[task]
+        y_pred = model.head(task).predict(list(X_test))
+        print(f"\n🎯 Reporte de clasificación ({task}):")
+        print(classification_report(y_test, y_pred))
+
+    # 5. Guardar modelo (escritura atómica: la API puede recargarlo en caliente)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    model_file = output_path / "multitask_model.joblib"
+    tmp_file = model_file.with_suffix(".joblib.tmp")
+    joblib.dump(model, tmp_file)
+    os.replace(tmp_file, model_file)
+    print(f"✅ Modelo guardado en: {model_file.resolve()} ({len(vectorizer.vocabulary_)} términos compartidos)")
+
+    # 6. Compilar y validar contra scikit-learn sobre todos los textos de prueba
+    compiled = compile_multitask(model, source_version=model_file_version(model_file))
+    texts = [text for task in TASKS for text in splits[task][1]]
+    expected = model.predict_proba(texts)
+    outputs = [compiled.save(compiled_path_for(model_file)), compiled.save_shared(shared_path_for(model_file))]
+    for output in outputs:
+        reloaded = (CompiledTextClassifier.load_shared(output) if output.is_dir() else CompiledTextClassifier.load(output))
+        diff = float(np.max(np.abs(reloaded.predict_proba(texts) - expected)))
+        if diff > atol:
+            shutil.rmtree(output) if output.is_dir() else output.unlink()
+            sys.exit(f"❌ {output}: diferencia {diff:.3e} > {atol:.0e}; artefacto eliminado")
+        print(f"✅ Compilado: {output} (diferencia máxima {diff:.3e})")
+
+    # 7. Comparar con los dos modelos separados tal como se sirven (compilados)
+    separate = [load_text_classifier(MODEL_DIRS[task][0] / f"{MODEL_DIRS[task][1]}.joblib")[0] for task in TASKS]
+    served, _ = load_text_classifier(model_file)
+    sample = texts[:300]
+    separate_us = _median_us(lambda batch: [m.predict_proba(batch) for m in separate], sample)
+    multitask_us = _median_us(served.predict_proba_all, sample)
+    print(f"\n⏱️  Emoción + estilo por mensaje: modelos separados {separate_us:.1f} µs, multitarea {multitask_us:.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrena el modelo multitarea de emoción y estilo.")
+    parser.add_argument("--output", type=str, default=str(BASE_DIR), help="Directorio de salida del modelo")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Diferencia máxima permitida al compilar")
+    args = parser.parse_args()
+    main(args.output, args.atol)
@@ -0,0 +1,88 @@
+# backend/ml_models/online_update.py
+
+"""
+Modelos en línea (SGDClassifier + HashingVectorizer, ver `app/services/online_learning.py`).
+
+    --bootstrap  Crea el checkpoint inicial entrenando con `partial_fit` por mini-lotes sobre el CSV
+                 (misma partición que `train.py`) y reporta la exactitud en prueba.
+    (sin flag)   Aplica una vez las correcciones nuevas de los tutores guardadas en la base de datos,
+                 como lo hace el trabajo de fondo de la API (`ONLINE_LEARNING_INTERVAL`).
+
+Uso (desde backend/):
+    python ml_models/online_update.py --model emotion --bootstrap
+    python ml_models/online_update.py --model style --bootstrap --epochs 10
+    python ml_models/online_update.py --model emotion
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from sklearn.metrics import accuracy_score
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+from text_pipelines import DATASETS, MODEL_DIRS, load_split, model_filename  # noqa: E402
+from app.services.online_learning import OnlineLearner  # noqa: E402
+
+
+def bootstrap(learner: OnlineLearner, name: str, epochs: int) -> None:
+    X_train, X_test, y_train, y_test = load_split(name)
+    pairs = list(zip(X_train, y_train))
+    learner.reset(sorted(set(y_train)))
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    for _ in range(epochs):
+        rng.shuffle(pairs)
+        for i in range(0, len(pairs), learner.batch_size):
+            texts, labels = zip(*pairs[i:i + learner.batch_size])
+            learner.partial_fit(texts, labels)
+    fit_s = time.perf_counter() - start
+
+    # Las correcciones ya guardadas se aplican en la siguiente actualización (cursor en cero)
+    learner.save()
+    accuracy = accuracy_score(y_test, learner.pipeline.predict(X_test))
+    print(f"\n✅ Checkpoint inicial de {name}: {learner.state['samples']} ejemplos en {fit_s:.2f} s "
+          f"({epochs} épocas), exactitud en prueba {accuracy:.4f}")
+    print(f"   Guardado en: {learner.checkpoint_path}")
+
+
+def update_from_db(learner: OnlineLearner) -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        used = learner.update(db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"\n✅ {learner.name}: {used} correcciones aplicadas en {elapsed:.2f} s "
+          f"(cursor {learner.state['last_correction_id']}, {learner.state['samples']} ejemplos acumulados)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena o actualiza los modelos en línea con partial_fit.")
+    parser.add_argument("--model", choices=sorted(DATASETS), required=True, help="Modelo a actualizar")
+    parser.add_argument("--bootstrap", action="store_true", help="Crear el checkpoint inicial desde el CSV")
+    parser.add_argument("--epochs", type=int, default=5, help="Pasadas sobre el CSV en el bootstrap")
+    parser.add_argument("--batch-size", type=int, default=64, help="Ejemplos por mini-lote")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Ruta del checkpoint (por defecto junto al modelo)")
+    args = parser.parse_args()
+
+    model_dir, base_name = MODEL_DIRS[args.model]
+    checkpoint = args.checkpoint or model_dir / model_filename(base_name, "online")
+    learner = OnlineLearner(args.model, checkpoint, batch_size=args.batch_size)
+
+    if args.bootstrap:
+        bootstrap(learner, args.model, args.epochs)
+    else:
+        update_from_db(learner)
+
+
+if __name__ == "__main__":
+    main()
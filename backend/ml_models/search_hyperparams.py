@@ -0,0 +1,175 @@
+# backend/ml_models/search_hyperparams.py
+
+"""
+Búsqueda de hiperparámetros con validación cruzada en paralelo para los modelos de emoción y estilo.
+
+Explora n-gramas del vectorizador, `C`, solver y pesos de clase con `GridSearchCV` o
+`RandomizedSearchCV` repartidos en todos los núcleos (`n_jobs`). El pipeline usa
+`Pipeline(memory=...)`, así que la vectorización de cada pliegue se calcula una vez y se reutiliza
+en todas las combinaciones que solo cambian el clasificador.
+
+Después reentrena cada combinación sobre la partición de entrenamiento de `train.py` y escribe un
+leaderboard con exactitud de validación cruzada, exactitud en prueba y latencia por mensaje,
+marcando las combinaciones en la frontera de Pareto (ninguna otra tiene a la vez mejor exactitud de
+validación cruzada y menor latencia). La selección usa solo la validación cruzada; la exactitud en
+prueba se informa como lectura final y no interviene en la elección.
+
+Con `--save-best`, si el modelo guardado es el que usa la API, se vuelven a compilar sus artefactos
+`.npz`/`.shared` (`compile_models.py`) para que no queden desactualizados.
+
+Uso (desde backend/):
+    python ml_models/search_hyperparams.py --model emotion
+    python ml_models/search_hyperparams.py --model style --search random --n-iter 20 --cv 5
+    python ml_models/search_hyperparams.py --model style --vectorizer hashing --save-best
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+from scipy.stats import loguniform
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+from evaluate_vectorizers import median_latency_us  # noqa: E402
+from text_pipelines import DATASETS, DEFAULT_N_FEATURES, MODEL_DIRS, VECTORIZERS, build_pipeline, load_split, model_filename  # noqa: E402
+
+def param_space(vectorizer: str, search: str) -> Dict[str, Any]:
+    """Espacio de búsqueda (lista de valores para grid, distribuciones para random)."""
+    ngram_step = "hashing" if vectorizer == "hashing" else "tfidf"
+    space = {
+        f"{ngram_step}__ngram_range": [(1, 1), (1, 2), (1, 3)],
+        "clf__solver": ["lbfgs", "liblinear", "saga"],
+        "clf__class_weight": [None, "balanced"],
+        "clf__max_iter": [1000],
+    }
+    space["clf__C"] = loguniform(1e-2, 1e2) if search == "random" else [0.1, 1.0, 10.0]
+    return space
+
+
+def pareto_front(rows: List[Dict[str, Any]]) -> None:
+    """Marca en cada fila si está en la frontera exactitud de validación cruzada/latencia."""
+    for row in rows:
+        row["pareto"] = not any(
+            other is not row
+            and other["cv_accuracy"] >= row["cv_accuracy"]
+            and other["latency_us"] <= row["latency_us"]
+            and (other["cv_accuracy"] > row["cv_accuracy"] or other["latency_us"] < row["latency_us"])
+            for other in rows
+        )
+
+
+def write_leaderboard(rows: List[Dict[str, Any]], output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix == ".json":
+        output.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+        return
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con validación cruzada en paralelo.")
+    parser.add_argument("--model", choices=sorted(DATASETS), required=True, help="Modelo a optimizar")
+    parser.add_argument("--vectorizer", choices=VECTORIZERS, default="tfidf", help="Variante de vectorizador")
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES, help="Columnas del espacio de hashing")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid", help="Tipo de búsqueda")
+    parser.add_argument("--n-iter", type=int, default=20, help="Combinaciones para la búsqueda aleatoria")
+    parser.add_argument("--cv", type=int, default=5, help="Pliegues de validación cruzada")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Procesos en paralelo (-1 = todos los núcleos)")
+    parser.add_argument("--runs", type=int, default=200, help="Mensajes usados para medir la latencia")
+    parser.add_argument("--output", type=Path, default=None, help="Leaderboard (.csv o .json)")
+    parser.add_argument("--save-best", action="store_true", help="Guardar el mejor modelo de la frontera en la ruta de train.py")
+    args = parser.parse_args()
+
+    X_train, X_test, y_train, y_test = load_split(args.model)
+    model_dir, base_name = MODEL_DIRS[args.model]
+    output = args.output or model_dir / f"leaderboard_{args.vectorizer}.csv"
+
+    with tempfile.TemporaryDirectory(prefix="psichat-search-") as cache_dir:
+        pipeline = build_pipeline(args.vectorizer, args.n_features, memory=joblib.Memory(cache_dir, verbose=0))
+        space = param_space(args.vectorizer, args.search)
+        cv = StratifiedKFold(n_splits=args.cv, shuffle=True, random_state=42)
+        if args.search == "grid":
+            search = GridSearchCV(pipeline, space, cv=cv, n_jobs=args.n_jobs, scoring="accuracy")
+        else:
+            search = RandomizedSearchCV(pipeline, space, n_iter=args.n_iter, cv=cv, n_jobs=args.n_jobs, scoring="accuracy", random_state=42)
+
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            # saga/liblinear con C alto pueden no converger en algunos pliegues; cuenta en el score
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            search.fit(X_train, y_train)
+        search_s = time.perf_counter() - start
+
+    # Reentrenar cada combinación (sin caché) para medir latencia real; la exactitud en prueba es solo informativa
+    results = search.cv_results_
+    base = build_pipeline(args.vectorizer, args.n_features)
+    rows = []
+    for i, params in enumerate(results["params"]):
+        candidate = clone(base).set_params(**params)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            candidate.fit(X_train, y_train)
+        rows.append({
+            "rank": int(results["rank_test_score"][i]),
+            "cv_accuracy": round(float(results["mean_test_score"][i]), 4),
+            "cv_std": round(float(results["std_test_score"][i]), 4),
+            "test_accuracy": round(accuracy_score(y_test, candidate.predict(X_test)), 4),
+            "latency_us": median_latency_us(candidate, list(X_test), args.runs),
+            "fit_s": round(float(results["mean_fit_time"][i]), 3),
+            "params": json.dumps({k: (list(v) if isinstance(v, tuple) else v) for k, v in params.items()}),
+            "_model": candidate,
+        })
+
+    # La frontera y el orden usan solo la validación cruzada: elegir con la partición de prueba la sesgaría
+    pareto_front(rows)
+    rows.sort(key=lambda row: (-row["cv_accuracy"], row["latency_us"]))
+    best = next(row for row in rows if row["pareto"])
+    models = {id(row): row.pop("_model") for row in rows}
+    write_leaderboard(rows, output)
+
+    print(f"\n🔍 {args.model} ({args.vectorizer}, {args.search}): {len(rows)} combinaciones x {args.cv} pliegues en {search_s:.1f} s")
+    print(f"   {'rank':>4}{'cv':>8}{'prueba':>8}{'µs/msg':>9}  pareto  parámetros")
+    for row in rows[:10]:
+        print(f"   {row['rank']:>4}{row['cv_accuracy']:>8.4f}{row['test_accuracy']:>8.4f}{row['latency_us']:>9.1f}"
+              f"  {'  ✔   ' if row['pareto'] else '      '}  {row['params']}")
+    print(f"\n✅ Leaderboard guardado en: {output}")
+
+    if args.save_best:
+        model_path = model_dir / model_filename(base_name, args.vectorizer)
+        tmp_path = model_path.with_suffix(".joblib.tmp")
+        joblib.dump(models[id(best)], tmp_path)
+        os.replace(tmp_path, model_path)
+        print(f"✅ Mejor modelo de la frontera guardado en: {model_path} ({best['params']})")
+        print(f"   Exactitud en prueba (lectura final): {best['test_accuracy']:.4f}")
+        recompile(args.model, model_path)
+
+
+def recompile(name: str, model_path: Path) -> None:
+    """Vuelve a compilar los artefactos de la API si el modelo guardado es el que carga en producción."""
+    from compile_models import MODELS, compile_model
+
+    if MODELS[name][0].resolve() != model_path.resolve():
+        return
+    if not all([compile_model(name, 1e-9, fmt) for fmt in ("npz", "shared")]):
+        print(f"⚠️  Revisa la compilación y vuelve a ejecutar: python ml_models/compile_models.py --models {name}")
+
+
+if __name__ == "__main__":
+    main()
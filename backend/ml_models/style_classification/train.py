@@ -1,21 +1,26 @@
 # backend/ml_models/style_classification/train.py
 
 import os
+import sys
+import argparse
 import pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 
 # Rutas
 BASE_DIR = Path(__file__).resolve().parent
 DATASET_PATH = BASE_DIR / "dataset_estilo.csv"
-MODEL_PATH = BASE_DIR / "style_model.joblib"
 
-def main():
+# Permite importar los pipelines compartidos (y `app`) al ejecutar desde cualquier directorio
+sys.path.append(str(BASE_DIR.parent))
+
+from text_pipelines import DEFAULT_N_FEATURES, VECTORIZERS, build_pipeline, model_filename  # noqa: E402
+
+def main(vectorizer: str = "tfidf", n_features: int = DEFAULT_N_FEATURES):
+    model_path = BASE_DIR / model_filename("style_model", vectorizer)
+
     # 1. Verificar dataset
     if not DATASET_PATH.exists():
         raise FileNotFoundError(f"⚠️ Dataset no encontrado en: {DATASET_PATH}")
@@ -34,11 +39,8 @@ def main():
         X, y, test_size=0.2, stratify=y, random_state=42
     )
 
-    # 3. Pipeline
-    pipeline = Pipeline([
-        ("tfidf", TfidfVectorizer()),
-        ("clf", LogisticRegression(max_iter=300))
-    ])
+    # 3. Pipeline (la normalización queda guardada dentro del modelo)
+    pipeline = build_pipeline(vectorizer, n_features)
 
     # 4. Entrenamiento
     pipeline.fit(X_train, y_train)
@@ -51,8 +53,15 @@ def main():
     print(confusion_matrix(y_test, y_pred))
 
     # 6. Guardar modelo
-    joblib.dump(pipeline, MODEL_PATH)
-    print(f"✅ Modelo guardado en: {MODEL_PATH}")
+    # Escritura atómica: la API puede tener el modelo anterior mapeado en memoria y recargarlo en caliente
+    tmp_path = model_path.with_suffix(".joblib.tmp")
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, model_path)
+    print(f"✅ Modelo guardado en: {model_path}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Entrena un modelo de estilo comunicativo.")
+    parser.add_argument("--vectorizer", choices=VECTORIZERS, default="tfidf", help="Vocabulario TF-IDF o hashing de tamaño fijo")
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES, help="Columnas del espacio de hashing")
+    args = parser.parse_args()
+    main(args.vectorizer, args.n_features)
@@ -1,17 +1,15 @@
 # backend/ml_models/style_classification/utils.py
 
-import re
-import unicodedata
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.models.normalization import normalize_text  # noqa: E402
 
 def limpiar_texto(texto: str) -> str:
     """
     Normaliza el texto eliminando signos, tildes y lo pasa a minúsculas.
+    Usa la misma normalización que los modelos entrenados (`app.models.normalization`).
     """
-    if not isinstance(texto, str):
-        return ""
-    
-    texto = unicodedata.normalize("NFD", texto)
-    texto = texto.encode("ascii", "ignore").decode("utf-8")
-    texto = re.sub(r"[^\w\s]", "", texto)
-    texto = texto.lower()
-    return texto
+    return normalize_text(texto)
@@ -0,0 +1,81 @@
+# backend/ml_models/text_pipelines.py
+
+"""
+Construcción de los pipelines de clasificación de texto usados por los scripts de entrenamiento.
+
+Variantes de vectorizador:
+    tfidf    TfidfVectorizer con vocabulario aprendido (modelos actuales, compilables a NumPy).
+    hashing  HashingVectorizer + TfidfTransformer: número de columnas fijo (`n_features`), sin
+             diccionario de vocabulario, de modo que el tamaño del modelo y la memoria por worker
+             no crecen con el corpus.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+
+from app.models.normalization import normalize_text  # noqa: E402
+
+VECTORIZERS = ("tfidf", "hashing")
+# Con los vocabularios actuales (cientos de términos) un espacio mayor solo agranda coeficientes e idf
+DEFAULT_N_FEATURES = 2 ** 14
+
+# Dataset y columna de etiqueta de cada modelo
+DATASETS = {
+    "emotion": (BASE_DIR / "emotion_detection" / "dataset_emocion.csv", "emocion"),
+    "style": (BASE_DIR / "style_classification" / "dataset_estilo.csv", "estilo"),
+}
+
+# Directorio y nombre base del joblib de cada modelo (como en `train.py`)
+MODEL_DIRS = {
+    "emotion": (BASE_DIR / "emotion_detection", "emotion_model"),
+    "style": (BASE_DIR / "style_classification", "style_model"),
+}
+
+
+def build_pipeline(vectorizer: str = "tfidf", n_features: int = DEFAULT_N_FEATURES, memory: Optional[Any] = None) -> Pipeline:
+    """
+    Crea el pipeline sin entrenar (la normalización compartida queda dentro del modelo).
+
+    Args:
+        vectorizer (str): "tfidf" o "hashing".
+        n_features (int): Columnas del espacio de hashing (solo para "hashing").
+        memory: Caché de `Pipeline` (directorio o `joblib.Memory`) para reutilizar la vectorización
+            entre combinaciones de hiperparámetros que solo cambian el clasificador.
+    Returns:
+        Pipeline: Vectorizador + LogisticRegression.
+    """
+    if vectorizer == "tfidf":
+        return Pipeline([
+            ("tfidf", TfidfVectorizer(preprocessor=normalize_text)),
+            ("clf", LogisticRegression(max_iter=300))
+        ], memory=memory)
+    if vectorizer == "hashing":
+        return Pipeline([
+            # Sin signo alterno ni normalización: TfidfTransformer aplica idf y la norma l2 como TfidfVectorizer
+            ("hashing", HashingVectorizer(preprocessor=normalize_text, n_features=n_features, alternate_sign=False, norm=None)),
+            ("tfidf", TfidfTransformer()),
+            ("clf", LogisticRegression(max_iter=300))
+        ], memory=memory)
+    raise ValueError(f"Vectorizador no soportado: {vectorizer} (opciones: {', '.join(VECTORIZERS)})")
+
+
+def model_filename(base: str, vectorizer: str) -> str:
+    """Nombre del archivo del modelo: la variante hashing se guarda aparte para poder compararlas."""
+    return f"{base}.joblib" if vectorizer == "tfidf" else f"{base}_{vectorizer}.joblib"
+
+
+def load_split(name: str) -> Tuple[Any, Any, Any, Any]:
+    """Partición entrenamiento/prueba de `train.py` (80/20 estratificada, semilla 42) para el modelo indicado."""
+    dataset_path, label_column = DATASETS[name]
+    df = pd.read_csv(dataset_path).dropna(subset=["texto", label_column])
+    return train_test_split(df["texto"], df[label_column], test_size=0.2, stratify=df[label_column], random_state=42)
@@ -22,6 +22,7 @@ from app.services.analysis_service import (
     analyze_emotion, analyze_style, evaluate_priority,
     analyze_chat_context, analyze_text
 )
+from app.services.analysis_cache import AnalysisCache, make_cache_key
 
 
 class TestAnalysis:
@@ -535,5 +536,316 @@ class TestAnalysisTutorAccess:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+class TestAnalysisCache:
+    """Tests para la caché de resultados de análisis."""
+
+    def test_key_normalization(self):
+        """Test que textos casi idénticos comparten clave y la versión la separa."""
+        assert make_cache_key("No sé.", "v1") == make_cache_key("  no   SÉ ", "v1")
+        assert make_cache_key("No sé.", "v1") != make_cache_key("No sé.", "v2")
+        assert make_cache_key("no sé", "v1") != make_cache_key("nosé", "v1")
+
+    def test_hits_and_misses(self):
+        """Test de contadores de aciertos y fallos."""
+        cache = AnalysisCache(max_entries=10, ttl=60)
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test que se desaloja la entrada menos usada recientemente."""
+        cache = AnalysisCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self, monkeypatch):
+        """Test que las entradas expiran tras el TTL."""
+        import app.services.analysis_cache as cache_module
+
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = AnalysisCache(max_entries=10, ttl=5)
+        cache.set("a", 1)
+        now[0] += 10
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_disabled_cache(self):
+        """Test que una caché deshabilitada nunca guarda valores."""
+        cache = AnalysisCache(max_entries=10, ttl=60, enabled=False)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+
+
+class TestFastPath:
+    """Tests para la ruta rápida (early exit) de `build_analysis`."""
+
+    @staticmethod
+    def _pair(emotion, emotion_probs, style_probs):
+        import numpy as np
+        from app.models.prediction import Prediction
+
+        emotion_classes = np.array([emotion, "tristeza"], dtype=object)
+        style_classes = np.array(["neutro", "evasivo", "formal"], dtype=object)
+        return (
+            Prediction.from_probabilities(np.array(emotion_probs), emotion_classes, "e1"),
+            Prediction.from_probabilities(np.array(style_probs), style_classes, "s1"),
+        )
+
+    def test_confident_neutral_message_skips_recommendations(self, monkeypatch):
+        """Test que un mensaje claramente no riesgoso con historial sin riesgo omite las recomendaciones."""
+        from app.services import analysis_service
+        from app.services.context_state import RollingContext
+
+        calls = []
+
+        def calm_context(history):
+            calls.append(history)
+            return RollingContext().summary()
+
+        monkeypatch.setattr(analysis_service, "analyze_chat_context", calm_context)
+        analysis_service.fast_path_stats.reset()
+
+        emotion, style = self._pair("alegría", [0.95, 0.05], [0.9, 0.05, 0.05])
+        result = analysis_service.build_analysis("¡todo salió genial!", emotion, style, history=["hola"])
+
+        assert result["fast_path"] is True
+        assert result["priority"] == "normal"
+        assert result["alert"] is False
+        assert result["context_risk_level"] == "normal"
+        assert calls == [["hola"]]
+        assert all(items == [] for items in analysis_service.recommendations_for(result).values())
+
+        stats = analysis_service.get_fast_path_stats()
+        assert stats["analyses"] == 1 and stats["fast_path"] == 1
+        assert stats["recommendations_skipped"] == 1
+        assert stats["skip_rate"] == 1.0
+
+    def test_risky_history_disables_fast_path(self, monkeypatch):
+        """Test que un historial de riesgo eleva la prioridad aunque el mensaje actual sea claramente neutro."""
+        from app.services import analysis_service
+        from app.services.context_state import RollingContext
+
+        risky = RollingContext()
+        for _ in range(3):
+            risky.update("tristeza", 90.0, "neutro")
+        monkeypatch.setattr(analysis_service, "analyze_chat_context", lambda history: risky.summary())
+
+        emotion, style = self._pair("alegría", [0.95, 0.05], [0.9, 0.05, 0.05])
+        assert analysis_service.is_fast_path(emotion, style)
+        result = analysis_service.build_analysis("Estoy feliz, me dieron yapa.", emotion, style, history=["a", "b", "c"])
+
+        assert result["fast_path"] is False
+        assert result["context_alert"] is True
+        assert result["context_risk_level"] == "alto"
+        assert result["priority"] != "normal"
+
+    def test_risk_signals_use_full_path(self):
+        """Test que emociones de riesgo, baja confianza o estilos de riesgo plausibles no toman la ruta rápida."""
+        from app.services.analysis_service import is_fast_path
+
+        assert is_fast_path(*self._pair("alegría", [0.95, 0.05], [0.9, 0.05, 0.05]))
+        assert not is_fast_path(*self._pair("alegría", [0.6, 0.4], [0.9, 0.05, 0.05]))
+        assert not is_fast_path(*self._pair("ansiedad", [0.97, 0.03], [0.9, 0.05, 0.05]))
+        # El estilo dominante es neutro, pero uno de riesgo es plausible
+        assert not is_fast_path(*self._pair("alegría", [0.95, 0.05], [0.5, 0.45, 0.05]))
+        assert is_fast_path(*self._pair("alegría", [0.95, 0.05], [0.4, 0.3, 0.3]))
+
+    def test_disabled_fast_path(self, monkeypatch):
+        """Test que con EARLY_EXIT_ENABLED=False siempre se usa la ruta completa."""
+        from app.services.analysis_service import is_fast_path, settings
+
+        monkeypatch.setattr(settings, "EARLY_EXIT_ENABLED", False)
+        assert not is_fast_path(*self._pair("alegría", [0.99, 0.01], [1.0, 0.0, 0.0]))
+
+
+
+class TestUserContext:
+    """Tests para el contexto acumulado por usuario (`context_state`)."""
+
+    def test_rolling_window_counts(self):
+        """Test que la ventana de frecuencias suma y retira mensajes incrementalmente."""
+        from app.services.context_state import RollingContext
+
+        context = RollingContext(window=3)
+        context.update("tristeza", 85.0, "evasivo")
+        context.update("frustración", 75.0, "agresivo")
+        assert context.summary()["context_risk_level"] == "alto"
+
+        context.update("alegría", 90.0, "neutro")
+        context.update("alegría", 95.0, "neutro")
+        summary = context.summary()
+
+        assert len(context) == 3
+        assert summary["emotion_frequency"] == {"frustración": 1, "alegría": 2}
+        assert summary["style_frequency"] == {"agresivo": 1, "neutro": 2}
+        assert context.high_risk_count == 1
+
+    def test_trajectory_decay(self):
+        """Test que el riesgo y los scores por emoción decaen con la vida media."""
+        from app.services.context_state import RollingContext
+
+        context = RollingContext(half_life=3600)
+        context.update("tristeza", 90.0, "evasivo", [("tristeza", 90.0), ("alegría", 10.0)], timestamp=0)
+        context.update("desánimo", 80.0, "neutro", timestamp=0)
+        assert context.summary(now=0)["context_risk_level"] == "alto"
+
+        # Una vida media después queda la mitad del riesgo acumulado
+        summary = context.summary(now=3600)
+        assert summary["context_risk_score"] == 1.0
+        assert summary["context_risk_level"] == "medio"
+        assert context.summary(now=3 * 3600)["context_risk_level"] == "normal"
+
+        context.update("alegría", 95.0, "neutro", [("alegría", 95.0), ("tristeza", 5.0)], timestamp=3 * 3600)
+        trajectory = context.trajectory(now=3 * 3600)
+        assert trajectory["messages"] == 3
+        assert trajectory["dominant_emotion"] == "alegría"
+        assert abs(sum(trajectory["emotions"].values()) - 1.0) < 1e-3
+        assert trajectory["effective_messages"] == 1.25
+
+        # Un mensaje con marca de tiempo anterior pesa según su antigüedad
+        context.update("tristeza", 90.0, "evasivo", timestamp=2 * 3600)
+        assert context.trajectory(now=3 * 3600)["risk_score"] == 0.75
+
+    def test_matches_history_reclassification(self, monkeypatch):
+        """Test que el contexto acumulado da el mismo resultado que reclasificar el historial."""
+        from app.services import analysis_service
+        from app.services.context_state import RollingContext
+
+        monkeypatch.setattr(analysis_service.settings, "EARLY_EXIT_ENABLED", False)
+        history = ["Estoy muy triste y cansado", "No quiero hacer nada, todo me frustra", "Hoy fue un buen día"]
+        context = RollingContext()
+        for text in history:
+            analysis_service.analyze_text(text, context=context)
+
+        current = "No puedo más con esto"
+        from_history = analysis_service.analyze_text(current, history=history)
+        from_context = analysis_service.analyze_text(current, context=context)
+
+        for key in ("emotion_frequency", "style_frequency", "context_alert", "context_risk_level", "priority"):
+            assert from_context[key] == from_history[key]
+        assert len(context) == len(history) + 1
+
+    def test_store_rebuilds_from_stored_analyses(self, db_session, monkeypatch):
+        """Test que un usuario sin contexto en memoria se reconstruye desde sus análisis guardados."""
+        from app.db.models import Analisis, Mensaje, Usuario
+        from app.services.context_state import ContextStore
+
+        user = Usuario(email="context@test.com", nombre="Contexto", hashed_password="x")
+        db_session.add(user)
+        db_session.flush()
+        for remitente, emocion, score, estilo in [
+            ("user", "tristeza", 90.0, "evasivo"),
+            ("bot", "", 0.0, ""),
+            ("user", "desánimo", 80.0, "neutro"),
+            ("user", "alegría", 60.0, "neutro"),
+        ]:
+            mensaje = Mensaje(usuario_id=user.id, texto=f"{remitente} {emocion}", remitente=remitente)
+            db_session.add(mensaje)
+            db_session.flush()
+            db_session.add(Analisis(mensaje_id=mensaje.id, usuario_id=user.id, emocion=emocion, emocion_score=score, estilo=estilo))
+        db_session.commit()
+
+        store = ContextStore(window=2, max_users=1, half_life=3600)
+        context = store.get(user.id, db_session)
+        assert context.summary()["emotion_frequency"] == {"desánimo": 1, "alegría": 1}
+        assert context.trajectory()["messages"] == 2
+        assert store.get(user.id, db_session) is context
+
+        wide = ContextStore(window=10).get(user.id, db_session)
+        assert wide.summary()["context_risk_level"] == "alto"
+
+        store.get(user.id + 1000)
+        assert [user_id for user_id, _ in store.top_risk()] == [user.id + 1000]
+        assert store.stats()["evictions"] == 1 and store.stats()["rebuilds"] == 2
+
+    def test_store_refreshes_after_ttl(self, db_session):
+        """Test que un contexto en caché incorpora, pasado el TTL, los mensajes guardados por otro worker."""
+        from app.db.models import Analisis, Mensaje, Usuario
+        from app.services.context_state import ContextStore
+
+        user = Usuario(email="context-ttl@test.com", nombre="Contexto", hashed_password="x")
+        db_session.add(user)
+        db_session.flush()
+
+        def store_message(emocion, score):
+            mensaje = Mensaje(usuario_id=user.id, texto=emocion, remitente="user")
+            db_session.add(mensaje)
+            db_session.flush()
+            db_session.add(Analisis(mensaje_id=mensaje.id, usuario_id=user.id, emocion=emocion, emocion_score=score, estilo="neutro"))
+            db_session.commit()
+
+        now = [0.0]
+        store = ContextStore(window=10, half_life=3600, ttl=30, clock=lambda: now[0])
+        store_message("alegría", 80.0)
+        context = store.get(user.id, db_session)
+
+        # Mensajes atendidos por otro worker: no están en el estado de este proceso
+        store_message("tristeza", 90.0)
+        store_message("desánimo", 85.0)
+        now[0] = 10.0
+        assert store.get(user.id, db_session) is context
+        assert store.get(user.id) is context
+
+        now[0] = 31.0
+        refreshed = store.get(user.id, db_session)
+        assert refreshed is not context
+        assert refreshed.summary()["emotion_frequency"] == {"alegría": 1, "tristeza": 1, "desánimo": 1}
+        assert refreshed.summary()["context_risk_level"] == "alto"
+        assert store.stats()["expired"] == 1 and store.stats()["rebuilds"] == 2
+
+    def test_risk_ranking_seeded_from_active_students(self, db_session):
+        """Test que el ranking de riesgo sale de los estudiantes activos aunque no haya contextos en memoria."""
+        from datetime import datetime, timedelta
+        from app.db import crud
+        from app.db.models import Analisis, Mensaje, RolUsuario, Usuario
+        from app.services.context_state import ContextStore
+
+        def create_user(email, rol, emociones):
+            user = Usuario(email=email, nombre=email, hashed_password="x", rol=rol)
+            db_session.add(user)
+            db_session.flush()
+            for emocion, score in emociones:
+                mensaje = Mensaje(usuario_id=user.id, texto=emocion, remitente="user")
+                db_session.add(mensaje)
+                db_session.flush()
+                db_session.add(Analisis(mensaje_id=mensaje.id, usuario_id=user.id, emocion=emocion, emocion_score=score, estilo="neutro"))
+            return user
+
+        tutor = create_user("ranking-tutor@test.com", RolUsuario.TUTOR, [("tristeza", 95.0)] * 3)
+        calm = create_user("ranking-calm@test.com", RolUsuario.ESTUDIANTE, [("alegría", 90.0)])
+        risky = create_user("ranking-risky@test.com", RolUsuario.ESTUDIANTE, [("tristeza", 90.0), ("desánimo", 85.0)])
+        db_session.commit()
+
+        active = crud.get_active_students(db_session, datetime.utcnow() - timedelta(hours=1))
+        active_ids = [student.id for student in active]
+        assert tutor.id not in active_ids
+        assert {calm.id, risky.id} <= set(active_ids)
+
+        # Almacén recién iniciado: el ranking se reconstruye y el filtro va antes del límite
+        store = ContextStore(window=10, half_life=3600)
+        store.get(tutor.id, db_session)
+        ranking = store.top_risk(1, user_ids=[calm.id, risky.id], db=db_session)
+        assert [user_id for user_id, _ in ranking] == [risky.id]
+        assert ranking[0][1]["context_risk_level"] == "alto"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
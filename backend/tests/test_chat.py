@@ -2,7 +2,10 @@
 Tests para el módulo de chat
 """
 
+import asyncio
+import json
 import pytest
+import httpx
 from fastapi import status
 from datetime import datetime
 
@@ -219,3 +222,494 @@ class TestChatAnalytics:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert "total_messages" in data
+
+
+@pytest.fixture
+def llm_transport(monkeypatch):
+    """Instala un proveedor HTTP cuyo cliente compartido responde con `handler` (httpx.MockTransport)"""
+    from app.services import llm_providers
+    
+    def install(handler, provider=None):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        async def shared_client():
+            return client
+        
+        monkeypatch.setattr(llm_providers, "get_http_client", shared_client)
+        provider = provider or llm_providers.GeminiProvider("test-key", max_retries=0)
+        llm_providers.set_provider(provider)
+        return provider
+    
+    yield install
+    llm_providers.set_provider(None)
+
+
+def gemini_chunk(text):
+    return "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}) + "\r\n\r\n"
+
+
+class TestAsyncLLMClient:
+    """Tests para la respuesta asíncrona con el cliente HTTP compartido"""
+    
+    @staticmethod
+    def gemini_handler(calls, status_code=200, text="Estoy aquí para ayudarte."):
+        def handler(request):
+            calls.append(request)
+            if status_code != 200:
+                return httpx.Response(status_code, json={"error": {"message": "cuota agotada"}})
+            return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": f" {text} "}]}}]})
+        return handler
+    
+    def test_async_reply_uses_shared_client(self, llm_transport):
+        """Test la respuesta asíncrona usa el cliente compartido en varias llamadas"""
+        from app.services import chat_service
+        
+        calls = []
+        llm_transport(self.gemini_handler(calls))
+        
+        async def run():
+            return await asyncio.gather(*(
+                chat_service.generate_bot_reply_async("Me siento muy bien hoy") for _ in range(3)
+            ))
+        
+        results = asyncio.run(run())
+        
+        assert len(calls) == 3
+        for result in results:
+            assert result["reply"] == "Estoy aquí para ayudarte."
+            assert "detected_emotion" in result["meta"]
+            assert result["meta"]["info"] == "Generado con Gemini 2.0 Flash + análisis emocional"
+            assert result["history"][-1] == ("Me siento muy bien hoy", "Estoy aquí para ayudarte.")
+        assert calls[0].method == "POST"
+        assert ":generateContent?key=test-key" in str(calls[0].url)
+        assert b"Me siento muy bien hoy" in calls[0].content
+    
+    def test_async_reply_error_status(self, llm_transport):
+        """Test un error HTTP del LLM produce la respuesta local, sin traza de error"""
+        from app.services import chat_service
+        
+        llm_transport(self.gemini_handler([], status_code=429))
+        
+        result = asyncio.run(chat_service.generate_bot_reply_async("Hola"))
+        
+        assert result["meta"]["fallback"] is True
+        assert result["meta"]["error"] == "[Gemini ERROR 429] cuota agotada"
+        assert "detected_emotion" in result["meta"]
+        assert "ERROR" not in result["reply"]
+        assert "Traceback" not in result["reply"]
+    
+    def test_http_client_lifecycle(self):
+        """Test el cliente compartido se crea una vez por bucle de eventos y se cierra"""
+        from app.services import llm_client
+        
+        async def run():
+            first = await llm_client.start_http_client()
+            second = await llm_client.get_http_client()
+            started = llm_client.http_client_stats()["started"]
+            await llm_client.close_http_client()
+            return first, second, started
+        
+        first, second, started = asyncio.run(run())
+        
+        assert first is second
+        assert started
+        assert first.is_closed
+        assert not llm_client.http_client_stats()["started"]
+    
+    def test_http_client_closed_on_loop_change(self):
+        """Test el cliente de un bucle anterior se cierra al recrearlo en otro bucle"""
+        from app.services import llm_client
+        
+        first = asyncio.run(llm_client.get_http_client())
+        second = asyncio.run(llm_client.get_http_client())
+        asyncio.run(llm_client.close_http_client())
+        
+        assert first is not second
+        assert first.is_closed
+        assert second.is_closed
+    
+    def test_scoped_http_client(self):
+        """Test el cliente de vida corta sustituye al compartido dentro del bloque y se cierra al salir"""
+        from app.services import llm_client
+        
+        async def run():
+            async with llm_client.scoped_http_client() as client:
+                inner = await llm_client.get_http_client()
+                nested = await asyncio.create_task(llm_client.get_http_client())
+            return client, inner, nested
+        
+        client, inner, nested = asyncio.run(run())
+        
+        assert inner is client
+        assert nested is client
+        assert client.is_closed
+        assert not llm_client.http_client_stats()["started"]
+
+
+class TestChatStreaming:
+    """Tests para la respuesta en streaming (SSE)"""
+    
+    @staticmethod
+    def collect(text="Hoy me fue bien en el examen"):
+        from app.services import chat_service
+        
+        async def run():
+            return [item async for item in chat_service.stream_bot_reply(text)]
+        
+        return asyncio.run(run())
+    
+    def test_stream_events_order(self, llm_transport):
+        """Test el stream envía meta, los tokens en orden y el resultado completo"""
+        def handler(request):
+            assert "streamGenerateContent" in str(request.url)
+            body = gemini_chunk("¡Qué ") + gemini_chunk("buena ") + gemini_chunk("noticia!")
+            return httpx.Response(200, content=body.encode("utf-8"), headers={"Content-Type": "text/event-stream"})
+        
+        llm_transport(handler)
+        events = self.collect()
+        
+        assert [e["event"] for e in events] == ["meta", "token", "token", "token", "done"]
+        assert "detected_emotion" in events[0]["data"]
+        assert "".join(e["data"]["text"] for e in events[1:-1]) == "¡Qué buena noticia!"
+        assert events[-1]["data"]["reply"] == "¡Qué buena noticia!"
+        assert events[-1]["data"]["meta"] == events[0]["data"]
+    
+    def test_stream_error_status(self, llm_transport):
+        """Test un error HTTP produce un evento de error y la respuesta local como único token"""
+        def handler(request):
+            return httpx.Response(503, json=[{"error": {"message": "sobrecargado"}}])
+        
+        llm_transport(handler)
+        events = self.collect()
+        
+        assert [e["event"] for e in events] == ["meta", "error", "token", "done"]
+        assert events[1]["data"]["error"] == "[Gemini ERROR 503] sobrecargado"
+        assert events[2]["data"]["text"] == events[-1]["data"]["reply"]
+        assert events[-1]["data"]["meta"]["fallback"] is True
+    
+    def test_stream_failure_after_tokens_keeps_partial_reply(self, llm_transport):
+        """Test si el LLM falla a mitad del stream, `done` lleva el texto ya enviado y no la respuesta local"""
+        def handler(request):
+            async def body():
+                yield gemini_chunk("Entiendo ").encode("utf-8")
+                yield gemini_chunk("lo que ").encode("utf-8")
+                raise httpx.ReadError("conexión cortada")
+            return httpx.Response(200, content=body(), headers={"Content-Type": "text/event-stream"})
+        
+        llm_transport(handler)
+        events = self.collect()
+        
+        assert [e["event"] for e in events] == ["meta", "token", "token", "error", "done"]
+        shown = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+        result = events[-1]["data"]
+        assert result["reply"] == shown.strip()
+        assert result["history"][-1][1] == shown.strip()
+        assert result["meta"]["partial"] is True
+        assert "ReadError" in result["meta"]["error"]
+        assert "fallback" not in result["meta"]
+    
+    def test_sse_event_format(self):
+        """Test el formato de un evento SSE"""
+        from app.api.routes.chat import sse_event
+        
+        event = sse_event("token", {"text": "acción"})
+        
+        assert event == 'event: token\ndata: {"text": "acción"}\n\n'
+
+
+class TestConcurrentAnalysis:
+    """Tests para el análisis en paralelo con la llamada al LLM"""
+    
+    DELAY = 0.2
+    
+    @classmethod
+    def slow_analysis(cls, context_alert=False):
+        import time
+        
+        def analyze(text, history=None, context=None):
+            time.sleep(cls.DELAY)
+            return {
+                "emotion": "tristeza", "emotion_score": 88.0, "style": "neutro", "style_score": 60.0,
+                "priority": "alta", "alert": True, "alert_reason": "tristeza", "context_alert": context_alert
+            }
+        return analyze
+    
+    def run_reply(self, monkeypatch, llm_transport, user_context=None, context_alert=False):
+        import time
+        from app.services import chat_service
+        
+        payloads = []
+        
+        async def handler(request):
+            payloads.append(json.loads(request.content))
+            await asyncio.sleep(self.DELAY)
+            return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": "Te escucho."}]}}]})
+        
+        llm_transport(handler)
+        monkeypatch.setattr(chat_service, "analyze_text", self.slow_analysis(context_alert))
+        start = time.perf_counter()
+        result = asyncio.run(chat_service.generate_bot_reply_async("Hoy no tengo ganas de nada", user_context))
+        return result, time.perf_counter() - start, payloads[0]
+    
+    def test_llm_and_analysis_overlap(self, monkeypatch, llm_transport):
+        """Test sin alerta de contexto la latencia es la mayor de las dos, no la suma"""
+        result, elapsed, payload = self.run_reply(monkeypatch, llm_transport)
+        
+        assert elapsed < self.DELAY * 1.75
+        assert result["reply"] == "Te escucho."
+        assert result["meta"]["detected_emotion"] == "tristeza"
+        assert "EmotiProfe" not in payload["contents"][0]["parts"][0]["text"]
+    
+    def test_context_alert_waits_for_analysis(self, monkeypatch, llm_transport):
+        """Test con alerta en el contexto acumulado el prompt incluye el análisis del mensaje"""
+        from app.services.context_state import RollingContext
+        from app.services.chat_service import prompt_needs_analysis
+        
+        context = RollingContext(window=10)
+        for _ in range(3):
+            context.update("tristeza", 90.0, "neutro")
+        assert prompt_needs_analysis([], context)
+        assert not prompt_needs_analysis([], RollingContext(window=10))
+        
+        result, elapsed, payload = self.run_reply(monkeypatch, llm_transport, {"context": context}, context_alert=True)
+        
+        assert elapsed >= self.DELAY * 2
+        assert "la emoción 'tristeza'" in payload["contents"][0]["parts"][0]["text"]
+        assert result["reply"] == "Te escucho."
+
+
+class TestLLMProviders:
+    """Tests para los proveedores de LLM"""
+    
+    MESSAGES = [
+        {"role": "system", "content": "Responde en español."},
+        {"role": "user", "content": "Hola"},
+        {"role": "assistant", "content": "¡Hola!"},
+        {"role": "user", "content": "Estoy cansado"},
+    ]
+    
+    def test_retries_transient_errors(self, llm_transport):
+        """Test los estados 5xx y los errores de conexión se reintentan"""
+        from app.services.llm_providers import GeminiProvider
+        
+        responses = [
+            httpx.ConnectError("conexión rechazada"),
+            httpx.Response(503, json={"error": {"message": "sobrecargado"}}),
+            httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": "Listo"}]}}]}),
+        ]
+        
+        def handler(request):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        
+        provider = llm_transport(handler, GeminiProvider("test-key", max_retries=2, backoff=0))
+        
+        assert asyncio.run(provider.complete(self.MESSAGES)) == "Listo"
+        assert provider.stats()["retries"] == 2
+        assert provider.stats()["errors"] == 0
+    
+    def test_client_errors_are_not_retried(self, llm_transport):
+        """Test un error 4xx (salvo 429) no se reintenta"""
+        from app.services.llm_providers import GeminiProvider, LLMError
+        
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, json={"error": {"message": "petición inválida"}})
+        
+        provider = llm_transport(handler, GeminiProvider("test-key", max_retries=2, backoff=0))
+        
+        with pytest.raises(LLMError) as error:
+            asyncio.run(provider.complete(self.MESSAGES))
+        assert error.value.upstream_status == 400
+        assert len(calls) == 1
+    
+    def test_gemini_payload_roles(self):
+        """Test el prompt de sistema va como mensaje del usuario y el asistente como 'model'"""
+        from app.services.llm_providers import GeminiProvider
+        
+        payload = GeminiProvider("test-key").payload(self.MESSAGES, stream=False)
+        
+        assert [c["role"] for c in payload["contents"]] == ["user", "user", "model", "user"]
+        assert payload["contents"][0]["parts"][0]["text"] == "Responde en español."
+    
+    def test_openai_compatible_complete_and_stream(self, llm_transport):
+        """Test el proveedor compatible con OpenAI en respuesta completa y en streaming"""
+        from app.services.llm_providers import OpenAICompatibleProvider
+        
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            body = json.loads(request.content)
+            if body["stream"]:
+                lines = [
+                    "data: " + json.dumps({"choices": [{"delta": {"content": text}}]}) + "\n\n"
+                    for text in ("Vamos ", "paso ", "a paso.")
+                ]
+                return httpx.Response(200, content=("".join(lines) + "data: [DONE]\n\n").encode("utf-8"))
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Vamos paso a paso."}}]})
+        
+        provider = llm_transport(handler, OpenAICompatibleProvider("http://llm.local/v1/", "secreto", "modelo-local", max_retries=0))
+        
+        async def run():
+            reply = await provider.complete(self.MESSAGES)
+            chunks = [text async for text in provider.stream(self.MESSAGES)]
+            return reply, chunks
+        
+        reply, chunks = asyncio.run(run())
+        
+        assert reply == "Vamos paso a paso."
+        assert chunks == ["Vamos ", "paso ", "a paso."]
+        assert str(requests_seen[0].url) == "http://llm.local/v1/chat/completions"
+        assert requests_seen[0].headers["Authorization"] == "Bearer secreto"
+        assert json.loads(requests_seen[0].content)["messages"] == self.MESSAGES
+    
+    def test_mock_provider_is_deterministic(self):
+        """Test el proveedor local responde igual al mismo mensaje y su stream arma la misma respuesta"""
+        from app.services.llm_providers import MockProvider
+        
+        provider = MockProvider(latency_ms=0, token_latency_ms=0)
+        
+        async def run():
+            first = await provider.complete(self.MESSAGES)
+            second = await provider.complete(self.MESSAGES)
+            chunks = [text async for text in provider.stream(self.MESSAGES)]
+            return first, second, chunks
+        
+        first, second, chunks = asyncio.run(run())
+        
+        assert first == second
+        assert first in MockProvider.REPLIES
+        assert "".join(chunks) == first
+    
+    def test_mock_provider_failures(self):
+        """Test la tasa de fallos del proveedor local es reproducible y pasa por los reintentos"""
+        from app.services.llm_providers import MockProvider, LLMError
+        
+        def outcomes(seed):
+            provider = MockProvider(latency_ms=0, failure_rate=0.5, seed=seed, max_retries=0)
+            
+            async def run():
+                results = []
+                for _ in range(20):
+                    try:
+                        await provider.complete(self.MESSAGES)
+                        results.append(True)
+                    except LLMError as e:
+                        assert e.upstream_status == 503
+                        results.append(False)
+                return results
+            
+            return asyncio.run(run())
+        
+        assert outcomes(7) == outcomes(7)
+        assert 0 < sum(outcomes(7)) < 20
+        
+        always_failing = MockProvider(latency_ms=0, failure_rate=1.0, max_retries=2, backoff=0)
+        with pytest.raises(LLMError):
+            asyncio.run(always_failing.complete(self.MESSAGES))
+        assert always_failing.stats()["retries"] == 2
+    
+    def test_create_provider(self, monkeypatch):
+        """Test la selección del proveedor por nombre"""
+        from app.core.config import settings
+        from app.services.llm_providers import create_provider, GeminiProvider, OpenAICompatibleProvider, MockProvider
+        
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+        assert isinstance(create_provider("gemini"), MockProvider)  # Sin API key no se llama a Gemini
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        assert isinstance(create_provider("gemini"), GeminiProvider)
+        assert isinstance(create_provider("openai"), OpenAICompatibleProvider)
+        assert create_provider("openrouter").label == "OpenRouter"
+        assert isinstance(create_provider("mock"), MockProvider)
+        with pytest.raises(ValueError):
+            create_provider("desconocido")
+
+
+class TestCircuitBreaker:
+    """Tests para el circuit breaker del LLM y la respuesta local"""
+    
+    def test_state_transitions(self):
+        """Test cerrado -> abierto tras N fallos -> semiabierto tras la espera -> cerrado con éxito"""
+        from app.services.circuit_breaker import CircuitBreaker
+        
+        now = [0.0]
+        breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10, clock=lambda: now[0])
+        
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        
+        now[0] = 10.0
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # Una sola llamada de prueba a la vez
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.stats()["opened"] == 1
+        assert breaker.stats()["rejected"] == 2
+    
+    def test_half_open_failure_reopens(self):
+        """Test un fallo de la llamada de prueba vuelve a abrir el circuito"""
+        from app.services.circuit_breaker import CircuitBreaker
+        
+        now = [0.0]
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=5, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 5.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        now[0] = 9.0
+        assert not breaker.allow()
+        
+        # Una prueba cancelada libera su lugar
+        now[0] = 10.0
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+    
+    def test_open_circuit_skips_llm(self, llm_transport):
+        """Test con el circuito abierto el chat responde al instante sin llamar al LLM"""
+        from app.services import chat_service, llm_providers
+        from app.services.circuit_breaker import CircuitBreaker
+        
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={"error": {"message": "caído"}})
+        
+        llm_transport(handler)
+        breaker = CircuitBreaker("llm", failure_threshold=2, recovery_timeout=60)
+        llm_providers.set_provider(llm_providers.get_provider(), breaker)
+        
+        async def run():
+            return [await chat_service.generate_bot_reply_async("Estoy muy triste hoy") for _ in range(5)]
+        
+        results = asyncio.run(run())
+        
+        assert len(calls) == 2
+        assert breaker.state == "open"
+        assert all(r["meta"]["fallback"] for r in results)
+        assert results[-1]["meta"]["error"] == "Gemini no disponible (circuito abierto)"
+        assert results[-1]["reply"] == chat_service.fallback_reply({
+            "emotion": results[-1]["meta"]["detected_emotion"], "alert": results[-1]["meta"]["alert"]
+        })
+    
+    def test_fallback_reply_by_emotion(self):
+        """Test la respuesta local depende de la emoción y menciona al tutor si hay alerta"""
+        from app.services.chat_service import fallback_reply, FALLBACK_REPLIES, FALLBACK_ALERT_SUFFIX
+        from app.models.emotion import EMPATHETIC_REPLY
+        
+        assert fallback_reply({"emotion": "tristeza", "alert": False}) == FALLBACK_REPLIES["tristeza"]
+        assert fallback_reply({"emotion": "tristeza", "alert": True}).endswith(FALLBACK_ALERT_SUFFIX)
+        assert fallback_reply({"emotion": "desconocida", "alert": False}) == EMPATHETIC_REPLY
@@ -0,0 +1,161 @@
+# Archivo: test_inference.py
+"""
+Tests para los backends de inferencia (micro-lotes).
+"""
+
+import pytest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.inference_pool import ProcessInferencePool
+from app.services import analysis_service
+from app.services.analysis_service import classify_pairs, set_inference_backend, analyze_text
+
+
+class TestInferenceScheduler:
+    """Tests para el planificador de micro-lotes."""
+
+    def test_groups_concurrent_requests(self):
+        """Test que las solicitudes concurrentes se agrupan en menos llamadas."""
+        calls = []
+        lock = threading.Lock()
+
+        def batch_fn(texts):
+            with lock:
+                calls.append(list(texts))
+            return [text.upper() for text in texts]
+
+        scheduler = InferenceScheduler(batch_fn, max_batch_size=8, window_ms=50)
+        scheduler.start()
+        try:
+            texts = [f"mensaje {i}" for i in range(16)]
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(lambda t: scheduler.predict(t, timeout=5), texts))
+        finally:
+            scheduler.shutdown()
+
+        assert results == [text.upper() for text in texts]
+        assert all(len(batch) <= 8 for batch in calls)
+        assert len(calls) < len(texts)
+        assert scheduler.stats()["items"] == len(texts)
+
+    def test_errors_propagate_to_callers(self):
+        """Test que un fallo del lote llega a cada solicitante."""
+        def batch_fn(texts):
+            raise ValueError("modelo roto")
+
+        scheduler = InferenceScheduler(batch_fn, max_batch_size=4, window_ms=1)
+        scheduler.start()
+        try:
+            with pytest.raises(ValueError):
+                scheduler.predict("hola", timeout=5)
+        finally:
+            scheduler.shutdown()
+
+        assert scheduler.stats()["errors"] == 1
+
+    def test_submit_when_stopped(self):
+        """Test que encolar sin planificador activo falla de inmediato."""
+        scheduler = InferenceScheduler(lambda texts: texts)
+
+        with pytest.raises(RuntimeError):
+            scheduler.predict("hola", timeout=1)
+
+    def test_analyze_text_through_scheduler(self):
+        """Test que analyze_text da el mismo resultado con el planificador instalado."""
+        text = "No entiendo nada de la clase y me frustra mucho."
+        expected = analyze_text(text)
+
+        scheduler = InferenceScheduler(classify_pairs, max_batch_size=4, window_ms=1)
+        scheduler.start()
+        set_inference_backend(scheduler)
+        analysis_service.prediction_cache.clear()
+        try:
+            result = analyze_text(text)
+        finally:
+            set_inference_backend(None)
+            scheduler.shutdown()
+
+        assert result["emotion"] == expected["emotion"]
+        assert result["style"] == expected["style"]
+        assert result["priority"] == expected["priority"]
+        assert scheduler.stats()["items"] == 1
+
+
+@pytest.mark.slow
+class TestProcessInferencePool:
+    """Tests para el pool de procesos de inferencia."""
+
+    def test_pool_matches_local_inference(self):
+        """Test que el pool devuelve las mismas predicciones que el proceso local."""
+        texts = [
+            "No entiendo nada de la clase y me frustra mucho.",
+            "Hoy estoy muy feliz y motivado.",
+            "",
+            "Sí, como tú digas, maestro.",
+            "Por favor, ¿podría ayudarme con la tarea?",
+        ]
+        expected = classify_pairs(texts)
+
+        pool = ProcessInferencePool(workers=2, chunk_size=2)
+        pool.start()
+        try:
+            results = pool.predict_batch(texts, timeout=60)
+            single = pool.predict(texts[0], timeout=60)
+        finally:
+            pool.shutdown()
+
+        assert [(e.label, s.label) for e, s in results] == [(e.label, s.label) for e, s in expected]
+        assert [(e.score, s.score) for e, s in results] == [(e.score, s.score) for e, s in expected]
+        assert single[0].label == expected[0][0].label
+        assert not pool.running
+
+    def test_predict_when_stopped(self):
+        """Test que usar el pool sin arrancar falla de forma explícita."""
+        with pytest.raises(RuntimeError):
+            ProcessInferencePool(workers=1).predict("hola")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+class TestBenchmarks:
+    """Tests para el arnés de benchmarks de inferencia."""
+
+    @pytest.fixture
+    def benchmarks_dir(self):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+        sys.path.append(path)
+        return path
+
+    def test_latency_stats_and_batches(self, benchmarks_dir):
+        """Test que los percentiles y el throughput por lote se reportan en las unidades esperadas."""
+        import bench_inference
+
+        stats = bench_inference.latency_stats([0.001] * 98 + [0.002, 0.010])
+        assert stats["n"] == 100
+        assert stats["p50_us"] == 1000.0
+        assert stats["p99_us"] > stats["p95_us"] >= 1000.0
+
+        batches = bench_inference.bench_batches(classify_pairs, ["hola", "me siento triste", "qué alegría"] * 4, [1, 4, 64])
+        assert set(batches) == {"1", "4"}
+        assert batches["4"]["batches"] == 3
+        assert batches["4"]["texts_per_s"] > 0
+
+    def test_compare_direction(self, benchmarks_dir):
+        """Test que la comparación trata latencia (menor) y throughput (mayor) en sentidos opuestos."""
+        import compare
+
+        base = {"environment": {"commit": "a"}, "single": {"emotion": {"p50_us": 100.0, "max_us": 900.0, "n": 10}},
+                "batch": {"8": {"texts_per_s": 1000.0}}}
+        new = {"environment": {"commit": "b"}, "single": {"emotion": {"p50_us": 80.0, "max_us": 5000.0, "n": 10}},
+               "batch": {"8": {"texts_per_s": 800.0}}}
+        rows = {row["metric"]: row["improvement_pct"] for row in compare.compare(base, new)}
+        assert rows == {"single.emotion.p50_us": 20.0, "batch.8.texts_per_s": -20.0}
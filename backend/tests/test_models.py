@@ -0,0 +1,622 @@
+# Archivo: test_models.py
+"""
+Tests para la capa de modelos de clasificación (emoción y estilo).
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.prediction import Prediction, predict_text, predict_texts
+from app.models.emotion import get_emotion_prediction, predict_emotion, predict_all_emotions, predict_emotions_batch
+from app.models.style import get_style_prediction, predict_style, predict_all_styles, predict_styles_batch
+from app.services.analysis_service import analyze_text, analyze_texts
+from app.models.registry import ModelHandle, ModelRegistry, ModelWatcher, TaskHandle, READY, FAILED, UNLOADED
+from app.models.multitask import CompiledMultiTaskClassifier, MultiTaskTextClassifier, compile_multitask
+from app.models.normalization import normalize_text, normalize_texts, normalize_text_unicodedata
+from app.models.compiled import CompiledTextClassifier, compile_pipeline, compiled_path_for, shared_path_for, load_text_classifier
+
+EMOTION_MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_models", "emotion_detection", "emotion_model.joblib")
+STYLE_MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_models", "style_classification", "style_model.joblib")
+MULTITASK_MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_models", "multitask", "multitask_model.joblib")
+
+
+class DummyModel:
+    """Modelo mínimo con la interfaz de un pipeline scikit-learn."""
+
+    classes_ = np.array(["alegría", "tristeza", "ansiedad"])
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, texts):
+        self.calls += 1
+        return np.array([[0.2, 0.7, 0.1] for _ in texts])
+
+
+class TestPrediction:
+    """Tests para el objeto Prediction."""
+
+    def test_from_probabilities(self):
+        """Test que la etiqueta y el score salen de la misma fila de probabilidades."""
+        prediction = Prediction.from_probabilities(np.array([0.2, 0.7, 0.1]), DummyModel.classes_)
+
+        assert prediction.label == "tristeza"
+        assert prediction.score == 70.0
+        assert prediction.distribution == [("tristeza", 70.0), ("alegría", 20.0), ("ansiedad", 10.0)]
+
+    def test_predict_text_single_pass(self):
+        """Test que predict_text llama a predict_proba una sola vez."""
+        model = DummyModel()
+        prediction = predict_text(model, "Me siento triste")
+
+        assert model.calls == 1
+        assert prediction.as_tuple() == ("tristeza", 70.0)
+
+    def test_predict_text_empty(self):
+        """Test que un texto vacío no invoca al modelo."""
+        model = DummyModel()
+        prediction = predict_text(model, "   ")
+
+        assert model.calls == 0
+        assert prediction.as_tuple() == ("neutro", 0.0)
+        assert prediction.distribution == [("neutro", 0.0)]
+
+    def test_predict_text_without_model(self):
+        """Test que sin modelo se devuelve la etiqueta por defecto."""
+        assert predict_text(None, "Hola").as_tuple() == ("neutro", 0.0)
+
+    def test_top_k(self):
+        """Test que top(k) coincide con el inicio de la distribución completa."""
+        probabilities = np.array([0.05, 0.3, 0.1, 0.25, 0.3])
+        prediction = Prediction.from_probabilities(probabilities, np.array(["a", "b", "c", "d", "e"]))
+
+        for k in range(1, 6):
+            assert prediction.top(k) == prediction.distribution[:k]
+        assert prediction.top(0) == prediction.distribution
+
+    def test_top_min_prob(self):
+        """Test que el umbral omite clases poco probables pero conserva la dominante."""
+        prediction = Prediction.from_probabilities(np.array([0.2, 0.7, 0.1]), DummyModel.classes_)
+
+        assert prediction.top(min_prob=0.15) == [("tristeza", 70.0), ("alegría", 20.0)]
+        assert prediction.top(min_prob=0.9) == [("tristeza", 70.0)]
+        assert prediction.top(k=1, min_prob=0.15) == [("tristeza", 70.0)]
+
+
+class TestModelPredictors:
+    """Tests de consistencia entre la API Prediction y las funciones existentes."""
+
+    @pytest.mark.parametrize("text", ["Hoy estoy muy feliz y motivado.", "No tengo ganas de hacer nada."])
+    def test_emotion_api_consistency(self, text):
+        """Test que predict_emotion y predict_all_emotions coinciden con la predicción fusionada."""
+        prediction = get_emotion_prediction(text)
+
+        assert predict_emotion(text) == prediction.as_tuple()
+        assert predict_all_emotions(text) == prediction.distribution
+        assert predict_all_emotions(text, top_k=2) == prediction.distribution[:2]
+        assert prediction.distribution[0] == prediction.as_tuple()
+
+    @pytest.mark.parametrize("text", ["Por favor, ¿podría ayudarme con la tarea?", "No sé, haz lo que quieras."])
+    def test_style_api_consistency(self, text):
+        """Test que predict_style y predict_all_styles coinciden con la predicción fusionada."""
+        prediction = get_style_prediction(text)
+
+        assert predict_style(text) == prediction.as_tuple()
+        assert predict_all_styles(text) == prediction.distribution
+        assert predict_all_styles(text, top_k=2) == prediction.distribution[:2]
+        assert prediction.distribution[0] == prediction.as_tuple()
+
+
+class TestBatchPrediction:
+    """Tests para la clasificación en lote."""
+
+    TEXTS = [
+        "No entiendo nada de la clase y me frustra mucho.",
+        "",
+        "Hoy estoy muy feliz y motivado.",
+        "Sí, como tú digas, maestro.",
+    ]
+
+    def test_predict_texts_single_call(self):
+        """Test que el lote usa una sola llamada y respeta textos vacíos."""
+        model = DummyModel()
+        predictions = predict_texts(model, ["uno", " ", "dos"])
+
+        assert model.calls == 1
+        assert [p.label for p in predictions] == ["tristeza", "neutro", "tristeza"]
+
+    def test_emotions_batch_matches_single(self):
+        """Test que el lote de emociones coincide con la predicción individual."""
+        batch = predict_emotions_batch(self.TEXTS)
+
+        assert len(batch) == len(self.TEXTS)
+        for text, prediction in zip(self.TEXTS, batch):
+            single = get_emotion_prediction(text)
+            assert prediction.label == single.label
+            assert prediction.score == pytest.approx(single.score)
+
+    def test_styles_batch_matches_single(self):
+        """Test que el lote de estilos coincide con la predicción individual."""
+        batch = predict_styles_batch(self.TEXTS)
+
+        for text, prediction in zip(self.TEXTS, batch):
+            single = get_style_prediction(text)
+            assert prediction.label == single.label
+            assert prediction.score == pytest.approx(single.score)
+
+    def test_analyze_texts_matches_analyze_text(self):
+        """Test que analyze_texts equivale a analizar cada texto por separado."""
+        for batch_result, text in zip(analyze_texts(self.TEXTS), self.TEXTS):
+            single = analyze_text(text)
+            assert batch_result["emotion"] == single["emotion"]
+            assert batch_result["style"] == single["style"]
+            assert batch_result["priority"] == single["priority"]
+            assert batch_result["alert"] == single["alert"]
+
+
+class TestCompiledModel:
+    """Tests para el scorer compilado NumPy/SciPy."""
+
+    TEXTS = [
+        "No entiendo nada de la clase y me frustra mucho.",
+        "Hoy estoy muy feliz y motivado.",
+        "",
+        "palabrasinventadas que no existen",
+        "Me siento triste y desconectado de todo, triste de verdad.",
+    ]
+
+    @pytest.fixture
+    def pipeline(self):
+        joblib = pytest.importorskip("joblib")
+        return joblib.load(EMOTION_MODEL)
+
+    def test_matches_sklearn_probabilities(self, pipeline):
+        """Test que el scorer compilado reproduce predict_proba."""
+        compiled = compile_pipeline(pipeline)
+
+        np.testing.assert_allclose(compiled.predict_proba(self.TEXTS), pipeline.predict_proba(self.TEXTS), atol=1e-12)
+        assert list(compiled.classes_) == list(pipeline.classes_)
+
+    def test_save_and_load(self, pipeline, tmp_path):
+        """Test que el artefacto guardado conserva las probabilidades."""
+        path = compile_pipeline(pipeline).save(tmp_path / "modelo.npz")
+        reloaded = CompiledTextClassifier.load(path)
+
+        np.testing.assert_allclose(reloaded.predict_proba(self.TEXTS), pipeline.predict_proba(self.TEXTS), atol=1e-12)
+
+    def test_shared_artifact_is_memory_mapped(self, pipeline, tmp_path):
+        """Test que el formato compartido se carga con mmap y conserva las probabilidades."""
+        path = compile_pipeline(pipeline).save_shared(tmp_path / "modelo.shared")
+        reloaded = CompiledTextClassifier.load_shared(path, mmap=True)
+
+        assert isinstance(reloaded.coef_t.base, np.memmap) or isinstance(reloaded.coef_t, np.memmap)
+        assert reloaded.coef_t.flags["C_CONTIGUOUS"]
+        np.testing.assert_allclose(reloaded.predict_proba(self.TEXTS), pipeline.predict_proba(self.TEXTS), atol=1e-12)
+
+    def test_loader_prefers_shared_artifact(self, pipeline, tmp_path):
+        """Test que load_text_classifier usa el directorio compartido si está al día."""
+        import shutil
+        from app.models.prediction import model_file_version
+
+        model_path = tmp_path / "emotion_model.joblib"
+        shutil.copy(EMOTION_MODEL, model_path)
+        compile_pipeline(pipeline, source_version=model_file_version(model_path)).save_shared(shared_path_for(model_path))
+
+        model, _ = load_text_classifier(model_path, mmap=True)
+
+        assert isinstance(model, CompiledTextClassifier)
+        np.testing.assert_allclose(model.predict_proba(self.TEXTS), pipeline.predict_proba(self.TEXTS), atol=1e-12)
+
+    def test_stale_artifact_falls_back_to_joblib(self, pipeline, tmp_path):
+        """Test que un artefacto compilado de otra versión no se usa."""
+        import shutil
+
+        model_path = tmp_path / "emotion_model.joblib"
+        shutil.copy(EMOTION_MODEL, model_path)
+        compile_pipeline(pipeline, source_version="otra-version").save(compiled_path_for(model_path))
+
+        model, _ = load_text_classifier(model_path)
+
+        assert not isinstance(model, CompiledTextClassifier)
+
+    def test_rejects_unsupported_pipeline(self):
+        """Test que un pipeline no soportado se rechaza con un error claro."""
+        sklearn_pipeline = pytest.importorskip("sklearn.pipeline")
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        pipeline = sklearn_pipeline.Pipeline([("vec", HashingVectorizer()), ("clf", LogisticRegression())])
+        with pytest.raises(ValueError):
+            compile_pipeline(pipeline)
+
+class TestNormalization:
+    """Tests para la normalización de texto compartida entre entrenamiento e inferencia."""
+
+    @pytest.mark.parametrize("text", [
+        "¿Por qué NO me ayudas? ¡Estoy harto!",
+        "Pingüino, ñandú y acción… “comillas”",
+        "Ünïcödé çàñ ser raro 😅 y tener emojis 🚀",
+        "e\u0301 combinado y ǅ dígrafo",
+        "tabs\ty\nsaltos  de   línea",
+        "",
+    ])
+    def test_matches_unicodedata_reference(self, text):
+        """Test que la tabla de traducción produce lo mismo que NFD + ASCII + regex."""
+        assert normalize_text(text) == normalize_text_unicodedata(text)
+
+    def test_batch_and_non_string(self):
+        """Test de la versión por lotes y de entradas que no son texto."""
+        assert normalize_text(None) == ""
+        assert normalize_texts(["Él está bien.", 3]) == ["el esta bien", ""]
+
+    def test_pipeline_embeds_normalization(self):
+        """Test que los modelos incluidos normalizan dentro del pipeline (igual al entrenar y al predecir)."""
+        joblib = pytest.importorskip("joblib")
+        pipeline = joblib.load(EMOTION_MODEL)
+
+        assert pipeline.steps[0][1].preprocessor is normalize_text
+        np.testing.assert_allclose(
+            pipeline.predict_proba(["¡Estoy MUY frustrado!"]),
+            pipeline.predict_proba(["estoy muy frustrado"])
+        )
+
+    def test_compiled_applies_normalization(self):
+        """Test que el scorer compilado reproduce el preprocesador del pipeline."""
+        joblib = pytest.importorskip("joblib")
+        pipeline = joblib.load(EMOTION_MODEL)
+        compiled = compile_pipeline(pipeline)
+        texts = ["¡Qué FRUSTRACIÓN!", "Pingüino 😅 “feliz”", ""]
+
+        assert compiled.params["preprocessor"] == "normalize_text"
+        np.testing.assert_allclose(compiled.predict_proba(texts), pipeline.predict_proba(texts), atol=1e-12)
+
+
+class TestTextPipelines:
+    """Tests para las variantes de pipeline de entrenamiento."""
+
+    @pytest.fixture
+    def text_pipelines(self):
+        pytest.importorskip("sklearn")
+        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_models"))
+        import text_pipelines
+        return text_pipelines
+
+    def test_hashing_variant_has_bounded_features(self, text_pipelines, tmp_path):
+        """Test que la variante hashing tiene un número fijo de columnas y se sirve desde joblib."""
+        import joblib
+
+        texts = ["estoy muy feliz hoy", "me siento triste y solo", "qué alegría tan grande", "todo me da tristeza"]
+        labels = ["alegría", "tristeza", "alegría", "tristeza"]
+        pipeline = text_pipelines.build_pipeline("hashing", n_features=256).fit(texts, labels)
+
+        assert pipeline.named_steps["clf"].coef_.shape[1] == 256
+        path = tmp_path / text_pipelines.model_filename("emotion_model", "hashing")
+        joblib.dump(pipeline, path)
+
+        model, version = load_text_classifier(path)
+        assert not isinstance(model, CompiledTextClassifier)
+        assert version.startswith("emotion_model_hashing@")
+        assert predict_text(model, "¡Qué FELIZ estoy!").label == "alegría"
+
+    def test_unknown_vectorizer(self, text_pipelines):
+        """Test que un vectorizador desconocido se rechaza."""
+        with pytest.raises(ValueError):
+            text_pipelines.build_pipeline("word2vec")
+
+    def test_search_pareto_front(self, text_pipelines):
+        """Test que la frontera usa la exactitud de validación cruzada y no la de prueba."""
+        pytest.importorskip("scipy")
+        import search_hyperparams
+
+        rows = [
+            {"cv_accuracy": 0.9, "test_accuracy": 0.7, "latency_us": 100.0},
+            {"cv_accuracy": 0.9, "test_accuracy": 0.99, "latency_us": 150.0},
+            {"cv_accuracy": 0.95, "test_accuracy": 0.7, "latency_us": 200.0},
+            {"cv_accuracy": 0.8, "test_accuracy": 0.99, "latency_us": 300.0},
+        ]
+        search_hyperparams.pareto_front(rows)
+        assert [row["pareto"] for row in rows] == [True, False, True, False]
+
+    def test_search_space_matches_pipeline(self, text_pipelines):
+        """Test que los parámetros de búsqueda existen en el pipeline de cada variante."""
+        pytest.importorskip("scipy")
+        import search_hyperparams
+
+        for vectorizer in text_pipelines.VECTORIZERS:
+            params = text_pipelines.build_pipeline(vectorizer).get_params()
+            space = search_hyperparams.param_space(vectorizer, "grid")
+            assert set(space) <= set(params)
+
+
+class TestModelRegistry:
+    """Tests para el registro de modelos con carga diferida."""
+
+    def test_lazy_load_on_first_use(self):
+        """Test que el modelo no se carga hasta que se usa y queda caliente."""
+        handle = ModelHandle("emotion", EMOTION_MODEL)
+        assert handle.state == UNLOADED
+
+        model = handle.get()
+
+        assert model is not None
+        assert handle.state == READY
+        assert handle.warmup_ms is not None
+        assert handle.version.startswith("emotion_model@")
+        assert handle.get() is model
+
+    def test_failed_load_is_reported(self, tmp_path):
+        """Test que un fallo de carga queda registrado y las predicciones caen al valor por defecto."""
+        registry = ModelRegistry()
+        handle = registry.register(ModelHandle("emotion", tmp_path / "no_existe.joblib"))
+
+        assert not registry.load_all()
+        assert handle.state == FAILED
+        assert handle.get() is None
+        assert predict_text(handle.get(), "hola").label == "neutro"
+
+        status = registry.status()
+        assert not status["ready"]
+        assert status["failed"]
+        assert status["models"]["emotion"]["error"]
+
+    def test_registry_ready_when_all_loaded(self):
+        """Test que el registro solo está listo cuando todos los modelos lo están."""
+        registry = ModelRegistry()
+        assert not registry.ready
+
+        registry.register(ModelHandle("emotion", EMOTION_MODEL))
+        assert not registry.ready
+
+        assert registry.load_all()
+        assert registry.ready
+
+    def test_hot_reload_swaps_version(self, tmp_path):
+        """Test que un archivo nuevo se carga y se intercambia sin afectar a quien usa la versión anterior."""
+        import shutil
+
+        model_path = tmp_path / "modelo.joblib"
+        shutil.copy(EMOTION_MODEL, model_path)
+        handle = ModelHandle("emotion", model_path)
+        old_model, old_version = handle.snapshot()
+        assert not handle.changed()
+
+        # Simula un reentrenamiento que reemplaza el archivo
+        shutil.copy(STYLE_MODEL, model_path)
+        os.utime(model_path, ns=(0, 10 ** 9))
+        assert handle.changed()
+        assert handle.reload()
+
+        new_model, new_version = handle.snapshot()
+        assert new_version != old_version
+        assert new_model is not old_model
+        assert handle.reloads == 1
+        assert [entry["version"] for entry in handle.status()["history"]] == [new_version, old_version]
+        # El modelo anterior sigue siendo utilizable por las solicitudes en curso
+        assert predict_text(old_model, "hola", version=old_version).version == old_version
+
+    def test_reload_failure_keeps_current_model(self, tmp_path):
+        """Test que una recarga fallida conserva la versión en servicio."""
+        import shutil
+
+        model_path = tmp_path / "modelo.joblib"
+        shutil.copy(EMOTION_MODEL, model_path)
+        handle = ModelHandle("emotion", model_path)
+        model, version = handle.snapshot()
+
+        model_path.write_bytes(b"no es un modelo")
+        assert not handle.reload()
+
+        assert handle.state == READY
+        assert handle.snapshot() == (model, version)
+        assert handle.error
+
+    def test_watcher_reloads_changed_models(self, tmp_path):
+        """Test que el vigilante recarga en segundo plano el modelo modificado."""
+        import shutil
+        import time
+
+        model_path = tmp_path / "modelo.joblib"
+        shutil.copy(EMOTION_MODEL, model_path)
+        registry = ModelRegistry()
+        handle = registry.register(ModelHandle("emotion", model_path))
+        registry.load_all()
+        old_version = handle.version
+
+        watcher = ModelWatcher(registry, interval=0.05)
+        watcher.start()
+        try:
+            shutil.copy(STYLE_MODEL, model_path)
+            os.utime(model_path, ns=(0, 10 ** 9))
+            deadline = time.monotonic() + 10
+            while handle.reloads == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+
+        assert handle.version != old_version
+        assert not watcher.running
+
+    def test_predictions_carry_model_version(self):
+        """Test que las predicciones y el análisis registran la versión del modelo usado."""
+        from app.models import emotion
+
+        prediction = get_emotion_prediction("Hoy estoy muy feliz y motivado.")
+        result = analyze_text("Hoy estoy muy feliz y motivado.")
+
+        assert prediction.version == emotion.model_handle.version
+        assert result["model_version"].startswith(f"{emotion.model_handle.version}|")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+class TestMultiTask:
+    """Tests para el modelo multitarea con vectorizador compartido."""
+
+    @pytest.fixture
+    def model(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        emotion_texts = ["estoy muy feliz hoy", "me siento triste y solo", "qué alegría tan grande", "todo me da tristeza"]
+        emotion_labels = ["alegría", "tristeza", "alegría", "tristeza"]
+        style_texts = ["estimado profesor, le escribo", "eres un idiota", "cordialmente, gracias", "cállate ya, idiota"]
+        style_labels = ["formal", "agresivo", "formal", "agresivo"]
+
+        vectorizer = TfidfVectorizer(preprocessor=normalize_text).fit(emotion_texts + style_texts)
+        heads = {
+            "emotion": LogisticRegression().fit(vectorizer.transform(emotion_texts), emotion_labels),
+            "style": LogisticRegression().fit(vectorizer.transform(style_texts), style_labels),
+        }
+        return MultiTaskTextClassifier(vectorizer, heads)
+
+    def test_compiled_matches_sklearn(self, model, tmp_path):
+        """Test que el artefacto compilado reproduce ambas cabezas y se carga como multitarea."""
+        texts = ["¡Qué FELIZ estoy!", "Estimado profesor", "idiota triste", ""]
+        compiled = compile_multitask(model)
+        loaded = CompiledTextClassifier.load(compiled.save(tmp_path / "multitask_model.npz"))
+        shared = CompiledTextClassifier.load_shared(compiled.save_shared(tmp_path / "multitask_model.shared"))
+
+        expected = model.predict_proba_all(texts)
+        for candidate in (compiled, loaded, shared):
+            assert isinstance(candidate, CompiledMultiTaskClassifier)
+            actual = candidate.predict_proba_all(texts)
+            for task in ("emotion", "style"):
+                np.testing.assert_allclose(actual[task], expected[task], atol=1e-12)
+                assert list(candidate.classes_for(task)) == list(model.classes_for(task))
+        assert list(loaded.classes_) == ["alegría", "tristeza", "agresivo", "formal"]
+
+    def test_task_handle_serves_head(self, model, tmp_path):
+        """Test que la vista por tarea entrega la cabeza y la versión del modelo padre."""
+        import joblib
+
+        path = tmp_path / "multitask_model.joblib"
+        joblib.dump(model, path)
+        parent = ModelHandle("multitask", path)
+        emotion_view, style_view = TaskHandle(parent, "emotion"), TaskHandle(parent, "style")
+
+        prediction = predict_text(emotion_view.get(), "¡Qué FELIZ estoy!", version=emotion_view.version)
+        assert prediction.label == "alegría"
+        assert list(prediction.classes) == ["alegría", "tristeza"]
+        assert predict_text(style_view.get(), "eres un idiota").label == "agresivo"
+        assert emotion_view.version == style_view.version == parent.version
+        assert emotion_view.ready
+
+    def test_trained_artifact(self):
+        """Test que el artefacto incluido se sirve compilado con ambas cabezas."""
+        if not os.path.exists(MULTITASK_MODEL):
+            pytest.skip("Modelo multitarea no entrenado")
+        model, version = load_text_classifier(MULTITASK_MODEL)
+        assert isinstance(model, CompiledMultiTaskClassifier)
+        assert version.startswith("multitask_model@")
+        probas = model.predict_proba_all(["Hoy estoy muy feliz y motivado."])
+        assert set(probas) == {"emotion", "style"}
+        assert model.head("emotion").predict(["Hoy estoy muy feliz y motivado."])[0] == "alegría"
+
+
+class TestOnlineLearning:
+    """Tests para la actualización en línea con correcciones de tutores."""
+
+    TEXTS = ["estoy muy feliz hoy", "me siento triste y solo", "qué alegría tan grande", "todo me da tristeza"]
+    LABELS = ["alegría", "tristeza", "alegría", "tristeza"]
+
+    @pytest.fixture
+    def learner(self, tmp_path):
+        from app.services.online_learning import OnlineLearner
+
+        learner = OnlineLearner("emotion", tmp_path / "emotion_model_online.joblib", batch_size=2)
+        learner.reset(["alegría", "tristeza"])
+        for _ in range(5):
+            learner.partial_fit(self.TEXTS, self.LABELS)
+        learner.save()
+        return learner
+
+    def _add_correction(self, db, texto, etiqueta):
+        from app.db.models import Analisis, CorreccionAnalisis, Mensaje, Usuario
+
+        user = db.query(Usuario).filter(Usuario.email == "online@test.com").first()
+        if user is None:
+            user = Usuario(email="online@test.com", nombre="Tutor", hashed_password="x")
+            db.add(user)
+            db.flush()
+        mensaje = Mensaje(usuario_id=user.id, texto=texto)
+        db.add(mensaje)
+        db.flush()
+        analisis = Analisis(mensaje_id=mensaje.id, usuario_id=user.id, emocion="tristeza")
+        db.add(analisis)
+        db.flush()
+        correction = CorreccionAnalisis(analisis_id=analisis.id, tutor_id=user.id, tarea="emocion", etiqueta=etiqueta)
+        db.add(correction)
+        db.commit()
+        return correction
+
+    def test_checkpoint_is_served_by_loader(self, learner):
+        """Test que el checkpoint en línea se carga y predice como cualquier modelo joblib."""
+        model, version = load_text_classifier(learner.checkpoint_path)
+        assert version.startswith("emotion_model_online@")
+        assert predict_text(model, "¡Qué FELIZ estoy!").label == "alegría"
+        assert learner.state["samples"] == 20
+
+    def test_unknown_labels_are_skipped(self, learner):
+        """Test que las etiquetas fuera del modelo no se usan en partial_fit."""
+        assert learner.partial_fit(["hola", "  ", "todo bien"], ["neutral", "alegría", "alegría"]) == 1
+
+    def test_update_consumes_new_corrections(self, learner, db_session):
+        """Test que la actualización consume las correcciones nuevas en mini-lotes y avanza el cursor."""
+        from app.services.online_learning import OnlineLearner
+
+        corrections = [self._add_correction(db_session, text, label) for text, label in zip(self.TEXTS, self.LABELS)]
+        self._add_correction(db_session, "no sé qué siento", "confusión")
+
+        assert learner.update(db_session) == 4
+        assert learner.state["last_correction_id"] > corrections[-1].id
+        assert learner.update(db_session) == 0
+
+        # El cursor persiste con el checkpoint
+        restored = OnlineLearner("emotion", learner.checkpoint_path)
+        assert restored.load()
+        assert restored.state["last_correction_id"] == learner.state["last_correction_id"]
+        assert restored.state["samples"] == 24
+
+    def test_interrupted_save_does_not_skip_corrections(self, learner, db_session, monkeypatch):
+        """Test que si falla el segundo reemplazo del guardado, las correcciones se vuelven a aplicar al recargar."""
+        import app.services.online_learning as online_learning
+        from app.services.online_learning import OnlineLearner
+
+        corrections = [self._add_correction(db_session, text, label) for text, label in zip(self.TEXTS, self.LABELS)]
+
+        replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("disco lleno")
+            replace(src, dst)
+
+        monkeypatch.setattr(online_learning.os, "replace", failing_replace)
+        with pytest.raises(OSError):
+            learner.update(db_session)
+        monkeypatch.setattr(online_learning.os, "replace", replace)
+
+        # El cursor guardado no avanzó: el proceso siguiente vuelve a consumir las mismas correcciones
+        restored = OnlineLearner("emotion", learner.checkpoint_path, batch_size=2)
+        assert restored.load()
+        assert restored.state["last_correction_id"] == 0
+        assert restored.update(db_session) >= len(corrections)
+        assert restored.state["last_correction_id"] == corrections[-1].id
+
+    def test_update_without_checkpoint(self, tmp_path, db_session):
+        """Test que sin checkpoint inicial no se entrena nada."""
+        from app.services.online_learning import OnlineLearner
+
+        learner = OnlineLearner("style", tmp_path / "style_model_online.joblib")
+        assert learner.update(db_session) == 0
+        assert not learner.checkpoint_path.exists()
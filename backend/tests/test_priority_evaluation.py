@@ -199,4 +199,54 @@ class TestPriorityEvaluation:
         
         # Verificar que se obtengan todos los niveles
         expected_priorities = {"crítica", "alta", "media", "baja", "normal"}
-        assert priorities == expected_priorities 
\ No newline at end of file
+        assert priorities == expected_priorities
+
+
+class TestRulesEngine:
+    """Tests para el motor de reglas compilado (`app/notifications/rules.py`)."""
+
+    def test_batch_matches_single_evaluation(self):
+        """Test que la evaluación vectorizada coincide con la evaluación de un análisis a la vez."""
+        import itertools
+        from app.notifications.alerts import check_combined_alert
+        from app.notifications.rules import engine
+
+        rows = list(itertools.product(
+            ["frustración", "Tristeza", "preocupación", "alegría", None],
+            [0.0, 55.0, 65.0, 75.0, 85.0, 95.0],
+            ["evasivo", "FORMAL", "irónico", "neutro"],
+            [40.0, 60.0, 70.0, 85.0],
+            ["normal", "medio", "alto"]
+        ))
+        emotions, emotion_scores, styles, style_scores, contexts = zip(*rows)
+        result = engine.evaluate_batch(emotions, emotion_scores, styles, style_scores, contexts)
+
+        for i, (emotion, emotion_score, style, style_score, context) in enumerate(rows):
+            assert result["priority"][i] == evaluate_priority(emotion, emotion_score, style, style_score, context)
+            alert = bool(result["emotion_alert"][i] or result["style_alert"][i])
+            assert alert == check_combined_alert(emotion, emotion_score, style, style_score)[0]
+
+    def test_rules_from_config(self):
+        """Test que un cambio de reglas solo requiere otra configuración."""
+        from app.notifications.rules import RulesEngine
+
+        engine = RulesEngine({
+            "priority": {
+                "emotions": {"tiers": [{"points": [2, 1], "margin": 20, "labels": {"Alegría": 90}}], "critical": {}},
+                "styles": {"tiers": [], "critical": {"agresivo": 50}},
+                "context_bonus": {"alto": 1},
+                "critical_points": 3,
+                "levels": [["urgente", 3], ["revisar", 1]],
+                "default_level": "ok"
+            },
+            "alerts": {"emotions": {}, "styles": {"agresivo": 80}}
+        })
+
+        assert engine.priority("alegría", 95.0, "neutro", 90.0) == "revisar"
+        assert engine.priority("alegría", 60.0, "neutro", 90.0) == "ok"
+        assert engine.priority("alegría", 60.0, "neutro", 90.0, "alto") == "revisar"
+        assert engine.priority("alegría", 0.0, "agresivo", 55.0) == "urgente"
+        assert engine.alert("tristeza", 99.0, "agresivo", 85.0) == (False, True)
+        assert engine.risk_emotions == {"alegría"} and engine.risk_styles == {"agresivo"}
+        assert engine.styles.min_trigger() == 50.0
+